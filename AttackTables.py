@@ -0,0 +1,198 @@
+"""
+Attack tables are built once when the module is imported so that move generation and attack detection become table
+lookups instead of recalculating rays and bounds checks on every call. Every table is available in two forms: as
+lists of (row, col) squares for the 8x8 board engine, and as 64-bit masks for the bitboard engine.
+"""
+
+# Squares are indexed as row * 8 + col, so bit 0 is a8 and bit 63 is h1 (same orientation as GameState.board)
+SQUARE_COORDS = tuple((sq // 8, sq % 8) for sq in range(64))
+SQUARE_BITS = tuple(1 << sq for sq in range(64))
+
+# Values that represent the 8 directions on the board, in the same order used by GameState.check_for_pins_checks
+DIRECTIONS = (
+    (-1, 0),  # 0 Up
+    (0, -1),  # 1 Left
+    (1, 0),  # 2 Down
+    (0, 1),  # 3 Right
+    (-1, -1),  # 4 Top left diagonal
+    (-1, 1),  # 5 Top right diagonal
+    (1, -1),  # 6  Bottom left diagonal
+    (1, 1),  # 7 Bottom right diagonal
+)
+
+# Indices into DIRECTIONS for each sliding piece
+ROOK_DIRECTIONS = (0, 1, 2, 3)
+BISHOP_DIRECTIONS = (4, 5, 6, 7)
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+# Directions that move toward higher square indices. The closest blocker along these rays is the lowest set bit,
+# along the other rays it is the highest set bit
+POSITIVE_DIRECTIONS = (False, False, True, True, False, False, True, True)
+
+KNIGHT_JUMPS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+
+"""
+Calculates the (row, col) squares reached by each of the given jumps from a square, skipping squares off the board
+"""
+
+
+def jump_squares(r, c, jumps) -> tuple:
+    return tuple((r + dr, c + dc) for dr, dc in jumps if 0 <= r + dr < 8 and 0 <= c + dc < 8)
+
+
+"""
+Calculates the (row, col) squares radiating outward from a square in a direction until the edge of the board
+"""
+
+
+def ray_squares(r, c, d) -> tuple:
+    dr, dc = DIRECTIONS[d]
+    return tuple((r + dr * i, c + dc * i) for i in range(1, 8) if 0 <= r + dr * i < 8 and 0 <= c + dc * i < 8)
+
+
+"""
+Converts a sequence of (row, col) squares into a 64-bit mask
+"""
+
+
+def squares_to_mask(squares) -> int:
+    mask = 0
+    for r, c in squares:
+        mask |= SQUARE_BITS[r * 8 + c]
+    return mask
+
+
+# Square lists for the 8x8 board engine, indexed [row][col]
+KNIGHT_SQUARES = tuple(tuple(jump_squares(r, c, KNIGHT_JUMPS) for c in range(8)) for r in range(8))
+KING_SQUARES = tuple(tuple(jump_squares(r, c, DIRECTIONS) for c in range(8)) for r in range(8))
+
+# Squares along each of the 8 directions, indexed [row][col][direction]
+RAY_SQUARES = tuple(tuple(tuple(ray_squares(r, c, d) for d in range(8)) for c in range(8)) for r in range(8))
+
+"""
+Calculates the (row, col) squares strictly between two squares that share a row, column, or diagonal. Squares that
+are not aligned, or are next to each other, have no squares between them
+"""
+
+
+def between_squares(sq1, sq2) -> tuple:
+    r, c = SQUARE_COORDS[sq1]
+    for ray in RAY_SQUARES[r][c]:
+        if SQUARE_COORDS[sq2] in ray:
+            return ray[:ray.index(SQUARE_COORDS[sq2])]
+    return ()
+
+
+# Squares between two squares, indexed [square][square]: as (row, col) lists for the 8x8 board engine and as masks
+# for the bitboard engine. A check by a sliding piece is blocked by moving onto one of the squares between the king
+# and the checking piece
+BETWEEN_SQUARES = tuple(tuple(between_squares(sq1, sq2) for sq2 in range(64)) for sq1 in range(64))
+BETWEEN_MASKS = tuple(tuple(squares_to_mask(squares) for squares in row) for row in BETWEEN_SQUARES)
+
+# Masks for the bitboard engine, indexed by square
+KNIGHT_ATTACKS = tuple(squares_to_mask(KNIGHT_SQUARES[r][c]) for r, c in SQUARE_COORDS)
+KING_ATTACKS = tuple(squares_to_mask(KING_SQUARES[r][c]) for r, c in SQUARE_COORDS)
+
+# Squares attacked by a pawn standing on a square, indexed [color][square] with 0 = white and 1 = black
+PAWN_ATTACKS = (tuple(squares_to_mask(jump_squares(r, c, ((-1, -1), (-1, 1)))) for r, c in SQUARE_COORDS),
+                tuple(squares_to_mask(jump_squares(r, c, ((1, -1), (1, 1)))) for r, c in SQUARE_COORDS))
+
+# Ray masks indexed [direction][square]
+RAYS = tuple(tuple(squares_to_mask(RAY_SQUARES[r][c][d]) for r, c in SQUARE_COORDS) for d in range(8))
+
+"""
+Calculates the squares attacked along one ray: the full ray is cut off behind the closest blocker by removing the
+blocker's own ray in the same direction
+"""
+
+
+def ray_attacks(sq, d, occupied) -> int:
+    ray = RAYS[d][sq]
+    blockers = ray & occupied
+    if not blockers:
+        return ray
+
+    if POSITIVE_DIRECTIONS[d]:
+        blocker = (blockers & -blockers).bit_length() - 1
+    else:
+        blocker = blockers.bit_length() - 1
+
+    return ray ^ RAYS[d][blocker]
+
+
+"""
+Calculates the squares whose occupancy decides the attacks along the line through a square in two opposite
+directions: every square of the two rays except the last one, since a blocker on the edge of the board stops nothing
+further
+"""
+
+
+def line_mask(sq, directions) -> int:
+    mask = 0
+    for d in directions:
+        if RAYS[d][sq]:
+            last = RAY_SQUARES[sq // 8][sq % 8][d][-1]
+            mask |= RAYS[d][sq] & ~SQUARE_BITS[last[0] * 8 + last[1]]
+    return mask
+
+
+"""
+Calculates the attacks along a line for every occupancy of its mask, as a dictionary from the occupied squares of the
+mask to the attacked squares. The subsets of the mask are enumerated with the carry-rippler trick
+"""
+
+
+def line_attack_table(sq, directions, mask) -> dict:
+    table = {}
+    occupied = 0
+    while True:
+        table[occupied] = ray_attacks(sq, directions[0], occupied) | ray_attacks(sq, directions[1], occupied)
+        occupied = (occupied - mask) & mask
+        if occupied == 0:
+            return table
+
+
+# Pairs of opposite directions that make up the lines sliding pieces move along
+FILE_DIRECTIONS = (0, 2)
+RANK_DIRECTIONS = (1, 3)
+DIAGONAL_DIRECTIONS = (4, 7)
+ANTI_DIAGONAL_DIRECTIONS = (5, 6)
+
+# Relevant occupancy masks and attack tables of each line, indexed by square. The attacks of a sliding piece along a
+# line are a single dictionary lookup of the occupied squares of the line's mask
+FILE_MASKS = tuple(line_mask(sq, FILE_DIRECTIONS) for sq in range(64))
+RANK_MASKS = tuple(line_mask(sq, RANK_DIRECTIONS) for sq in range(64))
+DIAGONAL_MASKS = tuple(line_mask(sq, DIAGONAL_DIRECTIONS) for sq in range(64))
+ANTI_DIAGONAL_MASKS = tuple(line_mask(sq, ANTI_DIAGONAL_DIRECTIONS) for sq in range(64))
+FILE_ATTACKS = tuple(line_attack_table(sq, FILE_DIRECTIONS, FILE_MASKS[sq]) for sq in range(64))
+RANK_ATTACKS = tuple(line_attack_table(sq, RANK_DIRECTIONS, RANK_MASKS[sq]) for sq in range(64))
+DIAGONAL_ATTACKS = tuple(line_attack_table(sq, DIAGONAL_DIRECTIONS, DIAGONAL_MASKS[sq]) for sq in range(64))
+ANTI_DIAGONAL_ATTACKS = tuple(line_attack_table(sq, ANTI_DIAGONAL_DIRECTIONS, ANTI_DIAGONAL_MASKS[sq])
+                              for sq in range(64))
+
+"""
+Calculates all squares a rook attacks from a square given the occupied squares on the board
+"""
+
+
+def rook_attacks(sq, occupied) -> int:
+    return FILE_ATTACKS[sq][occupied & FILE_MASKS[sq]] | RANK_ATTACKS[sq][occupied & RANK_MASKS[sq]]
+
+
+"""
+Calculates all squares a bishop attacks from a square given the occupied squares on the board
+"""
+
+
+def bishop_attacks(sq, occupied) -> int:
+    return DIAGONAL_ATTACKS[sq][occupied & DIAGONAL_MASKS[sq]] | \
+        ANTI_DIAGONAL_ATTACKS[sq][occupied & ANTI_DIAGONAL_MASKS[sq]]
+
+
+"""
+Calculates all squares a queen attacks from a square given the occupied squares on the board
+"""
+
+
+def queen_attacks(sq, occupied) -> int:
+    return rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
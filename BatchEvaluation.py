@@ -0,0 +1,166 @@
+"""
+Batch evaluation scores large sets of positions at once with NumPy instead of calling ChessAI.score_board on one
+position at a time. Positions are encoded as piece planes: an N x 12 x 64 array with a 1 wherever a piece of the
+plane's color and type (ordered as PIECE_CODES) stands on a square. The material and positional score of every
+position is then a single dot product of the planes with the piece-square values used by ChessAI, so the scores are
+identical to score_board.
+
+Usage: python BatchEvaluation.py <file with one FEN per line>
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from ChessAI import CHECKMATE, STALEMATE
+from Evaluation import PIECE_SQUARE_VALUES, SCORE_SCALE
+from Zobrist import PIECE_CODES
+
+# Plane of each piece, and of each FEN piece symbol
+PLANE_INDEX = {code: i for i, code in enumerate(PIECE_CODES)}
+FEN_PLANES = {(code[1] if code[0] == 'w' else code[1].lower()): i for i, code in enumerate(PIECE_CODES)}
+
+"""
+Returns the piece-square values of ChessAI as a 12 x 64 array in centipawns, with black pieces counted negatively
+"""
+
+
+def piece_square_weights() -> np.ndarray:
+    return np.array([PIECE_SQUARE_VALUES[code] for code in PIECE_CODES], dtype=np.int64)
+
+
+"""
+Encodes the boards of game states into piece planes
+"""
+
+
+def encode_positions(game_states) -> np.ndarray:
+    planes = np.zeros((len(game_states), len(PIECE_CODES), 64), dtype=np.int8)
+
+    # Collects the index of every piece so that the planes are filled in one assignment
+    positions = []
+    plane_indices = []
+    squares = []
+    for n, gs in enumerate(game_states):
+        for r in range(8):
+            for c in range(8):
+                if gs.board[r][c].team != '-':
+                    positions.append(n)
+                    plane_indices.append(PLANE_INDEX[gs.board[r][c].piece_color_type])
+                    squares.append(r * 8 + c)
+
+    planes[positions, plane_indices, squares] = 1
+    return planes
+
+
+"""
+Encodes the piece placement of FEN strings into piece planes without creating game states, which is much faster for
+large sets of positions
+"""
+
+
+def encode_fens(fens) -> np.ndarray:
+    planes = np.zeros((len(fens), len(PIECE_CODES), 64), dtype=np.int8)
+    planes[fen_piece_indices(fens)] = 1
+    return planes
+
+
+"""
+Reads the pieces of FEN strings without building planes. Returns the position, plane, and square of every piece as
+three arrays, which index the pieces in an N x 12 x 64 array of planes
+"""
+
+
+def fen_piece_indices(fens) -> tuple:
+    positions = []
+    plane_indices = []
+    squares = []
+    for n, fen in enumerate(fens):
+        # Squares are numbered from a8 (row 0) to h1 (row 7), in the same order as the FEN piece placement
+        sq = 0
+        for symbol in fen.split()[0]:
+            if symbol == '/':
+                continue
+            if symbol.isdigit():
+                sq += int(symbol)
+                continue
+            if symbol not in FEN_PLANES or sq > 63:
+                raise ValueError("Invalid FEN piece placement: " + fen)
+            positions.append(n)
+            plane_indices.append(FEN_PLANES[symbol])
+            squares.append(sq)
+            sq += 1
+
+    return np.array(positions, dtype=np.intp), np.array(plane_indices, dtype=np.intp), np.array(squares, dtype=np.intp)
+
+
+"""
+Calculates the material and positional score of every position in the planes, from white's point of view. The
+weights default to ChessAI's piece-square values; other 12 x 64 weights in centipawns may be given instead
+"""
+
+
+def score_planes(planes, weights=None) -> np.ndarray:
+    if weights is None:
+        weights = piece_square_weights()
+
+    return planes.reshape(len(planes), -1) @ weights.reshape(-1) / SCORE_SCALE
+
+
+"""
+Scores game states in the same way as score_board, including checkmate and stalemate once the game states have
+found them (by generating their valid moves)
+"""
+
+
+def evaluate_positions(game_states) -> np.ndarray:
+    scores = score_planes(encode_positions(game_states))
+
+    for n, gs in enumerate(game_states):
+        if gs.checkmate:
+            scores[n] = -CHECKMATE if gs.white_turn else CHECKMATE
+        elif gs.stalemate:
+            scores[n] = STALEMATE
+
+    return scores
+
+
+"""
+Scores FEN strings in the same way as score_board scores a position that has just been loaded. Checkmate and
+stalemate are not detected, since that requires generating the moves of each position
+"""
+
+
+def evaluate_fens(fens) -> np.ndarray:
+    return score_planes(encode_fens(fens))
+
+
+"""
+Reads the FEN strings of a file, one per line. Blank lines are skipped
+"""
+
+
+def load_fens(path) -> list:
+    with open(path) as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+
+    fens = load_fens(sys.argv[1])
+
+    start_time = time.perf_counter()
+    scores = evaluate_fens(fens)
+    elapsed = time.perf_counter() - start_time
+
+    for fen, score in zip(fens, scores):
+        print("%+.1f %s" % (score, fen))
+    print("Scored %d positions in %.2f seconds" % (len(fens), elapsed), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark measures how quickly GameState makes and undoes moves, and how many new objects each move keeps alive
+while it is on the board. A game is played with random moves, and then its moves are made and undone over and over.
+Once the undo records of the game have been created, making a move keeps no new objects alive other than the new
+piece on pawn promotion.
+
+Usage: python Benchmark.py [plies] [passes]
+"""
+
+import random
+import sys
+import time
+
+from ChessEngine import create_game_state
+
+"""
+Plays a reproducible game of random moves and returns the moves played. The game state is returned to the starting
+position afterwards
+"""
+
+
+def play_random_game(gs, plies, seed=1) -> list:
+    rng = random.Random(seed)
+    moves = []
+
+    for _ in range(plies):
+        valid_moves = gs.get_valid_moves()
+        if len(valid_moves) == 0:
+            break
+        move = rng.choice(valid_moves)
+        gs.make_move(move, False)
+        moves.append(move)
+
+    for _ in moves:
+        gs.undo_move()
+
+    return moves
+
+
+"""
+Makes and undoes the moves of a game the given number of times. Returns the number of moves made and undone per
+second and the number of memory blocks allocated per move while every move of the game is made
+"""
+
+
+def benchmark_make_undo(gs, moves, passes) -> tuple:
+    make_move = gs.make_move
+    undo_move = gs.undo_move
+
+    # One pass beforehand so that every undo record of the game exists before memory is measured
+    for move in moves:
+        make_move(move, False)
+    for _ in moves:
+        undo_move()
+
+    blocks_before = sys.getallocatedblocks()
+    for move in moves:
+        make_move(move, False)
+    blocks_per_move = (sys.getallocatedblocks() - blocks_before) / max(len(moves), 1)
+    for _ in moves:
+        undo_move()
+
+    start_time = time.perf_counter()
+
+    for _ in range(passes):
+        for move in moves:
+            make_move(move, False)
+        for _ in moves:
+            undo_move()
+
+    elapsed = time.perf_counter() - start_time
+
+    return len(moves) * passes / elapsed, blocks_per_move
+
+
+def main() -> None:
+    plies = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    passes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    for use_bitboards in (False, True):
+        gs = create_game_state(use_bitboards)
+        moves = play_random_game(gs, plies)
+        moves_per_second, blocks_per_move = benchmark_make_undo(gs, moves, passes)
+
+        print("%-8s %d plies x %d passes: %.0f make/undo pairs per second, %.2f memory blocks per move" %
+              ("bitboard" if use_bitboards else "mailbox", len(moves), passes, moves_per_second, blocks_per_move))
+
+
+if __name__ == "__main__":
+    main()
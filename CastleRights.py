@@ -1,7 +1,27 @@
 """
 Castle rights class allows to keep track of all flags relating to both king and queen side castling.
+
+GameState stores the castling rights as a bitmask of the flags below so that making a move never creates a new
+object. The CastleRights class is the readable form of the bitmask.
 """
 
+WHITE_KING_SIDE = 1
+WHITE_QUEEN_SIDE = 2
+BLACK_KING_SIDE = 4
+BLACK_QUEEN_SIDE = 8
+ALL_CASTLE_RIGHTS = 15
+
+# Rights that remain after a piece moves from or to each square (row * 8 + col). Moving the king or a rook, or
+# capturing a rook on its corner, removes the rights of that king or rook
+CASTLE_RIGHTS_MASK = [ALL_CASTLE_RIGHTS] * 64
+CASTLE_RIGHTS_MASK[0] = ALL_CASTLE_RIGHTS & ~BLACK_QUEEN_SIDE
+CASTLE_RIGHTS_MASK[4] = ALL_CASTLE_RIGHTS & ~(BLACK_KING_SIDE | BLACK_QUEEN_SIDE)
+CASTLE_RIGHTS_MASK[7] = ALL_CASTLE_RIGHTS & ~BLACK_KING_SIDE
+CASTLE_RIGHTS_MASK[56] = ALL_CASTLE_RIGHTS & ~WHITE_QUEEN_SIDE
+CASTLE_RIGHTS_MASK[60] = ALL_CASTLE_RIGHTS & ~(WHITE_KING_SIDE | WHITE_QUEEN_SIDE)
+CASTLE_RIGHTS_MASK[63] = ALL_CASTLE_RIGHTS & ~WHITE_KING_SIDE
+CASTLE_RIGHTS_MASK = tuple(CASTLE_RIGHTS_MASK)
+
 
 class CastleRights:
 
@@ -11,3 +31,20 @@ class CastleRights:
         self.bks = bks
         self.wqs = wqs
         self.bqs = bqs
+
+    """
+    Creates the castle rights described by a bitmask
+    """
+
+    @classmethod
+    def from_bits(cls, bits):
+        return cls(bool(bits & WHITE_KING_SIDE), bool(bits & BLACK_KING_SIDE), bool(bits & WHITE_QUEEN_SIDE),
+                   bool(bits & BLACK_QUEEN_SIDE))
+
+    """
+    Packs the castle rights into a bitmask
+    """
+
+    def to_bits(self) -> int:
+        return (WHITE_KING_SIDE if self.wks else 0) | (WHITE_QUEEN_SIDE if self.wqs else 0) | \
+            (BLACK_KING_SIDE if self.bks else 0) | (BLACK_QUEEN_SIDE if self.bqs else 0)
@@ -5,86 +5,13 @@ and checkmates at a higher weight when deciding which move to make.
 """
 
 import random
+import time
 
-# Dictionary of values representing the score material of each piece
-piece_score = {'K': 0, 'Q': 10, 'R': 5, 'N': 3, 'B': 3, 'P': 1}
-
-# 2D lists that represent the weights of each position on the board depending on the piece
-knight_score = [[1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 2, 2, 2, 2, 2, 2, 1],
-                [1, 2, 3, 3, 3, 3, 2, 1],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [1, 2, 3, 3, 3, 3, 2, 1],
-                [1, 2, 2, 2, 2, 2, 2, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1]]
-
-bishop_score = [[4, 3, 2, 1, 1, 2, 3, 4],
-                [3, 4, 3, 2, 2, 3, 4, 3],
-                [2, 3, 4, 3, 3, 4, 3, 2],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [1, 2, 3, 4, 4, 3, 2, 1],
-                [2, 3, 4, 3, 3, 4, 3, 2],
-                [3, 4, 3, 2, 2, 3, 4, 3],
-                [4, 3, 2, 1, 1, 2, 3, 4]]
-
-queen_score = [[1, 1, 1, 1, 1, 1, 1, 1],
-               [1, 2, 2, 2, 2, 2, 2, 1],
-               [1, 2, 3, 3, 3, 3, 2, 1],
-               [1, 2, 4, 4, 4, 4, 2, 1],
-               [1, 2, 4, 4, 4, 4, 2, 1],
-               [1, 2, 4, 4, 4, 4, 2, 1],
-               [1, 2, 2, 2, 2, 2, 2, 1],
-               [1, 1, 1, 1, 1, 1, 1, 1]]
-
-rook_score = [[4, 4, 4, 4, 4, 4, 4, 4],
-              [4, 4, 4, 4, 4, 4, 4, 4],
-              [3, 3, 3, 3, 3, 3, 3, 3],
-              [1, 2, 4, 4, 4, 4, 2, 1],
-              [1, 2, 4, 4, 4, 4, 2, 1],
-              [3, 3, 3, 3, 3, 3, 3, 3],
-              [4, 4, 4, 4, 4, 4, 4, 4],
-              [4, 4, 4, 4, 4, 4, 4, 4]]
-
-b_king_score = [[5, 5, 5, 1, 1, 5, 5, 5],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1]]
-
-w_king_score = [[1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [5, 5, 5, 5, 5, 5, 5, 5]]
-
-w_pawn_score = [[5, 5, 5, 5, 5, 5, 5, 5],
-                [4, 4, 4, 4, 4, 4, 4, 4],
-                [4, 4, 4, 4, 4, 4, 4, 4],
-                [4, 4, 4, 4, 4, 4, 4, 4],
-                [3, 3, 3, 3, 3, 3, 3, 3],
-                [3, 3, 3, 3, 3, 3, 3, 3],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [0, 0, 0, 0, 0, 0, 0, 0]]
-
-b_pawn_score = [[0, 0, 0, 0, 0, 0, 0, 0],
-                [1, 1, 1, 1, 1, 1, 1, 1],
-                [3, 3, 3, 3, 3, 3, 3, 3],
-                [3, 3, 3, 3, 3, 3, 3, 3],
-                [4, 4, 4, 4, 4, 4, 4, 4],
-                [4, 4, 4, 4, 4, 4, 4, 4],
-                [4, 4, 4, 4, 4, 4, 4, 4],
-                [5, 5, 5, 5, 5, 5, 5, 5]]
-
-# Dictionary of positional weights of each piece
-piece_position_scores = {"bK": b_king_score, "wK": w_king_score, 'Q': queen_score, 'R': rook_score,
-                         'N': knight_score, 'B': bishop_score, "wP": w_pawn_score, "bP": b_pawn_score}
+from TranspositionTable import TranspositionTable, REPLACE_DEPTH, EXACT, LOWER_BOUND, UPPER_BOUND
+from Move import SQUARE_MASK, SQUARES_MASK, END_SHIFT, ENPASSANT_FLAG, PROMOTION_FLAG, CAPTURE_FLAG
+from Move import PROMOTION_PIECES, PROMOTION_SHIFT, NULL_MOVE
+from Material import NON_PAWN_MATERIAL
+from Evaluation import piece_score, load_weights, SCORE_SCALE
 
 # Value to indicate that it is the AI's turn
 HUMAN_TURN = False
@@ -96,11 +23,70 @@ CHECKMATE = 1000
 # Setting stalemate to 0 to avoid moves that would end in a stalemate
 STALEMATE = 0
 
-# Controls the level of recursive calls the AI will undergo when calculating the best move
+# Score of a position drawn by repetition, the fifty-move rule, or insufficient material
+DRAW = 0
+
+# Within the search a position is scored as a draw once it occurs for the second time
+SEARCH_REPETITION_LIMIT = 2
+
+# Default maximum level of recursive calls the AI will undergo when calculating the best move
 DEPTH = 3
 
-# Next move
-NEXT_MOVE = None
+# Default wall-clock limit (in seconds) and node limit of each search. None disables the limit
+TIME_LIMIT = None
+NODE_LIMIT = None
+
+# Number of positions between checks of the time and node limits
+LIMIT_CHECK_INTERVAL = 64
+
+# Plays out captures and promotions past the depth limit before scoring a position
+USE_QUIESCENCE = True
+
+# Transposition table settings. The table size (number of entries) and replacement policy can be tuned per
+# deployment using the hit rate and node counts reported by Searcher.statistics
+USE_TRANSPOSITION_TABLE = True
+TRANSPOSITION_TABLE_SIZE = 2 ** 18
+TRANSPOSITION_TABLE_REPLACEMENT = REPLACE_DEPTH
+
+# Move ordering: the transposition table move first, then the move of the last principal variation, then captures by
+# most valuable victim / least valuable attacker, then the killer moves of the ply, then the remaining quiet moves by
+# their history score
+USE_MOVE_ORDERING = True
+MAX_PLY = 128
+
+# Sort keys of each move category. History scores are capped below the killer moves
+HASH_MOVE_ORDER = 1000000
+PV_MOVE_ORDER = 900000
+CAPTURE_ORDER = 200000
+KILLER_ORDER = (150000, 140000)
+HISTORY_LIMIT = 100000
+
+# Selective search. Principal variation search (PVS) searches the moves after the first with a zero window, which only
+# proves that a move is no better than the best move so far, and searches a move again with the full window when it
+# is better. Null move pruning lets the side to move pass: when a shallower search still fails high after passing,
+# the position is good enough to prune. Late move reductions search the quiet moves late in the move order less deeply
+USE_PVS = True
+USE_NULL_MOVE_PRUNING = True
+USE_LATE_MOVE_REDUCTIONS = True
+
+# Width of a zero window: one centipawn, the smallest difference between two scores
+NULL_WINDOW = 1 / SCORE_SCALE
+
+# The search after a null move is this many plies shallower, and is only tried this many plies from the horizon
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+
+# Quiet moves after the first few are searched this many plies shallower, from this many plies from the horizon
+LATE_MOVE_REDUCTION = 1
+LATE_MOVE_MIN_MOVES = 3
+LATE_MOVE_MIN_DEPTH = 3
+
+# Aspiration windows: each iteration from ASPIRATION_MIN_DEPTH on is searched with a window of ASPIRATION_WINDOW pawns
+# on either side of the previous iteration's score. When the score falls outside the window, the side it fell out of
+# is widened by twice as much as the last time and the iteration is searched again
+USE_ASPIRATION_WINDOWS = True
+ASPIRATION_WINDOW = 0.5
+ASPIRATION_MIN_DEPTH = 3
 
 """
 If the AI is unable to determine the best move, the AI will default to using a 
@@ -113,52 +99,721 @@ def find_random_move(valid_moves):
 
 
 """
-Helper function to start the recursive calls of the Negative-Max Alpha Beta Pruning function
+Raised inside the search once the time or node limit is reached, abandoning the iteration in progress
 """
 
 
-def find_best_move(gs, valid_moves, return_queue):
-    global NEXT_MOVE
+class SearchAborted(Exception):
+    pass
+
+
+class Searcher:
+    """
+    Creates a search with its own configuration, transposition table, move ordering tables, statistics, and result.
+    Searchers share no state, so any number of them can search at once in threads or asyncio tasks as long as each
+    one is given its own game state. The configuration defaults to the module settings, and a transposition table
+    can be passed in to keep using one across searchers
+    """
+
+    def __init__(self, max_depth=None, time_limit=None, node_limit=None, transposition_table=None) -> None:
+        self.max_depth = DEPTH if max_depth is None else max_depth
+        self.time_limit = TIME_LIMIT if time_limit is None else time_limit
+        self.node_limit = NODE_LIMIT if node_limit is None else node_limit
+        self.use_quiescence = USE_QUIESCENCE
+        self.use_transposition_table = USE_TRANSPOSITION_TABLE
+        self.use_move_ordering = USE_MOVE_ORDERING
+        self.use_pvs = USE_PVS
+        self.use_null_move_pruning = USE_NULL_MOVE_PRUNING
+        self.use_late_move_reductions = USE_LATE_MOVE_REDUCTIONS
+        self.use_aspiration_windows = USE_ASPIRATION_WINDOWS
+
+        if transposition_table is None:
+            transposition_table = TranspositionTable(TRANSPOSITION_TABLE_SIZE, TRANSPOSITION_TABLE_REPLACEMENT)
+        self.transposition_table = transposition_table
+
+        # Two quiet moves per ply that most recently caused a cutoff at that ply
+        self.killer_moves = [[None, None] for _ in range(MAX_PLY)]
+
+        # Cutoff history of quiet moves, indexed [0 = white / 1 = black][start and end squares of the move]
+        self.history = [[0] * 4096, [0] * 4096]
+
+        # Best line found at each ply of the search in progress (a triangular principal variation table): the line
+        # of a ply is its best move followed by the line of the next ply
+        self.pv_table = [[] for _ in range(MAX_PLY + 1)]
+
+        # Moves of the last principal variation by the hash of the position they are played from. They are searched
+        # first in the next iteration and in the next search, when the game has followed the expected line
+        self.pv_moves = {}
+
+        # Best move, its score, the line expected to be played from it (principal variation, starting with the best
+        # move), and the depth of the last completed iteration
+        self.best_move = None
+        self.best_score = 0
+        self.pv = []
+        self.completed_depth = 0
+
+        # Number of positions visited, beta cutoffs, and how many of the cutoffs were caused by the first move searched
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+        # Zero window searches repeated with the full window, null moves that pruned a node, and late moves that were
+        # reduced and then searched again to the full depth
+        self.pvs_re_searches = 0
+        self.null_move_cutoffs = 0
+        self.late_move_reductions = 0
+        self.late_move_re_searches = 0
+
+        # Iterations searched again after their score fell below or above the aspiration window
+        self.aspiration_fail_lows = 0
+        self.aspiration_fail_highs = 0
+
+        # Limits of the search in progress. They are only enforced once a root move has been searched so that a move
+        # is always found
+        self.deadline = None
+        self.search_node_limit = None
+
+        # Best root move and its score so far in the iteration in progress
+        self.root_best_move = None
+        self.root_best_score = 0
+
+        # Set by stop to end the search in progress once a move has been found. Cleared when a search starts
+        self.stop_requested = False
+
+        # Optional multiprocessing event that also stops the search when set, so that a search in another process
+        # can be stopped
+        self.stop_event = None
+
+    """
+    Iterative deepening driver that searches depth 1, 2, 3 and so on until the depth, time, or node limit is reached
+    or the search is stopped. Each iteration searches the previous iteration's principal variation first, within an
+    aspiration window around its score. Limits that are not given default to the searcher's configuration. The info
+    callback, if given, is called after each completed iteration with the depth, score, nodes searched, elapsed
+    seconds, and principal variation. The best move from the last completed iteration is returned and placed into the
+    return queue, and its principal variation is kept in pv.
+    """
+
+    def find_best_move(self, gs, valid_moves, return_queue=None, max_depth=None, time_limit=None, node_limit=None,
+                       info_callback=None):
+        max_depth = self.max_depth if max_depth is None else max_depth
+        time_limit = self.time_limit if time_limit is None else time_limit
+        node_limit = self.node_limit if node_limit is None else node_limit
+
+        self.stop_requested = False
+        self.best_move = None
+        self.best_score = 0
+        self.pv = []
+        self.completed_depth = 0
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.reset_selective_statistics()
+        self.root_best_move = None
+        self.transposition_table.new_search()
+        self.reset_move_ordering()
+
+        start_time = time.perf_counter()
+        self.deadline = start_time + time_limit if time_limit is not None else None
+        self.search_node_limit = node_limit
+        root_ply = len(gs.move_log)
+        turn_multiplier = 1 if gs.white_turn else -1
+        root_moves = list(valid_moves)
+        random.shuffle(root_moves)
+
+        # Starts with the move the last search expected to be played here, if the game followed its line
+        pv_move = self.pv_moves.get(gs.zobrist_key)
+        if pv_move in root_moves:
+            root_moves.remove(pv_move)
+            root_moves.insert(0, pv_move)
+
+        # No iterations are needed when the game is over
+        if len(root_moves) == 0:
+            max_depth = 0
+
+        for depth in range(1, max_depth + 1):
+            try:
+                move, score = self.search_iteration(gs, root_moves, depth, turn_multiplier)
+            except SearchAborted:
+                # Takes back the moves of the abandoned iteration
+                while len(gs.move_log) > root_ply:
+                    gs.undo_move()
+
+                # Without a completed iteration, the best of the root moves that were searched is played
+                if self.best_move is None:
+                    self.best_move, self.best_score = self.root_best_move, self.root_best_score
+                break
+
+            self.best_move, self.best_score, self.completed_depth = move, score, depth
+
+            # The line of the root, completed from the transposition table where a stored result cut it short
+            self.pv = self.principal_variation(gs, depth, self.pv_table[0])
+            self.remember_principal_variation(gs)
+
+            if info_callback is not None:
+                info_callback(depth, score, self.nodes, time.perf_counter() - start_time, self.pv)
+
+            # Searches the best move first in the next iteration
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+
+            # Stops early when a forced checkmate has been found, the search was stopped, or a limit has been reached
+            if abs(score) >= CHECKMATE or self.stop_requested:
+                break
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                break
+            if self.search_node_limit is not None and self.nodes >= self.search_node_limit:
+                break
+
+        if return_queue is not None:
+            return_queue.put(self.best_move)
+        return self.best_move
+
+    """
+    Searches one iteration of iterative deepening. From ASPIRATION_MIN_DEPTH on, the root is first searched within a
+    window around the previous iteration's score. A score outside the window is only a bound, so the window is
+    widened on the side the score fell out of until the score lands inside it
+    """
+
+    def search_iteration(self, gs, root_moves, depth, turn_multiplier):
+        alpha = -CHECKMATE
+        beta = CHECKMATE
+        delta = ASPIRATION_WINDOW
+        if self.use_aspiration_windows and depth >= ASPIRATION_MIN_DEPTH and abs(self.best_score) < CHECKMATE:
+            alpha = max(self.best_score - delta, -CHECKMATE)
+            beta = min(self.best_score + delta, CHECKMATE)
+
+        while True:
+            move, score = self.search_root(gs, root_moves, depth, turn_multiplier, alpha, beta)
+
+            if score <= alpha and alpha > -CHECKMATE:
+                self.aspiration_fail_lows += 1
+                delta *= 2
+                alpha = max(alpha - delta, -CHECKMATE)
+            elif score >= beta and beta < CHECKMATE:
+                self.aspiration_fail_highs += 1
+                delta *= 2
+                beta = min(beta + delta, CHECKMATE)
+
+                # Searches the move that failed high first
+                root_moves.remove(move)
+                root_moves.insert(0, move)
+            else:
+                return move, score
+
+    """
+    Searches every root move to the given depth within the window (alpha, beta) and returns the best move with its
+    score. The line of the best move is left in the first row of the principal variation table
+    """
+
+    def search_root(self, gs, root_moves, depth, turn_multiplier, alpha=-CHECKMATE, beta=CHECKMATE):
+        alpha_original = alpha
+        max_score = -CHECKMATE
+        best_move = None
+        self.pv_table[0] = []
+
+        for move in root_moves:
+            gs.make_move(move, HUMAN_TURN)
+            next_moves = gs.get_valid_moves()
+            next_in_check = gs.in_check
+            if self.use_pvs and best_move is not None:
+                score = -self.find_move_negative_max_alpha_beta(gs, next_moves, next_in_check, depth - 1,
+                                                                -alpha - NULL_WINDOW, -alpha, -turn_multiplier)
+                if alpha < score < beta:
+                    self.pvs_re_searches += 1
+                    score = -self.find_move_negative_max_alpha_beta(gs, next_moves, next_in_check, depth - 1, -beta,
+                                                                    -alpha, -turn_multiplier)
+            else:
+                score = -self.find_move_negative_max_alpha_beta(gs, next_moves, next_in_check, depth - 1, -beta,
+                                                                -alpha, -turn_multiplier)
+            gs.undo_move()
+
+            if score > max_score or best_move is None:
+                max_score = score
+                best_move = move
+                self.root_best_move, self.root_best_score = move, score
+
+            if max_score > alpha:
+                alpha = max_score
+                self.pv_table[0] = [move] + self.pv_table[1]
+
+            # The score is above the aspiration window, so the iteration is searched again with a wider one
+            if alpha >= beta:
+                break
+
+        if self.use_transposition_table:
+            if max_score <= alpha_original:
+                bound = UPPER_BOUND
+            elif max_score >= beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            self.transposition_table.store(gs.zobrist_key, depth, bound, max_score, best_move)
+
+        return best_move, max_score
+
+    """
+    Searches a single root move to the given depth within the window (alpha, beta) and returns its score from the
+    side to move's point of view, along with the line expected after the move. Used by the parallel search, which
+    splits the root moves across processes. The caller already has a move to play, so the time and node limits apply
+    from the first position, and SearchAborted is raised once one is reached
+    """
+
+    def search_move(self, gs, move, depth, alpha, beta, time_limit=None, node_limit=None):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.reset_selective_statistics()
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.search_node_limit = node_limit
+        self.root_best_move = move
+
+        root_ply = len(gs.move_log)
+        turn_multiplier = 1 if gs.white_turn else -1
 
-    NEXT_MOVE = None
-    random.shuffle(valid_moves)
-    find_move_negative_max_alpha_beta(gs, valid_moves, DEPTH, -CHECKMATE, CHECKMATE, 1 if gs.white_turn else -1)
-    return_queue.put(NEXT_MOVE)
+        gs.make_move(move, HUMAN_TURN)
+        try:
+            next_moves = gs.get_valid_moves()
+            score = -self.find_move_negative_max_alpha_beta(gs, next_moves, gs.in_check, depth - 1, -beta, -alpha,
+                                                            -turn_multiplier)
+            pv = [move] + self.principal_variation(gs, depth - 1, self.pv_table[1])
+        finally:
+            # Takes back the moves of an abandoned search as well
+            while len(gs.move_log) > root_ply:
+                gs.undo_move()
+
+        return score, pv
+
+    """
+    Clears the counters of the selective search techniques before a new search
+    """
+
+    def reset_selective_statistics(self) -> None:
+        self.pvs_re_searches = 0
+        self.null_move_cutoffs = 0
+        self.late_move_reductions = 0
+        self.late_move_re_searches = 0
+        self.aspiration_fail_lows = 0
+        self.aspiration_fail_highs = 0
+
+    """
+    Ends the search in progress once its current iteration can be abandoned
+    """
+
+    def stop(self) -> None:
+        self.stop_requested = True
+
+    """
+    Forgets the positions searched in earlier games
+    """
+
+    def new_game(self) -> None:
+        self.transposition_table.clear()
+        self.pv_moves = {}
+
+    """
+    Builds the line the search expects to be played from the current position, up to the given number of moves. The
+    line starts with the given moves (from the principal variation table) and is continued by following the best
+    moves stored in the transposition table
+    """
+
+    def principal_variation(self, gs, max_length, line=()) -> list:
+        pv = []
+
+        for move in line[:max_length]:
+            if move not in gs.get_valid_moves():
+                break
+            gs.make_move(move, HUMAN_TURN)
+            pv.append(move)
+
+        while len(pv) < max_length:
+            entry = self.transposition_table.probe(gs.zobrist_key)
+            if entry is None or entry[3] is None or entry[3] not in gs.get_valid_moves():
+                break
+            gs.make_move(entry[3], HUMAN_TURN)
+            pv.append(entry[3])
+
+        for _ in pv:
+            gs.undo_move()
+
+        return pv
+
+    """
+    Remembers the moves of the principal variation by the position they are played from, so that the next iteration
+    and the next search search them first
+    """
+
+    def remember_principal_variation(self, gs) -> None:
+        self.pv_moves = {}
+        for move in self.pv:
+            self.pv_moves[gs.zobrist_key] = move
+            gs.make_move(move, HUMAN_TURN)
+
+        for _ in self.pv:
+            gs.undo_move()
+
+    """
+    Raises SearchAborted once the deadline or node limit of the search has been reached, or the search was stopped.
+    The search continues until at least one root move has been searched, so that there is a move to play
+    """
+
+    def check_search_limits(self) -> None:
+        if self.best_move is None and self.root_best_move is None:
+            return
+        if self.stop_requested or (self.stop_event is not None and self.stop_event.is_set()):
+            raise SearchAborted
+        if self.search_node_limit is not None and self.nodes >= self.search_node_limit:
+            raise SearchAborted
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchAborted
+
+    """
+    The main move calculation that uses Negative-Max Alpha Beta pruning to select the best move 
+    from the given position on the board. With the selective search enabled, the moves after the first are searched
+    with a zero window (PVS), a null move may prune the node before any move is searched, and late quiet moves are
+    searched less deeply unless they turn out to be better than the best move so far. Whether the king is in check is
+    passed along with the valid moves, since the game state's flag is overwritten by the positions searched below
+    """
+
+    def find_move_negative_max_alpha_beta(self, gs, valid_moves, in_check, depth, alpha, beta, turn_multiplier, ply=1):
+        self.nodes += 1
+        if self.nodes % LIMIT_CHECK_INTERVAL == 0:
+            self.check_search_limits()
+
+        # The line of this ply is rebuilt from the moves searched below
+        if ply < MAX_PLY:
+            self.pv_table[ply] = []
+
+        # Checkmate and stalemate are scored directly
+        if len(valid_moves) == 0:
+            return turn_multiplier * score_board(gs)
+
+        # Draws end the line. A position that repeats once is already scored as a draw, since the side that repeated
+        # it can repeat it again, which keeps the search from exploring cycles
+        if gs.is_rule_draw(SEARCH_REPETITION_LIMIT) or gs.has_insufficient_material():
+            return DRAW
+
+        # Base case - returns value of the pieces in a given board position once the exchanges on the board have
+        # been played out by the quiescence search
+        if depth == 0:
+            if not self.use_quiescence:
+                return turn_multiplier * score_board(gs)
+            return self.quiescence_search(gs, alpha, beta, turn_multiplier)
+
+        # Reuses the result of a previous search of the same position if it was searched at least as deep. A
+        # shallower result still provides the best move to search first
+        alpha_original = alpha
+        hash_move = None
+        if self.use_transposition_table:
+            entry = self.transposition_table.probe(gs.zobrist_key)
+            if entry is not None:
+                hash_move = entry[3]
+            if entry is not None and entry[0] >= depth:
+                entry_bound, entry_score = entry[1], entry[2]
+                if entry_bound == EXACT:
+                    return entry_score
+                elif entry_bound == LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                elif entry_bound == UPPER_BOUND:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        # Null move pruning: passes the turn and searches shallower with a zero window at beta. If the opponent can
+        # not bring the score below beta even with a free move, a real move would do at least as well. Passing is
+        # not tried in check, twice in a row, when the static score is already below beta, or when the side to move
+        # has only pawns left, where being forced to move (zugzwang) is common
+        if self.use_null_move_pruning and depth >= NULL_MOVE_MIN_DEPTH and not in_check and beta < CHECKMATE and \
+                gs.move_log[-1] != NULL_MOVE and turn_multiplier * score_material(gs) >= beta and \
+                has_non_pawn_material(gs):
+            gs.make_null_move()
+            next_moves = gs.get_valid_moves()
+            score = -self.find_move_negative_max_alpha_beta(gs, next_moves, gs.in_check,
+                                                            depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + NULL_WINDOW,
+                                                            -turn_multiplier, ply + 1)
+            gs.undo_move()
+            if score >= beta:
+                self.null_move_cutoffs += 1
+                # A checkmate found after passing is not proven for the real moves
+                return beta if score >= CHECKMATE else score
+
+        max_score = -CHECKMATE
+        best_move = None
+
+        if self.use_move_ordering:
+            valid_moves = self.order_moves(gs, valid_moves, hash_move, ply)
+
+        for i, move in enumerate(valid_moves):
+            gs.make_move(move, HUMAN_TURN)
+            next_moves = gs.get_valid_moves()
+            next_in_check = gs.in_check
+
+            # Late quiet moves that do not give check are searched less deeply, unless the king is in check
+            reduction = 0
+            if self.use_late_move_reductions and i >= LATE_MOVE_MIN_MOVES and depth >= LATE_MOVE_MIN_DEPTH and \
+                    not in_check and not next_in_check and not move & (CAPTURE_FLAG | PROMOTION_FLAG):
+                reduction = LATE_MOVE_REDUCTION
+                self.late_move_reductions += 1
+
+            if i == 0 or not (self.use_pvs or reduction):
+                score = -self.find_move_negative_max_alpha_beta(gs, next_moves, next_in_check, depth - 1, -beta,
+                                                                -alpha, -turn_multiplier, ply + 1)
+            else:
+                # Zero window (or, without PVS, full window) search that only has to show the move is no better than
+                # alpha
+                window = -alpha - NULL_WINDOW if self.use_pvs else -beta
+                score = -self.find_move_negative_max_alpha_beta(gs, next_moves, next_in_check, depth - 1 - reduction,
+                                                                window, -alpha, -turn_multiplier, ply + 1)
+
+                # A reduced move that beats alpha is searched again to the full depth
+                if reduction and score > alpha:
+                    self.late_move_re_searches += 1
+                    score = -self.find_move_negative_max_alpha_beta(gs, next_moves, next_in_check, depth - 1, window,
+                                                                    -alpha, -turn_multiplier, ply + 1)
+
+                # A move that beats alpha in the zero window is searched again with the full window for its score
+                if self.use_pvs and alpha < score < beta:
+                    self.pvs_re_searches += 1
+                    score = -self.find_move_negative_max_alpha_beta(gs, next_moves, next_in_check, depth - 1, -beta,
+                                                                    -alpha, -turn_multiplier, ply + 1)
+
+            if score > max_score:
+                max_score = score
+                best_move = move
+            gs.undo_move()
+
+            # Pruning stage. A move that raises alpha becomes the start of this ply's line
+            if max_score > alpha:
+                alpha = max_score
+                if ply < MAX_PLY:
+                    self.pv_table[ply] = [move] + self.pv_table[ply + 1]
+
+            if alpha >= beta:
+                self.cutoffs += 1
+                if i == 0:
+                    self.first_move_cutoffs += 1
+                if not move & (CAPTURE_FLAG | PROMOTION_FLAG):
+                    self.record_quiet_cutoff(gs, move, depth, ply)
+                break
+
+        # Stores the result along with whether it is the exact score or only a bound on it
+        if self.use_transposition_table:
+            if max_score <= alpha_original:
+                bound = UPPER_BOUND
+            elif max_score >= beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            self.transposition_table.store(gs.zobrist_key, depth, bound, max_score, best_move)
+
+        return max_score
+
+    """
+    Sorts moves so that the moves most likely to cause a cutoff are searched first: the transposition table move,
+    then the move of the last principal variation, then captures and promotions by most valuable victim / least
+    valuable attacker, then the killer moves of the ply, then the remaining quiet moves by their history score
+    """
+
+    def order_moves(self, gs, moves, hash_move, ply) -> list:
+        killers = self.killer_moves[ply] if ply < MAX_PLY else (None, None)
+        history = self.history[0 if gs.white_turn else 1]
+
+        pv_move = self.pv_moves.get(gs.zobrist_key)
+
+        def order_key(move):
+            if move == hash_move:
+                return HASH_MOVE_ORDER
+            if move == pv_move:
+                return PV_MOVE_ORDER
+            if move & (CAPTURE_FLAG | PROMOTION_FLAG):
+                return CAPTURE_ORDER + capture_value(gs, move)
+            if move == killers[0]:
+                return KILLER_ORDER[0]
+            if move == killers[1]:
+                return KILLER_ORDER[1]
+            return history[move & SQUARES_MASK]
+
+        return sorted(moves, key=order_key, reverse=True)
+
+    """
+    Remembers a quiet move that caused a cutoff as a killer move of its ply and raises its history score. Deeper
+    cutoffs are weighted more because they prune larger subtrees
+    """
+
+    def record_quiet_cutoff(self, gs, move, depth, ply) -> None:
+        killers = self.killer_moves[ply] if ply < MAX_PLY else None
+        if killers is not None and killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        history = self.history[0 if gs.white_turn else 1]
+        index = move & SQUARES_MASK
+        history[index] += depth * depth
+
+        # Halves every score once one reaches the limit so that recent cutoffs keep their weight
+        if history[index] >= HISTORY_LIMIT:
+            for side in self.history:
+                for i in range(len(side)):
+                    side[i] //= 2
+
+    """
+    Clears the killer moves and ages the history scores before a new search
+    """
+
+    def reset_move_ordering(self) -> None:
+        for killers in self.killer_moves:
+            killers[0] = killers[1] = None
+        for side in self.history:
+            for i in range(len(side)):
+                side[i] //= 2
+
+    """
+    Searches only captures and pawn promotions past the search horizon so that positions are not scored in the
+    middle of an exchange. The side to move may "stand pat" and keep the static score instead of capturing, which
+    allows a cutoff as soon as the static score is good enough. When the king is in check every evasion is searched
+    instead.
+    """
+
+    def quiescence_search(self, gs, alpha, beta, turn_multiplier):
+        self.nodes += 1
+        if self.nodes % LIMIT_CHECK_INTERVAL == 0:
+            self.check_search_limits()
+
+        # Check is tested once: in check every evasion is generated, otherwise only the captures and promotions
+        if gs.is_in_check():
+            moves = gs.get_valid_moves()
+            if len(moves) == 0:
+                return turn_multiplier * score_board(gs)
+            max_score = -CHECKMATE
+        else:
+            # Stand pat
+            max_score = turn_multiplier * score_material(gs)
+            if max_score >= beta:
+                return max_score
+            if max_score > alpha:
+                alpha = max_score
+            moves = gs.get_capture_moves()
+
+        # Most valuable victims first
+        moves.sort(key=lambda capture: capture_value(gs, capture), reverse=True)
+
+        for move in moves:
+            gs.make_move(move, HUMAN_TURN)
+            score = -self.quiescence_search(gs, -beta, -alpha, -turn_multiplier)
+            gs.undo_move()
+
+            if score > max_score:
+                max_score = score
+
+            if max_score > alpha:
+                alpha = max_score
+
+            if alpha >= beta:
+                break
+
+        return max_score
+
+    """
+    Reports the size of the last search and how well the transposition table is performing
+    """
+
+    def statistics(self) -> dict:
+        table = self.transposition_table
+        return {"depth": self.completed_depth,
+                "score": self.best_score,
+                "nodes": self.nodes,
+                "tt_probes": table.probes,
+                "tt_hits": table.hits,
+                "tt_hit_rate": table.hit_rate(),
+                "tt_stores": table.stores,
+                "tt_overwrites": table.overwrites,
+                "cutoffs": self.cutoffs,
+                "first_move_cutoff_rate": self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+                "pvs_re_searches": self.pvs_re_searches,
+                "null_move_cutoffs": self.null_move_cutoffs,
+                "late_move_reductions": self.late_move_reductions,
+                "late_move_re_searches": self.late_move_re_searches,
+                "aspiration_fail_lows": self.aspiration_fail_lows,
+                "aspiration_fail_highs": self.aspiration_fail_highs,
+                "pv": self.pv}
 
 
 """
-The main move calculation that uses Negative-Max Alpha Beta pruning to select the best move 
-from the given position on the board
+Finds the best move with a new searcher, so that every call starts with empty tables. Callers that search the same
+game repeatedly can keep a Searcher instead and reuse its transposition table
 """
 
 
-def find_move_negative_max_alpha_beta(gs, valid_moves, depth, alpha, beta, turn_multiplier):
-    global NEXT_MOVE
+def find_best_move(gs, valid_moves, return_queue, max_depth=None, time_limit=None, node_limit=None,
+                   info_callback=None):
+    return Searcher().find_best_move(gs, valid_moves, return_queue, max_depth, time_limit, node_limit,
+                                     info_callback)
 
-    # Base case - returns value of the pieces in a given board position
-    if depth == 0:
-        return turn_multiplier * score_board(gs)
 
-    max_score = -CHECKMATE
+"""
+Runs a search in the AI's search process. After each completed iteration, the depth, score (from the side to move's
+point of view), and principal variation so far are placed into the progress queue so that the game can display them.
+The best move and its principal variation are placed into the return queue once the search ends. Setting the stop
+event, if given, ends the search once a move has been found. The weight file, if given, is loaded by the process first
+"""
 
-    for move in valid_moves:
-        gs.make_move(move, HUMAN_TURN)
-        next_moves = gs.get_valid_moves()
-        score = -find_move_negative_max_alpha_beta(gs, next_moves, depth - 1, -beta, -alpha, -turn_multiplier)
-        if score > max_score:
-            max_score = score
-            if depth == DEPTH:
-                NEXT_MOVE = move
-        gs.undo_move()
 
-        # Pruning stage
-        if max_score > alpha:
-            alpha = max_score
+def search_worker(gs, valid_moves, return_queue, progress_queue, max_depth=None, time_limit=None,
+                  stop_event=None, weights_file=None) -> None:
+    if weights_file is not None:
+        load_weights(weights_file)
+
+    searcher = Searcher()
+    searcher.stop_event = stop_event
+
+    def report_progress(depth, score, nodes, elapsed, pv):
+        progress_queue.put((depth, score, pv))
+
+    move = searcher.find_best_move(gs, valid_moves, None, max_depth, time_limit, info_callback=report_progress)
+    return_queue.put((move, searcher.pv))
+
+
+"""
+Runs a ponder search in the AI's search process while the opponent is thinking: the opponent's expected reply is made
+on the process's copy of the game state, and the position after it is searched without a time limit until the stop
+event is set or the maximum depth is reached
+"""
+
+
+def ponder_worker(gs, expected_move, return_queue, progress_queue, max_depth, stop_event, weights_file=None) -> None:
+    if weights_file is not None:
+        load_weights(weights_file)
+
+    gs.make_move(expected_move, HUMAN_TURN)
+    search_worker(gs, gs.get_valid_moves(), return_queue, progress_queue, max_depth, None, stop_event)
 
-        if alpha >= beta:
-            break
 
-    return max_score
+"""
+Determines if the side to move has a piece other than pawns and its king, from the material signature kept by the
+game state. Null move pruning is not used without one, since pawn endgames are where zugzwang is common
+"""
+
+
+def has_non_pawn_material(gs) -> bool:
+    return gs.material_key & NON_PAWN_MATERIAL[0 if gs.white_turn else 1] != 0
+
+
+"""
+Orders captures by the value of the captured piece, breaking ties with the least valuable attacker. Promotions count
+as capturing the value the promoted piece adds over the pawn
+"""
+
+
+def capture_value(gs, move) -> int:
+    start_sq = move & SQUARE_MASK
+    end_sq = move >> END_SHIFT & SQUARE_MASK
+    value = 0
+    if move & ENPASSANT_FLAG:
+        value = piece_score['P'] * 10
+    elif move & CAPTURE_FLAG:
+        value = piece_score[gs.board[end_sq >> 3][end_sq & 7].piece_type] * 10
+    if move & PROMOTION_FLAG:
+        value += (piece_score[PROMOTION_PIECES[move >> PROMOTION_SHIFT]] - piece_score['P']) * 10
+    return value - piece_score[gs.board[start_sq >> 3][start_sq & 7].piece_type]
 
 
 """
@@ -178,28 +833,15 @@ def score_board(gs):
     elif gs.stalemate:
         return STALEMATE
 
-    score = 0
-
-    # Add up the material on the board based on piece values and positional score
-    for r in range(0, 8):
-        for c in range(0, 8):
-            piece_on_square = gs.board[r][c]
-            if piece_on_square.team != '-':
-                if piece_on_square.piece_type == 'P':
-                    if piece_on_square.team == 'w':
-                        piece_position_score = piece_position_scores["wP"][r][c]
-                    else:
-                        piece_position_score = piece_position_scores["bP"][r][c]
-                elif piece_on_square.piece_type == 'K':
-                    if piece_on_square.team == 'w':
-                        piece_position_score = piece_position_scores["wK"][r][c]
-                    else:
-                        piece_position_score = piece_position_scores["bK"][r][c]
-                else:
-                    piece_position_score = piece_position_scores[piece_on_square.piece_type][r][c]
-                if gs.board[r][c].team == 'w':
-                    score += piece_score[piece_on_square.piece_type] + piece_position_score * 0.1
-                elif gs.board[r][c].team == 'b':
-                    score -= piece_score[piece_on_square.piece_type] + piece_position_score * 0.1
-
-    return score
+    return score_material(gs)
+
+
+"""
+Calculates score based on piece material and positions on the board only. The game state keeps the score up to date
+as moves are made, so no scan of the board is needed
+"""
+
+
+def score_material(gs):
+    # + score is for white, - score is for black
+    return gs.material_score / SCORE_SCALE
@@ -10,8 +10,49 @@ from Pieces import Knight
 from Pieces import King
 from Pieces import Bishop
 from Pieces import Queen
-from Pieces import Pieces
-from CastleRights import CastleRights
+from Pieces import EMPTY_SQUARE
+from CastleRights import CastleRights, ALL_CASTLE_RIGHTS, CASTLE_RIGHTS_MASK
+from CastleRights import WHITE_KING_SIDE, WHITE_QUEEN_SIDE, BLACK_KING_SIDE, BLACK_QUEEN_SIDE
+from Move import Move, SQUARE_MASK, END_SHIFT, ENPASSANT_FLAG, CASTLE_FLAG, PROMOTION_FLAG
+from Move import PROMOTION_PIECES, PROMOTION_SHIFT, PROMOTION_MASK, NULL_MOVE, encode_move, append_pawn_move
+from AttackTables import SQUARE_COORDS, SQUARE_BITS, DIRECTIONS, RAY_SQUARES, KNIGHT_SQUARES, KING_SQUARES
+from AttackTables import BETWEEN_SQUARES
+from AttackTables import ROOK_DIRECTIONS, BISHOP_DIRECTIONS, QUEEN_DIRECTIONS
+from AttackTables import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS
+from Zobrist import PIECE_KEYS, BLACK_TO_MOVE_KEY, CASTLE_KEYS, ENPASSANT_KEYS, hash_position
+from Material import MATERIAL_KEYS, INSUFFICIENT_MATERIAL, material_signature
+from Evaluation import PIECE_SQUARE_VALUES, count_material
+
+# Fields of an undo record: the pieces moved and captured by the move, and the castling rights, enpassant square,
+# hash, halfmove clock, material score and material signature of the position before the move
+UNDO_PIECE_MOVED = 0
+UNDO_PIECE_CAPTURED = 1
+UNDO_CASTLE_RIGHTS = 2
+UNDO_ENPASSANT_SQUARE = 3
+UNDO_ZOBRIST_KEY = 4
+UNDO_HALFMOVE_CLOCK = 5
+UNDO_MATERIAL_SCORE = 6
+UNDO_MATERIAL_KEY = 7
+
+# Number of undo records allocated up front. Longer games add records as they are reached
+UNDO_STACK_SIZE = 512
+
+# A position that occurs for the third time is a draw (threefold repetition), as is a game that goes 50 moves by
+# each side (100 halfmoves) without a capture or pawn move (fifty-move rule)
+REPETITION_LIMIT = 3
+FIFTY_MOVE_PLIES = 100
+
+# Starting position in Forsyth-Edwards Notation (FEN)
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Piece classes and castling rights of each FEN symbol
+FEN_PIECES = {'P': Pawn, 'N': Knight, 'B': Bishop, 'R': Rook, 'Q': Queen, 'K': King}
+FEN_CASTLE_RIGHTS = {'K': WHITE_KING_SIDE, 'Q': WHITE_QUEEN_SIDE, 'k': BLACK_KING_SIDE, 'q': BLACK_QUEEN_SIDE}
+
+# FEN symbol of each piece on the board, and of each castling right in FEN order
+FEN_SYMBOLS = {team + piece_type: piece_type if team == 'w' else piece_type.lower()
+               for team in ('w', 'b') for piece_type in FEN_PIECES}
+FEN_CASTLE_ORDER = (('K', WHITE_KING_SIDE), ('Q', WHITE_QUEEN_SIDE), ('k', BLACK_KING_SIDE), ('q', BLACK_QUEEN_SIDE))
 
 
 class GameState:
@@ -34,7 +75,7 @@ class GameState:
         # 70 wR wN wB wQ wK wB wK wR
 
         # Creates a 2d list that represents the board
-        self.board = [[Pieces(r, c, "-") for r in range(8)] for c in range(8)]
+        self.board = [[EMPTY_SQUARE for _ in range(8)] for _ in range(8)]
 
         # Creates black and white pawns in rows 1 and 6
         for i in range(8):
@@ -61,8 +102,13 @@ class GameState:
         self.board[7][6] = Knight(7, 6, 'w')
         self.board[7][7] = Rook(7, 7, 'w')
 
-        # Move log
+        # Move log of packed moves, and the position it starts from. The start position and the move log together
+        # describe the game, so that another game state can replay it
         self.move_log = []
+        self.start_fen = START_FEN
+
+        # Undo records of each ply, preallocated and reused so that making a move does not create new objects
+        self.undo_stack = [[EMPTY_SQUARE, EMPTY_SQUARE, 0, (), 0, 0, 0, 0] for _ in range(UNDO_STACK_SIZE)]
 
         # player turn counter
         # 1 = White
@@ -78,6 +124,9 @@ class GameState:
         self.pins = []
         self.checks = []
 
+        # Squares attacked by the enemy of the side to move, as a 64-bit mask (see get_attack_map)
+        self.attack_map = 0
+
         # These might not be used
         self.stalemate = False
         self.checkmate = False
@@ -85,28 +134,212 @@ class GameState:
 
         # enpassant
         self.enpassant_square = ()
-        self.enpassant_possible_log = [self.enpassant_square]
 
-        # Castling
-        self.current_castle_rights = CastleRights(True, True, True, True)
-        self.castle_logs = [CastleRights(self.current_castle_rights.wks, self.current_castle_rights.bks,
-                                         self.current_castle_rights.wqs, self.current_castle_rights.bqs)]
+        # Castling rights bitmask (see CastleRights.py)
+        self.castle_rights = ALL_CASTLE_RIGHTS
+
+        # Number of moves since the last capture or pawn move, and the number of the current full move (which starts
+        # at 1 and increases after black moves)
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
 
         # Controls game mode
         self.game_mode = "HVH"
 
+        # Zobrist hash of the current position, updated incrementally by make_move and restored by undo_move
+        self.zobrist_key = hash_position(self)
+
+        # Number of times each position (by its hash) has occurred in the game, including the current position.
+        # Counted up by make_move and down by undo_move, so repetitions are found without replaying the game
+        self.position_counts = {self.zobrist_key: 1}
+
+        # Material and positional score of the pieces on the board in centipawns (see Evaluation.py), updated
+        # incrementally by make_move and restored by undo_move
+        self.material_score = count_material(self)
+
+        # Number of pieces of each kind on each side (see Material.py), updated incrementally by make_move and
+        # restored by undo_move
+        self.material_key = material_signature(self)
+
     """
-    Function that moves the piece from its starting square to the ending square. The move is then saved into the move 
-    log so that it can later be undone if the player chooses to. Also saves information to determine if the move 
-    was castling, pawn promotion, or en-passant.
+    Replaces the position with the one described by a FEN string (piece placement, side to move, castling rights,
+    enpassant square, and the optional halfmove clock and fullmove number). The move log is cleared, so moves can not
+    be undone past the loaded position.
+    """
+
+    def load_fen(self, fen) -> None:
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError("Invalid FEN: " + fen)
+
+        rows = fields[0].split('/')
+        if len(rows) != 8:
+            raise ValueError("Invalid FEN piece placement: " + fields[0])
+
+        # Piece placement from the 8th rank (row 0) down to the 1st rank (row 7)
+        self.board = [[EMPTY_SQUARE for _ in range(8)] for _ in range(8)]
+        for r, row in enumerate(rows):
+            c = 0
+            for symbol in row:
+                if symbol.isdigit():
+                    c += int(symbol)
+                    continue
+                if c > 7 or symbol.upper() not in FEN_PIECES:
+                    raise ValueError("Invalid FEN piece placement: " + fields[0])
+
+                team = 'w' if symbol.isupper() else 'b'
+                piece = FEN_PIECES[symbol.upper()]
+                if piece is Bishop:
+                    self.board[r][c] = Bishop(r, c, team, Bishop.get_square_color(r, c))
+                else:
+                    self.board[r][c] = piece(r, c, team)
+
+                if piece is King:
+                    if team == 'w':
+                        self.white_king_loc = (r, c)
+                    else:
+                        self.black_king_loc = (r, c)
+                c += 1
+
+        # Side to move
+        if fields[1] not in ('w', 'b'):
+            raise ValueError("Invalid FEN side to move: " + fields[1])
+        self.white_turn = fields[1] == 'w'
+
+        # Castling rights
+        self.castle_rights = 0
+        for symbol in fields[2]:
+            if symbol in FEN_CASTLE_RIGHTS:
+                self.castle_rights |= FEN_CASTLE_RIGHTS[symbol]
+            elif symbol != '-':
+                raise ValueError("Invalid FEN castling rights: " + fields[2])
+
+        # Enpassant square
+        if fields[3] == '-':
+            self.enpassant_square = ()
+        else:
+            if len(fields[3]) != 2 or fields[3][0] not in Move.files_to_cols or fields[3][1] not in Move.ranks_to_rows:
+                raise ValueError("Invalid FEN enpassant square: " + fields[3])
+            self.enpassant_square = (Move.ranks_to_rows[fields[3][1]], Move.files_to_cols[fields[3][0]])
+
+            # Kept only when the side to move has a pawn next to the pawn that moved two squares, as in make_move
+            pawn_row = self.enpassant_square[0] + (1 if self.white_turn else -1)
+            capturer = 'w' if self.white_turn else 'b'
+            if not 0 <= pawn_row < 8 or not self.has_enpassant_capturer(pawn_row, self.enpassant_square[1], capturer):
+                self.enpassant_square = ()
+
+        # Halfmove clock and fullmove number, which some FEN strings leave out
+        try:
+            self.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+            self.fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError("Invalid FEN move counters: " + fen)
+
+        self.move_log = []
+        self.in_check = False
+        self.pins = []
+        self.checks = []
+        self.stalemate = False
+        self.checkmate = False
+        self.draw = False
+        self.zobrist_key = hash_position(self)
+        self.position_counts = {self.zobrist_key: 1}
+        self.material_score = count_material(self)
+        self.material_key = material_signature(self)
+        self.start_fen = self.get_fen()
+
+    """
+    Writes the position as a FEN string
+    """
+
+    def get_fen(self) -> str:
+        rows = []
+        for r in range(8):
+            row = ''
+            empty_squares = 0
+            for c in range(8):
+                piece = self.board[r][c]
+                if piece.team == '-':
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    row += str(empty_squares)
+                    empty_squares = 0
+                row += FEN_SYMBOLS[piece.piece_color_type]
+            if empty_squares:
+                row += str(empty_squares)
+            rows.append(row)
+
+        castling = ''.join(symbol for symbol, right in FEN_CASTLE_ORDER if self.castle_rights & right) or '-'
+        if self.enpassant_square == ():
+            enpassant = '-'
+        else:
+            enpassant = Move.cols_to_files[self.enpassant_square[1]] + Move.rows_to_ranks[self.enpassant_square[0]]
+
+        return ' '.join(('/'.join(rows), 'w' if self.white_turn else 'b', castling, enpassant,
+                         str(self.halfmove_clock), str(self.fullmove_number)))
+
+    """
+    Function that moves the piece from its starting square to the ending square. The move is a packed integer (see
+    Move.py). The move is then saved into the move log, and everything needed to undo it is saved into the undo
+    record of the ply so that it can later be undone if the player chooses to. Castling, pawn promotion, and
+    en-passant are read from the move's flags.
     """
 
     def make_move(self, move, human_turn) -> None:
+        # Humans choose which pawn promotion they'd like. The move is logged with the chosen piece so that it is
+        # written and compared as the move that was actually played
+        if move & PROMOTION_FLAG and human_turn:
+            move = move & ~PROMOTION_MASK | PROMOTION_PIECES.index(self.choose_promotion_piece()) << PROMOTION_SHIFT
+
+        board = self.board
+        start_sq = move & SQUARE_MASK
+        end_sq = move >> END_SHIFT & SQUARE_MASK
+        start_row = start_sq >> 3
+        start_col = start_sq & 7
+        end_row = end_sq >> 3
+        end_col = end_sq & 7
+        piece_moved = board[start_row][start_col]
+        captured_row = start_row if move & ENPASSANT_FLAG else end_row
+        piece_captured = board[captured_row][end_col]
+
+        # Saves the state the move is about to change into the undo record of this ply. The records are reused so
+        # that no new objects are created while searching
+        ply = len(self.move_log)
+        if ply == len(self.undo_stack):
+            self.undo_stack.append([EMPTY_SQUARE, EMPTY_SQUARE, 0, (), 0, 0, 0, 0])
+        record = self.undo_stack[ply]
+        record[UNDO_PIECE_MOVED] = piece_moved
+        record[UNDO_PIECE_CAPTURED] = piece_captured
+        record[UNDO_CASTLE_RIGHTS] = self.castle_rights
+        record[UNDO_ENPASSANT_SQUARE] = self.enpassant_square
+        record[UNDO_ZOBRIST_KEY] = self.zobrist_key
+        record[UNDO_HALFMOVE_CLOCK] = self.halfmove_clock
+        record[UNDO_MATERIAL_SCORE] = self.material_score
+        record[UNDO_MATERIAL_KEY] = self.material_key
+
+        # Removes the moving piece, the captured piece, the previous enpassant file and castling rights from the hash
+        # and switches the side to move
+        key = self.zobrist_key ^ BLACK_TO_MOVE_KEY ^ CASTLE_KEYS[self.castle_rights]
+        key ^= PIECE_KEYS[piece_moved.piece_color_type][start_sq]
+        if piece_captured.team != '-':
+            key ^= PIECE_KEYS[piece_captured.piece_color_type][captured_row * 8 + end_col]
+        if self.enpassant_square != ():
+            key ^= ENPASSANT_KEYS[self.enpassant_square[1]]
+
+        # Removes the values of the moving piece and the captured piece from the material score and the material
+        # signature in the same way
+        material_score = self.material_score - PIECE_SQUARE_VALUES[piece_moved.piece_color_type][start_sq]
+        material_key = self.material_key - MATERIAL_KEYS[piece_moved.piece_color_type][start_sq]
+        if piece_captured.team != '-':
+            material_score -= PIECE_SQUARE_VALUES[piece_captured.piece_color_type][captured_row * 8 + end_col]
+            material_key -= MATERIAL_KEYS[piece_captured.piece_color_type][captured_row * 8 + end_col]
+
         # Sets starting position to empty piece because the moving piece will no longer be at that location
-        self.board[move.start_row][move.start_col] = Pieces(move.start_row, move.start_col, "-")
+        board[start_row][start_col] = EMPTY_SQUARE
 
         # Sets ending location to the piece that was located at the starting position
-        self.board[move.end_row][move.end_col] = move.piece_moved
+        board[end_row][end_col] = piece_moved
 
         # Appends the move into the move log
         self.move_log.append(move)
@@ -114,126 +347,179 @@ class GameState:
         # Changes player turn
         self.white_turn = not self.white_turn
 
+        # The halfmove clock restarts on captures and pawn moves, and the full move ends once black has moved
+        if piece_captured.team != '-' or piece_moved.piece_type == 'P':
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if piece_moved.team == 'b':
+            self.fullmove_number += 1
+
         # Updates king positions if they've moved
-        if move.piece_moved.piece_color_type == "bK":
-            self.black_king_loc = (move.end_row, move.end_col)
-        elif move.piece_moved.piece_color_type == "wK":
-            self.white_king_loc = (move.end_row, move.end_col)
-
-        # Pawn promotion
-        if move.is_pawn_promotion:
-            # Humans choose which pawn promotion they'd like
-            if human_turn:
-                while True:
-                    try:
-                        piece_promotion = input("Pawn Promotion. Which piece would you like: Q, N, R?").upper()
-                        if piece_promotion == 'Q' or piece_promotion == 'B' or \
-                                piece_promotion == 'N' or piece_promotion == 'R':
-                            break
-                        else:
-                            raise ValueError
-                    except ValueError:
-                        print("Invalid input. Try again.")
-
-                # Replaces the pawn into either Q, B, R, or N once it has reach the enemies back row
-                match piece_promotion:
-                    case 'Q':
-                        self.board[move.end_row][move.end_col] = Queen(move.end_row, move.end_col,
-                                                                       move.piece_moved.team)
-                    case 'B':
-                        if self.white_turn:
-                            if (move.end_row == 0 and move.end_col == 0) or ((move.end_row + move.end_col) % 2 == 0):
-                                bishop_square_color = "Light"
-                            else:
-                                bishop_square_color = "Dark"
-                        else:
-                            if (move.end_row == 7 and move.end_col == 0) or ((move.end_row + move.end_col) % 2 == 1):
-                                bishop_square_color = "Dark"
-                            else:
-                                bishop_square_color = "Light"
-
-                        self.board[move.end_row][move.end_col] = Bishop(move.end_row, move.end_col,
-                                                                        move.piece_moved.team, bishop_square_color)
-                    case 'R':
-                        self.board[move.end_row][move.end_col] = Rook(move.end_row, move.end_col, move.piece_moved.team)
-                    case 'N':
-                        self.board[move.end_row][move.end_col] = Knight(move.end_row, move.end_col,
-                                                                        move.piece_moved.team)
-            else:  # AI's automatically choose Queen as their pawn promotion
-                self.board[move.end_row][move.end_col] = Queen(move.end_row, move.end_col, move.piece_moved.team)
+        if piece_moved.piece_type == 'K':
+            if piece_moved.team == 'b':
+                self.black_king_loc = SQUARE_COORDS[end_sq]
+            else:
+                self.white_king_loc = SQUARE_COORDS[end_sq]
+
+        # Pawn promotion, to the promotion piece of the move, which is a Queen unless specified otherwise
+        if move & PROMOTION_FLAG:
+            piece_promotion = PROMOTION_PIECES[move >> PROMOTION_SHIFT]
+
+            # Replaces the pawn into either Q, B, R, or N once it has reach the enemies back row
+            match piece_promotion:
+                case 'Q':
+                    board[end_row][end_col] = Queen(end_row, end_col, piece_moved.team)
+                case 'B':
+                    board[end_row][end_col] = Bishop(end_row, end_col, piece_moved.team,
+                                                     Bishop.get_square_color(end_row, end_col))
+                case 'R':
+                    board[end_row][end_col] = Rook(end_row, end_col, piece_moved.team)
+                case 'N':
+                    board[end_row][end_col] = Knight(end_row, end_col, piece_moved.team)
 
         # Enpassant
-        if move.is_enpassant_move:
-            self.board[move.start_row][move.end_col] = Pieces(move.start_row, move.end_col, "-")
-
-        if move.piece_moved.piece_type == 'P' and abs(move.start_row - move.end_row) == 2:
-            self.enpassant_square = (((move.end_row + move.start_row) // 2), move.end_col)
+        if move & ENPASSANT_FLAG:
+            board[start_row][end_col] = EMPTY_SQUARE
+
+        # The enpassant square is only set when an enemy pawn stands next to the pawn that moved two squares. Otherwise
+        # no capture is possible, and the position must hash the same as it would without the pawn move for
+        # repetitions to be found
+        if piece_moved.piece_type == 'P' and abs(start_row - end_row) == 2 and \
+                self.has_enpassant_capturer(end_row, end_col, 'b' if piece_moved.team == 'w' else 'w'):
+            self.enpassant_square = SQUARE_COORDS[(start_sq + end_sq) >> 1]
         else:
             self.enpassant_square = ()
 
-        self.enpassant_possible_log.append(self.enpassant_square)
-
-        # Castling
-        self.update_castle_rights(move)
+        # Castling rights are lost once the king or a rook leaves its starting square or a rook is captured on it
+        self.castle_rights &= CASTLE_RIGHTS_MASK[start_sq] & CASTLE_RIGHTS_MASK[end_sq]
 
         # Moving rooks for castling
-        if move.is_castle_move:
-            if move.end_col - move.start_col == 2:  # king
-                if 0 <= move.end_col - 1 < 8 and 0 <= move.end_col + 1 < 8:
-                    self.board[move.end_row][move.end_col - 1] = self.board[move.end_row][move.end_col + 1]
-                    self.board[move.end_row][move.end_col + 1] = Pieces(move.end_row, move.end_col + 1, "-")
+        if move & CASTLE_FLAG:
+            if end_col - start_col == 2:  # king
+                if 0 <= end_col - 1 < 8 and 0 <= end_col + 1 < 8:
+                    board[end_row][end_col - 1] = board[end_row][end_col + 1]
+                    board[end_row][end_col + 1] = EMPTY_SQUARE
+                    key ^= self.hash_castle_rook(end_row, end_col + 1, end_col - 1)
+                    material_score += self.score_castle_rook(end_row, end_col + 1, end_col - 1)
             else:  # Queen
-                if 0 <= move.end_col + 1 < 8 and 0 <= move.end_col - 2 < 8:
-                    self.board[move.end_row][move.end_col + 1] = self.board[move.end_row][move.end_col - 2]
-                    self.board[move.end_row][move.end_col - 2] = Pieces(move.end_row, move.end_col - 2, "-")
+                if 0 <= end_col + 1 < 8 and 0 <= end_col - 2 < 8:
+                    board[end_row][end_col + 1] = board[end_row][end_col - 2]
+                    board[end_row][end_col - 2] = EMPTY_SQUARE
+                    key ^= self.hash_castle_rook(end_row, end_col - 2, end_col + 1)
+                    material_score += self.score_castle_rook(end_row, end_col - 2, end_col + 1)
+
+        # Adds the piece placed on the ending square (the promoted piece on pawn promotion), the new enpassant file
+        # and the new castling rights to the hash
+        key ^= PIECE_KEYS[board[end_row][end_col].piece_color_type][end_sq]
+        if self.enpassant_square != ():
+            key ^= ENPASSANT_KEYS[self.enpassant_square[1]]
+        key ^= CASTLE_KEYS[self.castle_rights]
+        self.zobrist_key = key
+        self.position_counts[key] = self.position_counts.get(key, 0) + 1
+        self.material_score = material_score + PIECE_SQUARE_VALUES[board[end_row][end_col].piece_color_type][end_sq]
+        self.material_key = material_key + MATERIAL_KEYS[board[end_row][end_col].piece_color_type][end_sq]
 
     """
-    Updates the castling rights to signify if castling is possible for queen or king side
+    Determines if a pawn of a team stands next to a square, where it could capture a pawn that has just moved two
+    squares onto that square enpassant
     """
 
-    def update_castle_rights(self, move) -> None:
+    def has_enpassant_capturer(self, row, col, team) -> bool:
+        board_row = self.board[row]
+        pawn = team + 'P'
+        return (col > 0 and board_row[col - 1].piece_color_type == pawn) or \
+            (col < 7 and board_row[col + 1].piece_color_type == pawn)
 
-        # If either w/b king has moved
-        if move.piece_captured.piece_color_type == 'wK':
-            self.current_castle_rights.wks = False
-            self.current_castle_rights.wqs = False
+    """
+    Asks the human which piece to promote a pawn into
+    """
+
+    @staticmethod
+    def choose_promotion_piece() -> str:
+        while True:
+            try:
+                piece_promotion = input("Pawn Promotion. Which piece would you like: Q, N, R?").upper()
+                if piece_promotion == 'Q' or piece_promotion == 'B' or \
+                        piece_promotion == 'N' or piece_promotion == 'R':
+                    return piece_promotion
+                else:
+                    raise ValueError
+            except ValueError:
+                print("Invalid input. Try again.")
 
-        elif move.piece_captured.piece_color_type == 'bK':
-            self.current_castle_rights.bks = False
-            self.current_castle_rights.bqs = False
+    """
+    Calculates the change to the hash from the rook that has just moved from one column to another when castling
+    """
+
+    def hash_castle_rook(self, row, from_col, to_col) -> int:
+        rook = self.board[row][to_col]
+        if rook.team == '-':
+            return 0
 
-        # If either w/b rook has moved
-        elif move.piece_captured.piece_color_type == 'wR':
-            if move.start_row == 7:
-                if move.start_col == 0:
-                    self.current_castle_rights.wqs = False
-                elif move.start_col == 7:
-                    self.current_castle_rights.wks = False
+        rook_keys = PIECE_KEYS[rook.piece_color_type]
+        return rook_keys[row * 8 + from_col] ^ rook_keys[row * 8 + to_col]
+
+    """
+    Calculates the change to the material score from the rook that has just moved from one column to another when
+    castling
+    """
+
+    def score_castle_rook(self, row, from_col, to_col) -> int:
+        rook = self.board[row][to_col]
+        if rook.team == '-':
+            return 0
+
+        rook_values = PIECE_SQUARE_VALUES[rook.piece_color_type]
+        return rook_values[row * 8 + to_col] - rook_values[row * 8 + from_col]
+
+    """
+    Whether the position is drawn by repetition or the fifty-move rule, where a position counts as repeated once it
+    has occurred the given number of times. A checkmate on the last move of the fifty takes precedence, so the caller
+    checks for checkmate first
+    """
+
+    def is_rule_draw(self, repetitions=REPETITION_LIMIT) -> bool:
+        return self.position_counts[self.zobrist_key] >= repetitions or self.halfmove_clock >= FIFTY_MOVE_PLIES
+
+    """
+    Passes the turn to the other side without moving a piece. Used by the AI's null move pruning, which never makes a
+    null move while the king is in check. The null move is logged and undone with undo_move like any other move
+    """
 
-            # Checks to see if a white rook was captured, unable to castle
-            if move.end_row == 7:
-                if move.end_col == 0:
-                    self.current_castle_rights.wqs = False
-                elif move.end_col == 7:
-                    self.current_castle_rights.wks = False
+    def make_null_move(self) -> None:
+        ply = len(self.move_log)
+        if ply == len(self.undo_stack):
+            self.undo_stack.append([EMPTY_SQUARE, EMPTY_SQUARE, 0, (), 0, 0, 0, 0])
+        record = self.undo_stack[ply]
+        record[UNDO_PIECE_MOVED] = EMPTY_SQUARE
+        record[UNDO_PIECE_CAPTURED] = EMPTY_SQUARE
+        record[UNDO_CASTLE_RIGHTS] = self.castle_rights
+        record[UNDO_ENPASSANT_SQUARE] = self.enpassant_square
+        record[UNDO_ZOBRIST_KEY] = self.zobrist_key
+        record[UNDO_HALFMOVE_CLOCK] = self.halfmove_clock
+        record[UNDO_MATERIAL_SCORE] = self.material_score
+        record[UNDO_MATERIAL_KEY] = self.material_key
+
+        # The enpassant capture is lost by passing
+        key = self.zobrist_key ^ BLACK_TO_MOVE_KEY
+        if self.enpassant_square != ():
+            key ^= ENPASSANT_KEYS[self.enpassant_square[1]]
+        self.zobrist_key = key
+        self.position_counts[key] = self.position_counts.get(key, 0) + 1
 
-        elif move.piece_captured.piece_color_type == 'bR':
-            if move.start_row == 0:
-                if move.start_col == 0:
-                    self.current_castle_rights.bqs = False
-                elif move.start_col == 7:
-                    self.current_castle_rights.bks = False
+        self.enpassant_square = ()
+        self.halfmove_clock += 1
+        self.white_turn = not self.white_turn
+        self.move_log.append(NULL_MOVE)
 
-            # Checks to see if at white rook was captured, unable to castle
-            if move.end_row == 0:
-                if move.end_col == 0:
-                    self.current_castle_rights.bqs = False
-                elif move.end_col == 7:
-                    self.current_castle_rights.bks = False
+    """
+    Readable form of the castling rights bitmask
+    """
 
-        # Update the castle log to keep track of castling
-        self.castle_logs.append(CastleRights(self.current_castle_rights.wks, self.current_castle_rights.bks,
-                                             self.current_castle_rights.wqs, self.current_castle_rights.bqs))
+    @property
+    def current_castle_rights(self) -> CastleRights:
+        return CastleRights.from_bits(self.castle_rights)
 
     """
     Function that undoes moves made on the board. 
@@ -244,44 +530,86 @@ class GameState:
             print('Can not UNDO at the start of the game')
             return
 
-        # Removes last move from move log to get the information about the move (i.e. piece moved and piece captured)
+        # Removes last move from move log and restores the pieces and state saved in its undo record
         move = self.move_log.pop()
-        self.board[move.start_row][move.start_col] = move.piece_moved
-        self.board[move.end_row][move.end_col] = move.piece_captured
+        record = self.undo_stack[len(self.move_log)]
+
+        # The position being left is no longer part of the game
+        count = self.position_counts[self.zobrist_key] - 1
+        if count:
+            self.position_counts[self.zobrist_key] = count
+        else:
+            del self.position_counts[self.zobrist_key]
+        self.draw = False
+
+        # A null move only changed the side to move and the state that depends on it
+        if move == NULL_MOVE:
+            self.white_turn = not self.white_turn
+            self.enpassant_square = record[UNDO_ENPASSANT_SQUARE]
+            self.halfmove_clock = record[UNDO_HALFMOVE_CLOCK]
+            self.zobrist_key = record[UNDO_ZOBRIST_KEY]
+            return
+        piece_moved = record[UNDO_PIECE_MOVED]
+        piece_captured = record[UNDO_PIECE_CAPTURED]
+
+        board = self.board
+        start_sq = move & SQUARE_MASK
+        end_sq = move >> END_SHIFT & SQUARE_MASK
+        start_row = start_sq >> 3
+        start_col = start_sq & 7
+        end_row = end_sq >> 3
+        end_col = end_sq & 7
+        board[start_row][start_col] = piece_moved
+        board[end_row][end_col] = piece_captured
         self.white_turn = not self.white_turn
 
         # Update Kings location to previous location
-        if move.piece_moved.piece_color_type == "bK":
-            self.black_king_loc = (move.start_row, move.start_col)
-        elif move.piece_moved.piece_color_type == "wK":
-            self.white_king_loc = (move.start_row, move.start_col)
+        if piece_moved.piece_type == 'K':
+            if piece_moved.team == 'b':
+                self.black_king_loc = SQUARE_COORDS[start_sq]
+            else:
+                self.white_king_loc = SQUARE_COORDS[start_sq]
 
         # Update enpassant to previous configuration
-        if move.is_enpassant_move:
-            self.board[move.end_row][move.end_col] = Pieces(move.start_row, move.start_col, "-")
-            self.board[move.start_row][move.end_col] = move.piece_captured
+        if move & ENPASSANT_FLAG:
+            board[end_row][end_col] = EMPTY_SQUARE
+            board[start_row][end_col] = piece_captured
 
-        self.enpassant_possible_log.pop()
-        self.enpassant_square = self.enpassant_possible_log[-1]
+        self.enpassant_square = record[UNDO_ENPASSANT_SQUARE]
+        self.castle_rights = record[UNDO_CASTLE_RIGHTS]
+        self.halfmove_clock = record[UNDO_HALFMOVE_CLOCK]
+        if piece_moved.team == 'b':
+            self.fullmove_number -= 1
 
-        # Undo castling
-        self.castle_logs.pop()
-        self.current_castle_rights = self.castle_logs[-1]
+        # Restores the hash and material score of the previous position
+        self.zobrist_key = record[UNDO_ZOBRIST_KEY]
+        self.material_score = record[UNDO_MATERIAL_SCORE]
+        self.material_key = record[UNDO_MATERIAL_KEY]
 
         # Undo Moving rooks for castling
-        if move.is_castle_move:
-            if move.end_col - move.start_col == 2:  # king
-                if (0 <= move.end_col + 1 < 8) and (0 <= move.end_col - 1 < 8):
-                    self.board[move.end_row][move.end_col + 1] = self.board[move.end_row][move.end_col - 1]
-                    self.board[move.end_row][move.end_col - 1] = Pieces(move.end_row, move.end_col - 1, "-")
-            elif (0 <= move.end_col - 2 < 8) and (0 <= move.end_col + 1 < 8):  # Queen
-                self.board[move.end_row][move.end_col - 2] = self.board[move.end_row][move.end_col + 1]
-                self.board[move.end_row][move.end_col + 1] = Pieces(move.end_row, move.end_col + 1, "-")
+        if move & CASTLE_FLAG:
+            if end_col - start_col == 2:  # king
+                if (0 <= end_col + 1 < 8) and (0 <= end_col - 1 < 8):
+                    board[end_row][end_col + 1] = board[end_row][end_col - 1]
+                    board[end_row][end_col - 1] = EMPTY_SQUARE
+            elif (0 <= end_col - 2 < 8) and (0 <= end_col + 1 < 8):  # Queen
+                board[end_row][end_col - 2] = board[end_row][end_col + 1]
+                board[end_row][end_col + 1] = EMPTY_SQUARE
 
         # Undo checkmate/stalemate
         self.checkmate = False
         self.stalemate = False
 
+    """
+    Creates the Move object of a move in the move log, for displaying the move and writing it in chess notation
+    """
+
+    def get_logged_move(self, index) -> Move:
+        if index < 0:
+            index += len(self.move_log)
+        record = self.undo_stack[index]
+        return Move.from_record(self.move_log[index], record[UNDO_PIECE_MOVED], record[UNDO_PIECE_CAPTURED])
+
     """
     Calculates all legal and valid moves on the board while considering if the king is in check
     """
@@ -294,6 +622,9 @@ class GameState:
         # Calculates if the king is in check, the piece that are pinned and protecting the king, and checks
         self.in_check, self.pins, self.checks = self.check_for_pins_checks(self.white_king_loc, self.black_king_loc)
 
+        # Squares the king can not move onto, calculated once for all king moves and castling
+        self.attack_map = self.get_attack_map()
+
         if self.white_turn:
             king_row = self.white_king_loc[0]
             king_col = self.white_king_loc[1]
@@ -305,42 +636,11 @@ class GameState:
             # If the king is in check from one piece, the king is able to move, other pieces can block the
             # attacking piece, other pieces can capture the attacking piece if possible
             if len(self.checks) == 1:
-                moves = self.get_all_possible_moves()
-
-                # Check information: the direction and square the enemy piece is attacking from
-                check = self.checks[0]
-                check_row = check[0]
-                check_col = check[1]
-
-                # Get information from attacking piece
-                piece_checking = self.board[check_row][check_col]
-
-                # List of all valid squares from the king toward the attacking piece. Pieces can block the check by 
-                # positioning onto any of these squares.
-                valid_squares = []
-
-                # If the attacking piece is a knight, the valid move would be to move the king or capture the knight
-                if piece_checking.piece_type == 'N':
-                    valid_squares = [(check_row, check_col)]
-                else:
-                    # Generates all valid square from the king toward the direction the attacking piece is positioned
-                    for i in range(1, 8):
-                        valid_square = (king_row + check[2] * i, king_col + check[3] * i)
-                        valid_squares.append(valid_square)
-                        if valid_square[0] == check_row and valid_square[1] == check_col:
-                            break
-
-                # Removes all moves that wouldn't position a piece onto the valid square that would block the attack
-                for i in range(len(moves) - 1, -1, -1):
-                    if moves[i].piece_moved.piece_type != 'K':
-                        if not (moves[i].end_row, moves[i].end_col) in valid_squares:
-                            moves.remove(moves[i])
+                moves = self.get_check_evasions(king_row, king_col)
             # If the king is being attacked by multiple pieces, the king must move, no 1 piece can block all attacks
             else:
-                self.board[king_row][king_col].get_piece_move(king_row, king_col, moves, self.board,
-                                                              self.check_for_pins_checks, self.white_king_loc,
-                                                              self.black_king_loc, self.current_castle_rights,
-                                                              self.square_under_attack)
+                self.board[king_row][king_col].get_piece_move(king_row, king_col, moves, self.board, self.attack_map,
+                                                              self.castle_rights)
         else:
             # if not in check, all possible moves are each piece can make is valid
             moves = self.get_all_possible_moves()
@@ -360,6 +660,75 @@ class GameState:
 
         return moves
 
+    """
+    Calculates the legal moves when the king is in check from exactly one piece without generating every move: the
+    king steps out of check, or another piece captures the checking piece or moves onto a square between it and the
+    king. Instead of generating all moves and filtering them, the pieces that reach each of those target squares are
+    looked up from the target square itself. Pinned pieces can never resolve a check, so they are skipped
+    """
+
+    def get_check_evasions(self, king_row, king_col) -> list:
+        moves = []
+        board = self.board
+        ally = 'w' if self.white_turn else 'b'
+
+        # King moves onto the squares the enemy does not attack
+        board[king_row][king_col].get_piece_move(king_row, king_col, moves, board, self.attack_map, self.castle_rights)
+
+        check_row, check_col = self.checks[0][0], self.checks[0][1]
+        pinned_squares = [(pin[0], pin[1]) for pin in self.pins]
+
+        # Pawns move up the board (toward row 0) for white and down for black
+        forward = -1 if self.white_turn else 1
+        start_row = 6 if self.white_turn else 1
+
+        # The checking piece followed by the squares between it and the king (none for knights and pawns)
+        targets = ((check_row, check_col),) + BETWEEN_SQUARES[king_row * 8 + king_col][check_row * 8 + check_col]
+        for end_row, end_col in targets:
+            # Knights that jump onto the target square
+            for r, c in KNIGHT_SQUARES[end_row][end_col]:
+                if board[r][c].team == ally and board[r][c].piece_type == 'N' and (r, c) not in pinned_squares:
+                    moves.append(encode_move(r, c, end_row, end_col, board))
+
+            # The closest piece in each direction slides onto the target square if it moves along that direction
+            for d in QUEEN_DIRECTIONS:
+                for r, c in RAY_SQUARES[end_row][end_col][d]:
+                    piece = board[r][c]
+                    if piece.team == '-':
+                        continue
+                    if piece.team == ally and (r, c) not in pinned_squares and \
+                            (piece.piece_type == 'Q' or piece.piece_type == ('R' if d in ROOK_DIRECTIONS else 'B')):
+                        moves.append(encode_move(r, c, end_row, end_col, board))
+                    break
+
+            # Pawns capture the checking piece diagonally and advance onto the empty squares between
+            r = end_row - forward
+            if not 0 <= r < 8:
+                continue
+            if (end_row, end_col) == (check_row, check_col):
+                for c in (end_col - 1, end_col + 1):
+                    if 0 <= c < 8 and board[r][c].team == ally and board[r][c].piece_type == 'P' and \
+                            (r, c) not in pinned_squares:
+                        append_pawn_move(moves, r, c, end_row, end_col, board)
+            elif board[r][end_col].team == ally and board[r][end_col].piece_type == 'P':
+                if (r, end_col) not in pinned_squares:
+                    append_pawn_move(moves, r, end_col, end_row, end_col, board)
+            elif board[r][end_col].team == '-' and r - forward == start_row and \
+                    board[start_row][end_col].team == ally and board[start_row][end_col].piece_type == 'P' and \
+                    (start_row, end_col) not in pinned_squares:
+                append_pawn_move(moves, start_row, end_col, end_row, end_col, board)
+
+        # A pawn that gives check right after advancing two squares can be captured enpassant by the pawns beside it
+        if self.enpassant_square == (check_row + forward, check_col):
+            for c in (check_col - 1, check_col + 1):
+                if 0 <= c < 8 and board[check_row][c].team == ally and board[check_row][c].piece_type == 'P' and \
+                        (check_row, c) not in pinned_squares and \
+                        Pawn.enpassant_threats(check_row, c, self.white_turn, board, self.white_king_loc,
+                                               self.black_king_loc, c > check_col):
+                    append_pawn_move(moves, check_row, c, check_row + forward, check_col, board, enpassant_move=True)
+
+        return moves
+
     """
     Calculates checks, pins, and if the king is currently in check by using a radial algorithm to detect if there is 
     an attacking piece from any of the 8 directions. 
@@ -382,86 +751,58 @@ class GameState:
             start_row = black_king_loc[0]  # starting position for bk is 0
             start_col = black_king_loc[1]  # starting position for bk is 4
 
-        # Values that represent the 8 directions on the board
-        directions = (
-            (-1, 0),  # 0 Up
-            (0, -1),  # 1 Left
-            (1, 0),  # 2 Down
-            (0, 1),  # 3 Right
-            (-1, -1),  # 4 Top left diagonal
-            (-1, 1),  # 5 Top right diagonal
-            (1, -1),  # 6  Bottom left diagonal
-            (1, 1),  # 7 Bottom right diagonal
-        )
-
         # Identify checks for pawn, queen, bishop, king, rook by:
-        for i in range(len(directions)):
-            # Iterating through each of the 8 directions on the board with the king as its origin
-            d = directions[i]
+        for i in range(len(DIRECTIONS)):
+            # Iterating through each of the 8 precomputed rays on the board with the king as its origin
+            d = DIRECTIONS[i]
             possible_pin = ()
-            for j in range(1, 8):
-                # Radiates outward until a piece has been detected
-                end_row = start_row + d[0] * j
-                end_col = start_col + d[1] * j
-
-                if 0 <= end_row < 8 and 0 <= end_col < 8:
-
-                    # Saves the information of the given piece
-                    end_piece = self.board[end_row][end_col]
+            for j, (end_row, end_col) in enumerate(RAY_SQUARES[start_row][start_col][i], 1):
+                # Saves the information of the given piece
+                end_piece = self.board[end_row][end_col]
 
-                    # Determines if the piece is a piece of the same color
-                    if end_piece.team == ally and end_piece.piece_type != 'K':
-                        # if the piece is the same color, then it could potentially be blocking an attacking piece
+                # Determines if the piece is a piece of the same color
+                if end_piece.team == ally and end_piece.piece_type != 'K':
+                    # if the piece is the same color, then it could potentially be blocking an attacking piece
+                    if possible_pin == ():
+                        possible_pin = (end_row, end_col, d[0], d[1])
+                    else:
+                        break
+                elif end_piece.team == enemy_team:
+                    piece_type = end_piece.piece_type
+
+                    # In the event that the detected piece is attacking the king we check the following:
+                    # Rook in the same row, bishop on the same diagonal, pawn on the same column, a queen (queen
+                    # can move any direction and will always be an attacking piece no matter the direction), and
+                    # a king one square away
+                    if (0 <= i <= 3 and piece_type == 'R') or (4 <= i <= 7 and piece_type == 'B') or \
+                            (j == 1 and piece_type == 'P' and
+                             ((enemy_team == 'w' and 6 <= i <= 7) or (enemy_team == 'b' and 4 <= i <= 5))) or \
+                            (piece_type == 'Q') or (j == 1 and piece_type == 'K'):
+                        # If the possible_pin list is empty, then there isn't any piece blocking the attack and the
+                        # king is in check from a piece in a given direction
                         if possible_pin == ():
-                            possible_pin = (end_row, end_col, d[0], d[1])
-                        else:
+                            in_check = True
+                            checks.append((end_row, end_col, d[0], d[1]))
                             break
-                    elif end_piece.team == enemy_team:
-                        piece_type = end_piece.piece_type
-
-                        # In the event that the detected piece is attacking the king we check the following:
-                        # Rook in the same row, bishop on the same diagonal, pawn on the same column, a queen (queen
-                        # can move any direction and will always be an attacking piece no matter the direction), and
-                        # a king one square away
-                        if (0 <= i <= 3 and piece_type == 'R') or (4 <= i <= 7 and piece_type == 'B') or \
-                                (j == 1 and piece_type == 'P' and
-                                 ((enemy_team == 'w' and 6 <= i <= 7) or (enemy_team == 'b' and 4 <= i <= 5))) or \
-                                (piece_type == 'Q') or (j == 1 and piece_type == 'K'):
-                            # If the possible_pin list is empty, then there isn't any piece blocking the attack and the
-                            # king is in check from a piece in a given direction
-                            if possible_pin == ():
-                                in_check = True
-                                checks.append((end_row, end_col, d[0], d[1]))
-                                break
-                            # If the possible_pin is not empty, then there is a blocking piece that is protecting the
-                            # king and therefore pinned, restricting the movement to only the direction the pin is
-                            # happening from
-                            else:
-                                pins.append(possible_pin)
-                                break
+                        # If the possible_pin is not empty, then there is a blocking piece that is protecting the
+                        # king and therefore pinned, restricting the movement to only the direction the pin is
+                        # happening from
                         else:
+                            pins.append(possible_pin)
                             break
-                else:
-                    break
-
-        # determines the positions the knight is able to attack from
-        knight_moves = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
-
-        for k_moves in knight_moves:
-
-            # calculates the location a knight can attack the king from
-            end_row = start_row + k_moves[0]
-            end_col = start_col + k_moves[1]
+                    else:
+                        break
 
-            if 0 <= end_row < 8 and 0 <= end_col < 8:
+        # Checks the precomputed positions a knight is able to attack the king from
+        for end_row, end_col in KNIGHT_SQUARES[start_row][start_col]:
 
-                # Checks to see if there is a knight at the position a knight could attack from
-                # and if there is a knight, the king is now in check
-                end_piece = self.board[end_row][end_col]
+            # Checks to see if there is a knight at the position a knight could attack from
+            # and if there is a knight, the king is now in check
+            end_piece = self.board[end_row][end_col]
 
-                if end_piece.team == enemy_team and end_piece.piece_type == 'N':
-                    in_check = True
-                    checks.append((end_row, end_col, k_moves[0], k_moves[1]))
+            if end_piece.team == enemy_team and end_piece.piece_type == 'N':
+                in_check = True
+                checks.append((end_row, end_col, end_row - start_row, end_col - start_col))
 
         return in_check, pins, checks
 
@@ -484,51 +825,103 @@ class GameState:
                                                         self.white_king_loc,
                                                         self.black_king_loc, self.enpassant_square)
                     elif self.board[r][c].piece_type == 'K':
-                        self.board[r][c].get_piece_move(r, c, moves, self.board, self.check_for_pins_checks,
-                                                        self.white_king_loc, self.black_king_loc,
-                                                        self.current_castle_rights,
-                                                        self.square_under_attack)
+                        self.board[r][c].get_piece_move(r, c, moves, self.board, self.attack_map,
+                                                        self.castle_rights)
                     else:
                         self.board[r][c].get_piece_move(r, c, moves, self.board, self.pins)
 
         return moves
 
     """
-    Checks for ending game conditions that would results in a draw: King vs king, king and bishop vs king, 
-    king and knight vs king, king and bishop vs king and bishop (same color bishop)
+    Calculates the legal captures and pawn promotions for the side to move without generating quiet moves. Used by
+    the AI's quiescence search, which only asks for them when the king is not in check (see is_in_check)
     """
 
-    def check_for_draw(self) -> None:
+    def get_capture_moves(self) -> list:
+        self.in_check, self.pins, self.checks = self.check_for_pins_checks(self.white_king_loc, self.black_king_loc)
 
-        pieces_on_board = []
+        moves = []
+        for r in range(len(self.board)):
+            for c in range(len(self.board[r])):
+                team = self.board[r][c].team
 
-        # Scans to see which pieces are on the board
-        for r in range(0, 8):
-            for c in range(0, 8):
-                if self.board[r][c].team != '-':
-                    pieces_on_board.append(self.board[r][c])
+                if (team == 'w' and self.white_turn) or (team == 'b' and not self.white_turn):
+                    if self.board[r][c].piece_type == 'P':
+                        self.board[r][c].get_piece_captures(r, c, self.white_turn, moves, self.board, self.pins,
+                                                            self.white_king_loc, self.black_king_loc,
+                                                            self.enpassant_square)
+                    elif self.board[r][c].piece_type == 'K':
+                        # The attack map is only needed when the king has an enemy piece beside it to capture
+                        if any(self.board[end_row][end_col].team not in ('-', team)
+                               for end_row, end_col in KING_SQUARES[r][c]):
+                            self.board[r][c].get_piece_captures(r, c, moves, self.board, self.get_attack_map())
+                    else:
+                        self.board[r][c].get_piece_captures(r, c, moves, self.board, self.pins)
 
-        # 1- king vs king
-        if len(pieces_on_board) == 2:
-            self.draw = True
+        return moves
 
-        # 2- King and bishop vs. king
-        # 3- King and knight vs. king
-        elif len(pieces_on_board) == 3:
-            for i in range(len(pieces_on_board)):
-                if pieces_on_board[i].piece_type == 'B' or pieces_on_board[i].piece_type == 'N':
-                    self.draw = True
-                    break
+    """
+    Determines if the king of the side to move is in check, without calculating pins or generating moves
+    """
 
-        # King and bishop vs. king and bishop (Same color bishop)
-        elif len(pieces_on_board) == 4:
-            bishop_square_color = ''
-            for i in range(len(pieces_on_board)):
-                if pieces_on_board[i].piece_type == 'B':
-                    if pieces_on_board[i].square_color == bishop_square_color:
-                        self.draw = True
-                    else:
-                        bishop_square_color = pieces_on_board[i].square_color
+    def is_in_check(self) -> bool:
+        if self.white_turn:
+            return self.square_under_attack(self.white_king_loc[0], self.white_king_loc[1], self.board, 'w')
+        return self.square_under_attack(self.black_king_loc[0], self.black_king_loc[1], self.board, 'b')
+
+    """
+    Calculates every square attacked by the enemy of the side to move as a 64-bit mask (bit row * 8 + col, see
+    AttackTables). The king of the side to move is transparent to sliding pieces, so a square behind the king on a
+    checking ray is attacked as well and the king can not escape by stepping back along the ray
+    """
+
+    def get_attack_map(self) -> int:
+        board = self.board
+        enemy_team = 'b' if self.white_turn else 'w'
+        pawn_attacks = PAWN_ATTACKS[1 if self.white_turn else 0]
+        attack_map = 0
+
+        for r, row in enumerate(board):
+            for c, piece in enumerate(row):
+                if piece.team != enemy_team:
+                    continue
+
+                piece_type = piece.piece_type
+                if piece_type == 'P':
+                    attack_map |= pawn_attacks[r * 8 + c]
+                elif piece_type == 'N':
+                    attack_map |= KNIGHT_ATTACKS[r * 8 + c]
+                elif piece_type == 'K':
+                    attack_map |= KING_ATTACKS[r * 8 + c]
+                else:
+                    directions = ROOK_DIRECTIONS if piece_type == 'R' else BISHOP_DIRECTIONS if piece_type == 'B' \
+                        else QUEEN_DIRECTIONS
+                    for d in directions:
+                        for end_row, end_col in RAY_SQUARES[r][c][d]:
+                            attack_map |= SQUARE_BITS[end_row * 8 + end_col]
+                            end_piece = board[end_row][end_col]
+                            if end_piece.team != '-' and (end_piece.piece_type != 'K' or end_piece.team == enemy_team):
+                                break
+
+        return attack_map
+
+    """
+    Checks for ending game conditions that would results in a draw: threefold repetition, the fifty-move rule (unless
+    the last move gave checkmate), king vs king, king and bishop vs king, king and knight vs king, king and bishop vs
+    king and bishop (same color bishop)
+    """
+
+    def check_for_draw(self) -> None:
+        # Repetitions, the halfmove clock and the material signature are kept up to date by make_move, so these
+        # draws need no scan of the board
+        self.draw = self.has_insufficient_material() or (not self.checkmate and self.is_rule_draw())
+
+    """
+    Whether neither side has enough pieces left to checkmate (see Material.INSUFFICIENT_MATERIAL)
+    """
+
+    def has_insufficient_material(self) -> bool:
+        return self.material_key in INSUFFICIENT_MATERIAL
 
     """
     Calculates if there is any attacking pieces on a given square
@@ -544,53 +937,50 @@ class GameState:
             enemy_team = 'w'
             ally = 'b'
 
-        directions = (
-            (-1, 0),  # 0 Up
-            (0, -1),  # 1 Left
-            (1, 0),  # 2 Down
-            (0, 1),  # 3 Right
-            (-1, -1),  # 4 Top left diagonal
-            (-1, 1),  # 5 Top right diagonal
-            (1, -1),  # 6  Bottom left diagonal
-            (1, 1),  # 7 Bottom right diagonal
-        )
+        for i in range(len(DIRECTIONS)):
+            for j, (end_row, end_col) in enumerate(RAY_SQUARES[r][c][i], 1):
+                end_piece = board[end_row][end_col]
 
-        for i in range(len(directions)):
-            d = directions[i]
-            for j in range(1, 8):
-                end_row = r + d[0] * j
-                end_col = c + d[1] * j
+                if end_piece.team == ally:
+                    break
+                elif end_piece.team == enemy_team:
+                    piece_type = end_piece.piece_type
+
+                    # Piece is under attack if any of the below conditionals are met
+                    if (0 <= i <= 3 and piece_type == 'R') or (4 <= i <= 7 and piece_type == 'B') or \
+                            (j == 1 and piece_type == 'P' and
+                             ((enemy_team == 'w' and 6 <= i <= 7) or (enemy_team == 'b' and 4 <= i <= 5))) or \
+                            (piece_type == 'Q') or (j == 1 and piece_type == 'K'):
+                        return True
+                    else:
+                        break
 
-                if 0 <= end_row < 8 and 0 <= end_col < 8:
+        # Identifies if a knight is attacking a square
+        for end_row, end_col in KNIGHT_SQUARES[r][c]:
+            end_piece = board[end_row][end_col]
 
-                    end_piece = board[end_row][end_col]
+            # Piece is under attack by a knight
+            if end_piece.team == enemy_team and end_piece.piece_type == 'N':
+                return True
 
-                    if end_piece.team == ally:
-                        break
-                    elif end_piece.team == enemy_team:
-                        piece_type = end_piece.piece_type
-
-                        # Piece is under attack if any of the below conditionals are met
-                        if (0 <= i <= 3 and piece_type == 'R') or (4 <= i <= 7 and piece_type == 'B') or \
-                                (j == 1 and piece_type == 'P' and
-                                 ((enemy_team == 'w' and 6 <= i <= 7) or (enemy_team == 'b' and 4 <= i <= 5))) or \
-                                (piece_type == 'Q') or (j == 1 and piece_type == 'K'):
-                            return True
-                        else:
-                            break
+        return False
 
-        knight_moves = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
 
-        # Identifies if a knight is attacking a square
-        for k_moves in knight_moves:
-            end_row = r + k_moves[0]
-            end_col = c + k_moves[1]
+"""
+Creates the game state used by the game and the AI. The bitboard engine keeps the same public surface as GameState
+but generates moves with set operations on 64-bit integers
+"""
 
-            if 0 <= end_row < 8 and 0 <= end_col < 8:
-                end_piece = board[end_row][end_col]
 
-                # Piece is under attack by a knight
-                if end_piece.team == enemy_team and end_piece.piece_type == 'N':
-                    return True
+def create_game_state(use_bitboards=False, fen=None) -> GameState:
+    if use_bitboards:
+        # Imported here because the bitboard engine is built on top of GameState
+        from Bitboard import BitboardGameState
+        gs = BitboardGameState()
+    else:
+        gs = GameState()
 
-        return False
+    if fen is not None:
+        gs.load_fen(fen)
+
+    return gs
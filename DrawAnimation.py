@@ -1,12 +1,17 @@
 import pygame
 import os
 
+from Move import move_squares, uci_notation
+
 # Variables to control attributes of the games window
 BOARD_WIDTH = BOARD_HEIGHT = 800
 
 # Variables to control move log width and height
 MOVE_LOG_RECTANGLE_WIDTH = 250
 MOVE_LOG_RECTANGLE_HEIGHT = BOARD_HEIGHT
+
+# Number of moves of the AI's principal variation shown while it is searching
+PV_DISPLAY_LENGTH = 5
 DIMENSION = 8
 
 # Variable to control the size of the images and squares
@@ -18,10 +23,21 @@ IMAGES = {}
 # Colors
 colors = [pygame.Color("white"), pygame.Color("tan")]
 
-# Variables to manage/create game window
-WIN = pygame.display.set_mode((BOARD_WIDTH + MOVE_LOG_RECTANGLE_WIDTH, BOARD_HEIGHT))
-WIN.fill(pygame.Color("white"))
-pygame.display.set_caption("Chess")
+# Game window, created by create_window so that importing this module does not open a window (i.e. in the AI's
+# search process)
+WIN = None
+
+"""
+Creates the game window
+"""
+
+
+def create_window() -> None:
+    global WIN
+    WIN = pygame.display.set_mode((BOARD_WIDTH + MOVE_LOG_RECTANGLE_WIDTH, BOARD_HEIGHT))
+    WIN.fill(pygame.Color("white"))
+    pygame.display.set_caption("Chess")
+
 
 """
 Loads the images for each piece into IMAGES list
@@ -71,8 +87,9 @@ def highlight_move_squares(gs, valid_moves, sq_selected) -> None:
 
             # Finds the matching move with row and column to highlight square a piece is able to move to
             for move in valid_moves:
-                if move.start_row == r and move.start_col == c:
-                    WIN.blit(s, (move.end_col * SQ_SIZE, move.end_row * SQ_SIZE))
+                start_row, start_col, end_row, end_col = move_squares(move)
+                if start_row == r and start_col == c:
+                    WIN.blit(s, (end_col * SQ_SIZE, end_row * SQ_SIZE))
 
 
 """
@@ -112,11 +129,12 @@ def draw_pieces(board) -> None:
 
 
 """
-Draws the move log (located on the right side of the screen) and the text of each move
+Draws the move log (located on the right side of the screen) and the text of each move. While the AI is thinking, its
+progress (depth, best move, and score so far) is drawn above the game mode
 """
 
 
-def draw_move_log(gs, font) -> None:
+def draw_move_log(gs, font, ai_progress=None) -> None:
     # Creates the black rectangle where the move log will be placed on the screen
     move_log_rect = pygame.Rect(BOARD_WIDTH, 0, MOVE_LOG_RECTANGLE_WIDTH, MOVE_LOG_RECTANGLE_HEIGHT)
     pygame.draw.rect(WIN, pygame.Color("black"), move_log_rect)
@@ -138,9 +156,9 @@ def draw_move_log(gs, font) -> None:
 
     # Concatenates the number with the specific move in chess notation
     for i in range(0, len(move_log), 2):
-        move_string = str(i // 2 + 1) + ". " + str(move_log[i]) + ' '
+        move_string = str(i // 2 + 1) + ". " + str(gs.get_logged_move(i)) + ' '
         if i + 1 < len(move_log):
-            move_string += str(move_log[i + 1]) + ' '
+            move_string += str(gs.get_logged_move(i + 1)) + ' '
 
         move_texts.append(move_string)
 
@@ -156,6 +174,15 @@ def draw_move_log(gs, font) -> None:
         WIN.blit(text_object, text_location)
         text_y += text_object.get_height() + line_space
     
+    # Prints the progress of the AI's search and the start of the line it expects to be played
+    if ai_progress is not None:
+        depth, score, pv = ai_progress
+        text_object = font.render("AI thinking: depth %d (%+.2f)" % (depth, score), True, pygame.Color("white"))
+        WIN.blit(text_object, move_log_rect.move(padding, 630))
+        text_object = font.render(" ".join(uci_notation(move) for move in pv[:PV_DISPLAY_LENGTH]), True,
+                                  pygame.Color("white"))
+        WIN.blit(text_object, move_log_rect.move(padding, 650))
+
     # Moves the text further down the move log
     text_y = 670
 
@@ -198,12 +225,12 @@ Draws the entire state of the board, pieces and board included
 """
 
 
-def draw_game_state(gs, valid_moves, sq_selected, move_log_font) -> None:
+def draw_game_state(gs, valid_moves, sq_selected, move_log_font, ai_progress=None) -> None:
     draw_board()
     highlight_move_squares(gs, valid_moves, sq_selected)
     highlight_king_under_attack(gs)
     draw_pieces(gs.board)
-    draw_move_log(gs, move_log_font)
+    draw_move_log(gs, move_log_font, ai_progress)
 
 
 """
@@ -0,0 +1,182 @@
+"""
+Evaluation holds the values the AI scores positions with: the material value of each piece and the positional weight
+of each square for each piece, combined into piece-square values in centipawns. The front ends replace the values
+with those of a weight file written by Tuner.py by calling load_weights when they are given one. GameState keeps the
+sum of the piece-square values of the pieces on the board up to date, so the values live apart from the search and the
+board does not depend on it.
+"""
+
+import json
+import os
+
+from Zobrist import PIECE_CODES
+
+# Dictionary of values representing the score material of each piece
+piece_score = {'K': 0, 'Q': 10, 'R': 5, 'N': 3, 'B': 3, 'P': 1}
+
+# 2D lists that represent the weights of each position on the board depending on the piece
+knight_score = [[1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 2, 2, 2, 2, 2, 2, 1],
+                [1, 2, 3, 3, 3, 3, 2, 1],
+                [1, 2, 3, 4, 4, 3, 2, 1],
+                [1, 2, 3, 4, 4, 3, 2, 1],
+                [1, 2, 3, 3, 3, 3, 2, 1],
+                [1, 2, 2, 2, 2, 2, 2, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1]]
+
+bishop_score = [[4, 3, 2, 1, 1, 2, 3, 4],
+                [3, 4, 3, 2, 2, 3, 4, 3],
+                [2, 3, 4, 3, 3, 4, 3, 2],
+                [1, 2, 3, 4, 4, 3, 2, 1],
+                [1, 2, 3, 4, 4, 3, 2, 1],
+                [2, 3, 4, 3, 3, 4, 3, 2],
+                [3, 4, 3, 2, 2, 3, 4, 3],
+                [4, 3, 2, 1, 1, 2, 3, 4]]
+
+queen_score = [[1, 1, 1, 1, 1, 1, 1, 1],
+               [1, 2, 2, 2, 2, 2, 2, 1],
+               [1, 2, 3, 3, 3, 3, 2, 1],
+               [1, 2, 4, 4, 4, 4, 2, 1],
+               [1, 2, 4, 4, 4, 4, 2, 1],
+               [1, 2, 4, 4, 4, 4, 2, 1],
+               [1, 2, 2, 2, 2, 2, 2, 1],
+               [1, 1, 1, 1, 1, 1, 1, 1]]
+
+rook_score = [[4, 4, 4, 4, 4, 4, 4, 4],
+              [4, 4, 4, 4, 4, 4, 4, 4],
+              [3, 3, 3, 3, 3, 3, 3, 3],
+              [1, 2, 4, 4, 4, 4, 2, 1],
+              [1, 2, 4, 4, 4, 4, 2, 1],
+              [3, 3, 3, 3, 3, 3, 3, 3],
+              [4, 4, 4, 4, 4, 4, 4, 4],
+              [4, 4, 4, 4, 4, 4, 4, 4]]
+
+b_king_score = [[5, 5, 5, 1, 1, 5, 5, 5],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1]]
+
+w_king_score = [[1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [5, 5, 5, 5, 5, 5, 5, 5]]
+
+w_pawn_score = [[5, 5, 5, 5, 5, 5, 5, 5],
+                [4, 4, 4, 4, 4, 4, 4, 4],
+                [4, 4, 4, 4, 4, 4, 4, 4],
+                [4, 4, 4, 4, 4, 4, 4, 4],
+                [3, 3, 3, 3, 3, 3, 3, 3],
+                [3, 3, 3, 3, 3, 3, 3, 3],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [0, 0, 0, 0, 0, 0, 0, 0]]
+
+b_pawn_score = [[0, 0, 0, 0, 0, 0, 0, 0],
+                [1, 1, 1, 1, 1, 1, 1, 1],
+                [3, 3, 3, 3, 3, 3, 3, 3],
+                [3, 3, 3, 3, 3, 3, 3, 3],
+                [4, 4, 4, 4, 4, 4, 4, 4],
+                [4, 4, 4, 4, 4, 4, 4, 4],
+                [4, 4, 4, 4, 4, 4, 4, 4],
+                [5, 5, 5, 5, 5, 5, 5, 5]]
+
+# Dictionary of positional weights of each piece
+piece_position_scores = {"bK": b_king_score, "wK": w_king_score, 'Q': queen_score, 'R': rook_score,
+                         'N': knight_score, 'B': bishop_score, "wP": w_pawn_score, "bP": b_pawn_score}
+
+# Weight of the positional score of a piece compared to its material value
+POSITION_SCORE_MULTIPLIER = 0.1
+
+# Number of score units per pawn in PIECE_SQUARE_VALUES and GameState.material_score (centipawns)
+SCORE_SCALE = 100
+
+# Material and positional score of each piece on each square in centipawns, counted negatively for black pieces,
+# indexed [piece_color_type][row * 8 + col]. GameState keeps the sum of these values for the pieces on the board up
+# to date as moves are made, so that positions are scored without scanning the board
+PIECE_SQUARE_VALUES = {}
+
+# Default weight file written by Tuner.py. The weights of a file only replace the piece values and positional weights
+# above once load_weights is called with it
+WEIGHTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weights.json")
+
+"""
+Fills PIECE_SQUARE_VALUES from the piece values and positional weights. A piece is worth its value plus its
+positional weight times the multiplier. The values are rounded to whole centipawns so that scores are summed exactly
+"""
+
+
+def build_piece_square_values() -> None:
+    for code in PIECE_CODES:
+        team, piece_type = code
+        if piece_type == 'P' or piece_type == 'K':
+            position_scores = piece_position_scores[code]
+        else:
+            position_scores = piece_position_scores[piece_type]
+        sign = 1 if team == 'w' else -1
+        PIECE_SQUARE_VALUES[code] = tuple(
+            sign * round(SCORE_SCALE * (piece_score[piece_type] +
+                                        position_scores[sq >> 3][sq & 7] * POSITION_SCORE_MULTIPLIER))
+            for sq in range(64))
+
+
+"""
+Replaces the piece values, positional weights, and positional multiplier with those of a weight file. Game states
+created before the weights are loaded keep scoring their positions with the old weights
+"""
+
+
+def load_weights(path) -> None:
+    global POSITION_SCORE_MULTIPLIER
+
+    with open(path) as file:
+        weights = json.load(file)
+
+    piece_score.update(weights["piece_score"])
+    POSITION_SCORE_MULTIPLIER = weights["position_multiplier"]
+
+    # The tables are updated in place, since they are also referenced by name
+    for name, table in weights["piece_position_scores"].items():
+        for r in range(8):
+            piece_position_scores[name][r][:] = table[r]
+
+    build_piece_square_values()
+
+
+"""
+Writes piece values, positional weights, and the positional multiplier to a weight file in the format read by
+load_weights
+"""
+
+
+def save_weights(path, piece_values, position_scores, position_multiplier) -> None:
+    with open(path, 'w') as file:
+        json.dump({"piece_score": piece_values,
+                   "position_multiplier": position_multiplier,
+                   "piece_position_scores": position_scores}, file, indent=1)
+
+
+"""
+Calculates the material and positional score in centipawns from scratch by scanning the whole board. Used to
+initialize the incrementally updated score and to verify it
+"""
+
+
+def count_material(gs) -> int:
+    score = 0
+
+    for r in range(8):
+        for c in range(8):
+            if gs.board[r][c].team != '-':
+                score += PIECE_SQUARE_VALUES[gs.board[r][c].piece_color_type][r * 8 + c]
+
+    return score
+
+
+build_piece_square_values()
@@ -0,0 +1,79 @@
+"""
+A material signature counts the pieces of each kind that each side has, packed into a single integer with 4 bits per
+kind. Bishops are counted separately by the color of their square, since bishops on one color can never reach the
+other. GameState updates the signature incrementally as pieces are captured and promoted, so draws by insufficient
+material are found with one set lookup instead of scanning the board.
+"""
+
+from Zobrist import PIECE_CODES
+
+# Kinds of pieces counted by the signature, in the order of their 4 bit fields. Kings are always on the board and are
+# not counted
+MATERIAL_KINDS = ("wP", "wN", "wB Light", "wB Dark", "wR", "wQ", "bP", "bN", "bB Light", "bB Dark", "bR", "bQ")
+MATERIAL_BITS = 4
+MATERIAL_FIELD_MASK = (1 << MATERIAL_BITS) - 1
+
+# Square color of a square, with a8 (row 0, col 0) a light square (see Bishop.get_square_color)
+SQUARE_COLORS = tuple("Light" if (sq // 8 + sq % 8) % 2 == 0 else "Dark" for sq in range(64))
+
+"""
+Signature value of one piece of a kind
+"""
+
+
+def material_unit(kind) -> int:
+    return 1 << MATERIAL_KINDS.index(kind) * MATERIAL_BITS
+
+
+"""
+Kind of the piece of a piece_color_type standing on a square
+"""
+
+
+def material_kind(code, sq) -> str:
+    return code + ' ' + SQUARE_COLORS[sq] if code[1] == 'B' else code
+
+
+# Signature value of each piece on each square, indexed [piece_color_type][row * 8 + col] like the Zobrist keys.
+# Moving a piece keeps its value, except for bishops, which never change square color
+MATERIAL_KEYS = {code: tuple(0 if code[1] == 'K' else material_unit(material_kind(code, sq)) for sq in range(64))
+                 for code in PIECE_CODES}
+
+# Signature bits of the knights, bishops, rooks and queens of each side, indexed 0 = white and 1 = black
+NON_PAWN_MATERIAL = tuple(sum(MATERIAL_FIELD_MASK * material_unit(team + kind)
+                              for kind in ('N', 'B Light', 'B Dark', 'R', 'Q'))
+                          for team in ('w', 'b'))
+
+# Signatures that can not lead to checkmate: king vs king, king and bishop vs king, king and knight vs king, and
+# kings with two bishops on the same square color (on the same or on opposite sides)
+INSUFFICIENT_MATERIAL = frozenset(
+    [0] +
+    [material_unit(team + kind) for team in ('w', 'b') for kind in ('N', 'B Light', 'B Dark')] +
+    [material_unit(team1 + "B " + color) + material_unit(team2 + "B " + color)
+     for team1 in ('w', 'b') for team2 in ('w', 'b') for color in ('Light', 'Dark')]
+)
+
+"""
+Number of pieces of a kind in a material signature
+"""
+
+
+def piece_count(signature, kind) -> int:
+    return signature >> MATERIAL_KINDS.index(kind) * MATERIAL_BITS & MATERIAL_FIELD_MASK
+
+
+"""
+Calculates the material signature of a position from scratch by scanning the whole board. Used to initialize the
+incrementally updated signature and to verify it.
+"""
+
+
+def material_signature(gs) -> int:
+    signature = 0
+
+    for r in range(8):
+        for c in range(8):
+            if gs.board[r][c].team != '-':
+                signature += MATERIAL_KEYS[gs.board[r][c].piece_color_type][r * 8 + c]
+
+    return signature
@@ -1,9 +1,76 @@
 """
 The Move class stores the information of which chess piece is being moved,
 the starting and ending location of the piece, and which piece was captured during the move.
+
+Move generation and the AI do not build Move objects. They pass moves around as packed integers, and a Move is only
+created where a move has to be displayed or written in chess notation:
+    bits 0-5:   starting square (row * 8 + col)
+    bits 6-11:  ending square (row * 8 + col)
+    bits 12-15: flags (enpassant, castle, pawn promotion, capture)
+    bits 16-18: promotion piece (index into PROMOTION_PIECES)
+"""
+
+SQUARE_MASK = 0x3F
+SQUARES_MASK = 0xFFF
+END_SHIFT = 6
+
+ENPASSANT_FLAG = 1 << 12
+CASTLE_FLAG = 1 << 13
+PROMOTION_FLAG = 1 << 14
+CAPTURE_FLAG = 1 << 15
+
+PROMOTION_SHIFT = 16
+PROMOTION_MASK = 0x7 << PROMOTION_SHIFT
+PROMOTION_PIECES = ('-', 'Q', 'R', 'B', 'N')
+
+# Move recorded in the move log when the side to move passes its turn (a null move, made only by the AI's search). A
+# move from a8 to a8 is never a real move
+NULL_MOVE = 0
+
+"""
+Packs a move into an integer. The capture and pawn promotion flags are read from the board, pawns promote to a
+queen unless another promotion piece is given
 """
 
 
+def encode_move(r, c, end_row, end_col, board, enpassant_move=False, castle_move=False, promotion_piece='Q') -> int:
+    move = r * 8 + c | (end_row * 8 + end_col) << END_SHIFT
+
+    if enpassant_move:
+        move |= ENPASSANT_FLAG | CAPTURE_FLAG
+    elif board[end_row][end_col].team != '-':
+        move |= CAPTURE_FLAG
+
+    if castle_move:
+        move |= CASTLE_FLAG
+    elif (end_row == 0 or end_row == 7) and board[r][c].piece_type == 'P':
+        move |= PROMOTION_FLAG | PROMOTION_PIECES.index(promotion_piece) << PROMOTION_SHIFT
+
+    return move
+
+
+"""
+Appends a pawn move to a list of moves. A pawn reaching the last row adds one move for each promotion piece
+"""
+
+
+def append_pawn_move(moves, r, c, end_row, end_col, board, enpassant_move=False) -> None:
+    if end_row == 0 or end_row == 7:
+        for promotion_piece in PROMOTION_PIECES[1:]:
+            moves.append(encode_move(r, c, end_row, end_col, board, promotion_piece=promotion_piece))
+    else:
+        moves.append(encode_move(r, c, end_row, end_col, board, enpassant_move))
+
+
+"""
+Unpacks the starting and ending squares of a packed move as (start_row, start_col, end_row, end_col)
+"""
+
+
+def move_squares(move) -> tuple:
+    return (move & SQUARE_MASK) >> 3, move & 7, (move >> END_SHIFT & SQUARE_MASK) >> 3, move >> END_SHIFT & 7
+
+
 class Move:
     # Dictionary to convert ranks to rows
     ranks_to_rows = {"1": 7, "2": 6, "3": 5, "4": 4,
@@ -58,6 +125,24 @@ class Move:
         # Determine if move is capture
         self.is_capture = self.piece_captured.piece_type != '-'
 
+    """
+    Creates the Move of a packed move that has been made, from the pieces that were moved and captured
+    """
+
+    @classmethod
+    def from_record(cls, move, piece_moved, piece_captured):
+        start_row, start_col, end_row, end_col = move_squares(move)
+        obj = cls.__new__(cls)
+        obj.start_row, obj.start_col, obj.end_row, obj.end_col = start_row, start_col, end_row, end_col
+        obj.piece_moved = piece_moved
+        obj.piece_captured = piece_captured
+        obj.move_id = start_row * 1000 + start_col * 100 + end_row * 10 + end_col
+        obj.is_pawn_promotion = bool(move & PROMOTION_FLAG)
+        obj.is_enpassant_move = bool(move & ENPASSANT_FLAG)
+        obj.is_castle_move = bool(move & CASTLE_FLAG)
+        obj.is_capture = piece_captured.piece_type != '-'
+        return obj
+
     """   
     Allows comparison between two Move objects allowing to check if a move is valid
     """
@@ -107,3 +192,19 @@ class Move:
 
     def get_rank_file(self, r, c) -> str:
         return self.cols_to_files[c] + self.rows_to_ranks[r]
+
+
+"""
+Writes a packed move in the long algebraic notation used by UCI (i.e. e2e4, or e7e8q for pawn promotion)
+"""
+
+
+def uci_notation(move) -> str:
+    start_row, start_col, end_row, end_col = move_squares(move)
+    notation = Move.cols_to_files[start_col] + Move.rows_to_ranks[start_row] + \
+        Move.cols_to_files[end_col] + Move.rows_to_ranks[end_row]
+
+    if move & PROMOTION_FLAG:
+        notation += PROMOTION_PIECES[move >> PROMOTION_SHIFT].lower()
+
+    return notation
@@ -0,0 +1,393 @@
+"""
+Parallel search splits the root moves of each iteration across a pool of worker processes, so that the AI can use
+every core of the machine instead of one. The workers are started once and keep their own game state and searcher
+from move to move. By default they share one transposition table in shared memory, so that the results found by one
+worker prune the searches of the others. Each task only sends the starting position and the move list of the game: a
+worker takes back the moves where its replica differs and plays the new ones, so the board is never pickled.
+
+Each iteration searches the previous iteration's best move first with the full window, then hands the remaining moves
+out to the workers as they become free, with the best score found so far as the lower bound of each window, so that
+weaker moves are refuted quickly.
+
+Usage: python ParallelSearch.py [depth] [max processes] [--bitboard] [--private-tables]
+"""
+
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+
+from ChessAI import Searcher, SearchAborted, CHECKMATE, DEPTH, TIME_LIMIT, NODE_LIMIT
+from ChessAI import TRANSPOSITION_TABLE_SIZE, TRANSPOSITION_TABLE_REPLACEMENT
+from ChessEngine import create_game_state, START_FEN
+from Evaluation import load_weights
+from TranspositionTable import SharedTranspositionTable
+
+# Positions searched by the speedup report
+SPEEDUP_POSITIONS = [
+    START_FEN,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+]
+
+# Game state replica, searcher, and game number of each worker process, created by init_worker
+WORKER_GAME_STATE = None
+WORKER_SEARCHER = None
+WORKER_GAME_ID = 0
+
+# Whether the worker's searcher uses the shared transposition table, which only the coordinating process clears
+WORKER_SHARES_TABLE = False
+
+"""
+Creates the game state and searcher of a worker process when the pool starts it. The stop event is shared by every
+worker so that the coordinating process can stop all of their searches at once. The searcher uses the shared
+transposition table if one is given, otherwise a table of its own. The weight file, if given, is loaded first
+"""
+
+
+def init_worker(use_bitboards, stop_event, transposition_table=None, weights_file=None) -> None:
+    global WORKER_GAME_STATE, WORKER_SEARCHER, WORKER_SHARES_TABLE
+
+    if weights_file is not None:
+        load_weights(weights_file)
+
+    WORKER_GAME_STATE = create_game_state(use_bitboards)
+    WORKER_SEARCHER = Searcher(transposition_table=transposition_table)
+    WORKER_SEARCHER.stop_event = stop_event
+    WORKER_SHARES_TABLE = transposition_table is not None
+
+
+"""
+Brings the worker's game state to the position reached by playing the moves from the starting position. Only the
+moves after the last move both games share are taken back and played
+"""
+
+
+def sync_worker(game_id, start_fen, moves) -> None:
+    global WORKER_GAME_ID
+
+    gs = WORKER_GAME_STATE
+
+    # Results of an earlier game are of no use
+    if game_id != WORKER_GAME_ID:
+        WORKER_GAME_ID = game_id
+        if not WORKER_SHARES_TABLE:
+            WORKER_SEARCHER.transposition_table.clear()
+
+    if gs.start_fen != start_fen:
+        gs.load_fen(start_fen)
+
+    shared = 0
+    while shared < len(gs.move_log) and shared < len(moves) and gs.move_log[shared] == moves[shared]:
+        shared += 1
+
+    # A new position starts a new search generation in the transposition table
+    if not WORKER_SHARES_TABLE and (shared < len(gs.move_log) or shared < len(moves)):
+        WORKER_SEARCHER.transposition_table.new_search()
+
+    while len(gs.move_log) > shared:
+        gs.undo_move()
+    for move in moves[shared:]:
+        gs.make_move(move, False)
+
+
+"""
+Searches one root move in a worker process. The task holds the game number, starting position, move list, root
+move, depth, window, deadline (from time.time, which all processes share), and the number of positions left to
+search. Returns the move, its score, the line expected after it, and the number of positions searched. The score is
+None if the deadline or node limit was reached or the search was stopped
+"""
+
+
+def search_root_move(task):
+    game_id, start_fen, moves, move, depth, alpha, beta, deadline, node_limit = task
+    sync_worker(game_id, start_fen, moves)
+
+    time_limit = max(0.0, deadline - time.time()) if deadline is not None else None
+    try:
+        score, pv = WORKER_SEARCHER.search_move(WORKER_GAME_STATE, move, depth, alpha, beta, time_limit, node_limit)
+    except SearchAborted:
+        return move, None, [], WORKER_SEARCHER.nodes
+
+    return move, score, pv, WORKER_SEARCHER.nodes
+
+
+class ParallelSearcher:
+    """
+    Starts the pool of worker processes, one per core unless a number is given, and the transposition table they
+    share unless each worker should use a table of its own. Each worker loads the weight file, if one is given, so
+    that it scores positions like the coordinating process. The searcher has the same interface as ChessAI.Searcher,
+    so either can be used by the game and the UCI engine. close should be called (or the searcher used in a with
+    statement) once it is no longer needed
+    """
+
+    def __init__(self, processes=None, use_bitboards=False, max_depth=None, time_limit=None, node_limit=None,
+                 shared_table=True, weights_file=None) -> None:
+        self.processes = processes if processes is not None else os.cpu_count()
+        self.max_depth = DEPTH if max_depth is None else max_depth
+        self.time_limit = TIME_LIMIT if time_limit is None else time_limit
+        self.node_limit = NODE_LIMIT if node_limit is None else node_limit
+
+        # The workers attach to the shared table's memory block instead of receiving a copy of it
+        self.transposition_table = None
+        if shared_table:
+            self.transposition_table = SharedTranspositionTable(TRANSPOSITION_TABLE_SIZE,
+                                                                TRANSPOSITION_TABLE_REPLACEMENT)
+
+        self.stop_event = multiprocessing.Event()
+        self.pool = multiprocessing.Pool(self.processes, initializer=init_worker,
+                                         initargs=(use_bitboards, self.stop_event, self.transposition_table,
+                                                   weights_file))
+
+        # Incremented by new_game so that the workers clear their transposition tables
+        self.game_id = 0
+
+        # Best move, its score, its principal variation, and the depth of the last completed iteration
+        self.best_move = None
+        self.best_score = 0
+        self.pv = []
+        self.completed_depth = 0
+
+        # Positions searched by every worker during the last search
+        self.nodes = 0
+
+        # Best root move and its score so far in the iteration in progress
+        self.root_best_move = None
+        self.root_best_score = 0
+
+        # Set by stop to end the search in progress once a move has been found. Cleared when a search starts
+        self.stop_requested = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    """
+    Iterative deepening driver with the same arguments and result as Searcher.find_best_move. Each iteration's root
+    moves are searched by the worker processes
+    """
+
+    def find_best_move(self, gs, valid_moves, return_queue=None, max_depth=None, time_limit=None, node_limit=None,
+                       info_callback=None):
+        max_depth = self.max_depth if max_depth is None else max_depth
+        time_limit = self.time_limit if time_limit is None else time_limit
+        node_limit = self.node_limit if node_limit is None else node_limit
+
+        self.stop_requested = False
+        self.stop_event.clear()
+        self.best_move = None
+        self.best_score = 0
+        self.pv = []
+        self.completed_depth = 0
+        self.nodes = 0
+        self.root_best_move = None
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+
+        start_time = time.perf_counter()
+        deadline = time.time() + time_limit if time_limit is not None else None
+        root = (self.game_id, gs.start_fen, list(gs.move_log))
+        root_moves = list(valid_moves)
+        random.shuffle(root_moves)
+
+        # No iterations are needed when the game is over
+        if len(root_moves) == 0:
+            max_depth = 0
+
+        for depth in range(1, max_depth + 1):
+            result = self.search_iteration(root, root_moves, depth, deadline, node_limit)
+            if result is None:
+                # Without a completed iteration, the best of the root moves that were searched is played
+                if self.best_move is None:
+                    self.best_move, self.best_score = self.root_best_move, self.root_best_score
+                break
+
+            move, score, self.pv = result
+            self.best_move, self.best_score, self.completed_depth = move, score, depth
+
+            if info_callback is not None:
+                info_callback(depth, score, self.nodes, time.perf_counter() - start_time, self.pv)
+
+            # Searches the best move first in the next iteration
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+
+            # Stops early when a forced checkmate has been found, the search was stopped, or a limit has been reached
+            if abs(score) >= CHECKMATE or self.stop_requested:
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+            if node_limit is not None and self.nodes >= node_limit:
+                break
+
+        # A search stopped before its first move was scored still plays a legal move
+        if self.best_move is None and len(root_moves) > 0:
+            self.best_move, self.best_score = root_moves[0], 0
+
+        if return_queue is not None:
+            return_queue.put(self.best_move)
+        return self.best_move
+
+    """
+    Searches every root move to the given depth and returns the best move with its score and principal variation,
+    or None if the iteration was abandoned. The first move is searched on its own, then the other moves are handed
+    out one per worker, each with the best score so far as the lower bound of its window. Each task may search the
+    positions left under the node limit, and every worker is stopped once the searches together reach it. Like
+    Searcher.check_search_limits, the limits only apply once a move has been found, so the first move of the first
+    iteration is searched without them
+    """
+
+    def search_iteration(self, root, root_moves, depth, deadline, node_limit=None):
+        if self.root_best_move is None:
+            task = root + (root_moves[0], depth, -CHECKMATE, CHECKMATE, None, None)
+        else:
+            task = root + (root_moves[0], depth, -CHECKMATE, CHECKMATE, deadline, self.nodes_left(node_limit))
+        move, score, pv, nodes = self.pool.apply(search_root_move, (task,))
+        self.nodes += nodes
+        if score is None:
+            return None
+
+        best = (move, score, pv)
+        self.root_best_move, self.root_best_score = move, score
+
+        # Results (or the exception raised by a worker) arrive through the queue in the order they finish
+        results = queue.Queue()
+        next_index = 1
+        pending = 0
+        aborted = False
+
+        while pending > 0 or (next_index < len(root_moves) and not aborted):
+            while pending < self.processes and next_index < len(root_moves) and not aborted:
+                task = root + (root_moves[next_index], depth, best[1], CHECKMATE, deadline, self.nodes_left(node_limit))
+                self.pool.apply_async(search_root_move, (task,), callback=results.put, error_callback=results.put)
+                next_index += 1
+                pending += 1
+
+            result = results.get()
+            pending -= 1
+            if isinstance(result, BaseException):
+                raise result
+
+            # A score at or below the best score is only an upper bound, so it never replaces the best move
+            move, score, pv, nodes = result
+            self.nodes += nodes
+            if score is None:
+                aborted = True
+            elif score > best[1]:
+                best = (move, score, pv)
+                self.root_best_move, self.root_best_score = move, score
+
+            # The searches still running are abandoned once the node limit is reached
+            if not aborted and node_limit is not None and self.nodes >= node_limit:
+                aborted = True
+                self.stop_event.set()
+
+        return None if aborted else best
+
+    """
+    Number of positions that may still be searched under the node limit, or None without a limit
+    """
+
+    def nodes_left(self, node_limit):
+        return max(0, node_limit - self.nodes) if node_limit is not None else None
+
+    """
+    Ends the search in progress in every worker process
+    """
+
+    def stop(self) -> None:
+        self.stop_requested = True
+        self.stop_event.set()
+
+    """
+    Makes the workers forget the positions searched in earlier games
+    """
+
+    def new_game(self) -> None:
+        self.game_id += 1
+        if self.transposition_table is not None:
+            self.transposition_table.clear()
+
+    """
+    Stops the worker processes and frees the shared transposition table
+    """
+
+    def close(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+        if self.transposition_table is not None:
+            self.transposition_table.close()
+
+
+"""
+Searches the speedup positions to a fixed depth with the single process searcher and then with each number of worker
+processes. Returns (processes, seconds, nodes) for each run, where 0 processes is the single process searcher. The
+root moves are shuffled the same way in every run
+"""
+
+
+def measure_speedup(depth, process_counts, use_bitboards=False, shared_table=True) -> list:
+    results = []
+
+    for processes in [0] + list(process_counts):
+        if processes == 0:
+            searcher = Searcher()
+        else:
+            searcher = ParallelSearcher(processes, use_bitboards, shared_table=shared_table)
+        elapsed = 0.0
+        nodes = 0
+
+        for fen in SPEEDUP_POSITIONS:
+            gs = create_game_state(use_bitboards, fen)
+            searcher.new_game()
+            random.seed(1)
+
+            start_time = time.perf_counter()
+            searcher.find_best_move(gs, gs.get_valid_moves(), max_depth=depth)
+            elapsed += time.perf_counter() - start_time
+            nodes += searcher.nodes
+
+        if processes > 0:
+            searcher.close()
+        results.append((processes, elapsed, nodes))
+
+    return results
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    use_bitboards = "--bitboard" in args
+    if use_bitboards:
+        args.remove("--bitboard")
+    shared_table = "--private-tables" not in args
+    if not shared_table:
+        args.remove("--private-tables")
+
+    depth = int(args[0]) if len(args) > 0 else 4
+    max_processes = int(args[1]) if len(args) > 1 else os.cpu_count()
+
+    # Doubles the number of processes up to the maximum
+    process_counts = []
+    processes = 1
+    while processes < max_processes:
+        process_counts.append(processes)
+        processes *= 2
+    process_counts.append(max_processes)
+
+    print("Depth %d search of %d positions on %d cores, %s transposition tables" %
+          (depth, len(SPEEDUP_POSITIONS), os.cpu_count(), "shared" if shared_table else "private"))
+    results = measure_speedup(depth, process_counts, use_bitboards, shared_table)
+    serial_time = results[0][1]
+
+    for processes, elapsed, nodes in results:
+        print("%-12s %8.2f s %10d nodes %8.0f nodes/s  speedup %.2fx" %
+              ("serial" if processes == 0 else "%d processes" % processes, elapsed, nodes, nodes / elapsed,
+               serial_time / elapsed))
+
+
+if __name__ == "__main__":
+    main()
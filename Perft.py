@@ -0,0 +1,147 @@
+"""
+Perft counts every position reachable from a position in a given number of moves. The counts of well known positions
+are published, so comparing against them verifies move generation (including castling, enpassant, and pawn promotion)
+and timing them measures how quickly moves are generated, made, and undone.
+
+Usage:
+    python Perft.py [--bitboard] <fen> <depth>      Node count, nodes per second, and divide of a position
+    python Perft.py [--bitboard] suite [max nodes]  Checks the reference positions against their published counts
+"""
+
+import sys
+import time
+
+from ChessEngine import create_game_state, START_FEN
+from Move import uci_notation
+
+# Reference positions with their published node counts for depth 1, 2, 3, ...
+REFERENCE_POSITIONS = [
+    ("Start position", START_FEN,
+     [20, 400, 8902, 197281, 4865609]),
+    ("Kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     [48, 2039, 97862, 4085603]),
+    ("Enpassant and rook endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     [14, 191, 2812, 43238, 674624]),
+    ("Promotions and castling", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     [6, 264, 9467, 422333]),
+    ("Promotions and castling mirrored", "r2q1rk1/pP1p2pp/Q4n2/bbp1p3/Np6/1B3NBn/pPPP1PPP/R3K2R b KQ - 0 1",
+     [6, 264, 9467, 422333]),
+    ("Discovered checks", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     [44, 1486, 62379, 2103487]),
+    ("Middlegame", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     [46, 2079, 89890, 3894594]),
+    ("Underpromotions", "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+     [24, 496, 9483, 182838]),
+]
+
+"""
+Counts the positions reachable in depth moves. The last ply is counted from the length of the move list instead of
+making each move
+"""
+
+
+def perft(gs, depth) -> int:
+    moves = gs.get_valid_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+
+    nodes = 0
+    for move in moves:
+        gs.make_move(move, False)
+        nodes += perft(gs, depth - 1)
+        gs.undo_move()
+
+    return nodes
+
+
+"""
+Counts the positions reachable in depth moves below each legal move of the position, as (move, count) pairs. Comparing
+the divide of two move generators finds the move where they disagree
+"""
+
+
+def divide(gs, depth) -> list:
+    counts = []
+
+    for move in gs.get_valid_moves():
+        gs.make_move(move, False)
+        counts.append((uci_notation(move), perft(gs, depth - 1)))
+        gs.undo_move()
+
+    return counts
+
+
+"""
+Prints the divide, node count, and nodes per second of a position and returns the node count
+"""
+
+
+def run_perft(fen, depth, use_bitboards=False) -> int:
+    gs = create_game_state(use_bitboards, fen)
+
+    start_time = time.perf_counter()
+    counts = divide(gs, depth)
+    elapsed = time.perf_counter() - start_time
+    nodes = sum(count for _, count in counts)
+
+    for notation, count in sorted(counts):
+        print(notation + ": " + str(count))
+    print("Nodes: %d  Time: %.2fs  Nodes per second: %.0f" % (nodes, elapsed, nodes / elapsed if elapsed else 0))
+
+    return nodes
+
+
+"""
+Checks every reference position at each depth whose published count is at most max_nodes. Returns the number of
+counts that did not match
+"""
+
+
+def run_suite(max_nodes=100000, use_bitboards=False) -> int:
+    failures = 0
+    total_nodes = 0
+    total_time = 0.0
+
+    for name, fen, expected_counts in REFERENCE_POSITIONS:
+        gs = create_game_state(use_bitboards, fen)
+
+        for depth, expected in enumerate(expected_counts, 1):
+            if expected > max_nodes:
+                break
+
+            start_time = time.perf_counter()
+            nodes = perft(gs, depth)
+            elapsed = time.perf_counter() - start_time
+            total_nodes += nodes
+            total_time += elapsed
+
+            result = "ok" if nodes == expected else "FAILED (expected %d)" % expected
+            if nodes != expected:
+                failures += 1
+            print("%-34s depth %d: %9d nodes %7.2fs  %s" % (name, depth, nodes, elapsed, result))
+
+    print("%d failures, %d nodes in %.2fs (%.0f nodes per second)" %
+          (failures, total_nodes, total_time, total_nodes / total_time if total_time else 0))
+
+    return failures
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    use_bitboards = "--bitboard" in args
+    if use_bitboards:
+        args.remove("--bitboard")
+
+    if len(args) == 0 or args[0] == "suite":
+        max_nodes = int(args[1]) if len(args) > 1 else 100000
+        sys.exit(1 if run_suite(max_nodes, use_bitboards) else 0)
+
+    if len(args) < 2:
+        print(__doc__)
+        sys.exit(2)
+
+    run_perft(" ".join(args[:-1]), int(args[-1]), use_bitboards)
+
+
+if __name__ == "__main__":
+    main()
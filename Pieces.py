@@ -4,7 +4,10 @@ determines if the piece is blocking the king from being in check,
 and all behavior unique to a piece (i.e. pawn promotion, castling, etc). 
 """
 
-from Move import Move
+from Move import encode_move, append_pawn_move
+from AttackTables import SQUARE_BITS, DIRECTIONS, RAY_SQUARES, KNIGHT_SQUARES, KING_SQUARES
+from AttackTables import ROOK_DIRECTIONS, BISHOP_DIRECTIONS, QUEEN_DIRECTIONS
+from CastleRights import WHITE_KING_SIDE, WHITE_QUEEN_SIDE, BLACK_KING_SIDE, BLACK_QUEEN_SIDE
 from typing import Union
 
 
@@ -54,6 +57,55 @@ class Pieces:
 
         return pin_direction, pinned
 
+    """
+    Calculates all moves along the given directions using the precomputed rays for the square. A pinned piece can
+    only move along the direction of the pin, either toward or away from the attacking piece.
+    """
+
+    @staticmethod
+    def get_sliding_moves(r, c, moves, board, directions, pin_direction, pinned) -> None:
+        ally = board[r][c].team
+
+        for d in directions:
+            if pinned and DIRECTIONS[d] != pin_direction and DIRECTIONS[d] != (-pin_direction[0], -pin_direction[1]):
+                continue
+
+            for end_row, end_col in RAY_SQUARES[r][c][d]:
+                end_team = board[end_row][end_col].team
+
+                # Empty space
+                if end_team == '-':
+                    moves.append(encode_move(r, c, end_row, end_col, board))
+                else:
+                    # Piece capture, otherwise same color piece is blocking the way
+                    if end_team != ally:
+                        moves.append(encode_move(r, c, end_row, end_col, board))
+                    break
+
+    """
+    Calculates only the captures along the given directions: each ray is followed to its first piece, which is
+    captured if it belongs to the enemy team
+    """
+
+    @staticmethod
+    def get_sliding_captures(r, c, moves, board, directions, pin_direction, pinned) -> None:
+        ally = board[r][c].team
+
+        for d in directions:
+            if pinned and DIRECTIONS[d] != pin_direction and DIRECTIONS[d] != (-pin_direction[0], -pin_direction[1]):
+                continue
+
+            for end_row, end_col in RAY_SQUARES[r][c][d]:
+                end_team = board[end_row][end_col].team
+                if end_team != '-':
+                    if end_team != ally:
+                        moves.append(encode_move(r, c, end_row, end_col, board))
+                    break
+
+
+# Shared empty piece placed on every empty square, so that making and undoing moves never creates new pieces for
+# the squares they vacate
+EMPTY_SQUARE = Pieces(-1, -1, "-")
 
 """
 Pawn class inherits from Pieces class and calculates the movement for pawns 
@@ -109,6 +161,7 @@ class Pawn(Pieces):
                 square = board[r][i]
                 if square.team == enemy_team and (square.piece_type == 'R' or square.piece_type == 'Q'):
                     attack_piece = True
+                    break
                 elif square.team != '-':
                     blocking_piece = True
                     break
@@ -135,68 +188,100 @@ class Pawn(Pieces):
 
         # White pawn movement
         if white_turn and board[r][c].team == 'w':
-            if not pinned or pin_direction == (-1, 0):
+            # A pawn pinned along its file may still advance, whether the king is behind or in front of it
+            if not pinned or pin_direction[1] == 0:
                 # 1 sq pawn advance
                 if board[r - 1][c].team == '-':
-                    moves.append(Move((r, c), (r - 1, c), board))
+                    append_pawn_move(moves, r, c, r - 1, c, board)
                     # 2 sq pawn advance
                     if r == 6 and board[r - 2][c].team == '-':
-                        moves.append(Move((r, c), (r - 2, c), board))
+                        append_pawn_move(moves, r, c, r - 2, c, board)
 
             # Capture top left diagonal
             if not pinned or pin_direction == (-1, -1):
                 if c - 1 >= 0:
                     if board[r - 1][c - 1].team == 'b':
-                        moves.append(Move((r, c), (r - 1, c - 1), board))
+                        append_pawn_move(moves, r, c, r - 1, c - 1, board)
 
                     if (r - 1, c - 1) == enpassant_square and self.enpassant_threats(r, c, white_turn, board,
                                                                                      white_king_loc, black_king_loc,
                                                                                      True):
-                        moves.append(Move((r, c), (r - 1, c - 1), board, enpassant_move=True))
+                        append_pawn_move(moves, r, c, r - 1, c - 1, board, enpassant_move=True)
 
             # Capture top right diagonal
             if not pinned or pin_direction == (-1, 1):
                 if c + 1 <= 7:
                     if board[r - 1][c + 1].team == 'b':
-                        moves.append(Move((r, c), (r - 1, c + 1), board))
+                        append_pawn_move(moves, r, c, r - 1, c + 1, board)
 
                     if (r - 1, c + 1) == enpassant_square and self.enpassant_threats(r, c, white_turn, board,
                                                                                      white_king_loc, black_king_loc,
                                                                                      False):
-                        moves.append(Move((r, c), (r - 1, c + 1), board, enpassant_move=True))
+                        append_pawn_move(moves, r, c, r - 1, c + 1, board, enpassant_move=True)
 
         # Black pawn movement
         if not white_turn and board[r][c].team == 'b':
             # 1 sq pawn advance
-            if not pinned or pin_direction == (1, 0):
+            if not pinned or pin_direction[1] == 0:
                 if board[r + 1][c].team == '-':
-                    moves.append(Move((r, c), (r + 1, c), board))
+                    append_pawn_move(moves, r, c, r + 1, c, board)
 
                     # 2 sq pawn advance
                     if r == 1 and board[r + 2][c].team == '-':
-                        moves.append(Move((r, c), (r + 2, c), board))
+                        append_pawn_move(moves, r, c, r + 2, c, board)
 
             # Capture bottom left diagonal
             if not pinned or pin_direction == (1, -1):
                 if c - 1 >= 0:
                     if board[r + 1][c - 1].team == 'w':
-                        moves.append(Move((r, c), (r + 1, c - 1), board))
+                        append_pawn_move(moves, r, c, r + 1, c - 1, board)
 
                     if (r + 1, c - 1) == enpassant_square and self.enpassant_threats(r, c, white_turn, board,
                                                                                      white_king_loc, black_king_loc,
                                                                                      True):
-                        moves.append(Move((r, c), (r + 1, c - 1), board, enpassant_move=True))
+                        append_pawn_move(moves, r, c, r + 1, c - 1, board, enpassant_move=True)
 
             # Capture bottom right diagonal
             if not pinned or pin_direction == (1, 1):
                 if c + 1 <= 7:
                     if board[r + 1][c + 1].team == 'w':
-                        moves.append(Move((r, c), (r + 1, c + 1), board))
+                        append_pawn_move(moves, r, c, r + 1, c + 1, board)
 
                     if (r + 1, c + 1) == enpassant_square and self.enpassant_threats(r, c, white_turn, board,
                                                                                      white_king_loc, black_king_loc,
                                                                                      False):
-                        moves.append(Move((r, c), (r + 1, c + 1), board, enpassant_move=True))
+                        append_pawn_move(moves, r, c, r + 1, c + 1, board, enpassant_move=True)
+
+    """
+    Calculates only the pawn moves that change material: diagonal captures, en-passant, and advances onto the
+    promotion row
+    """
+
+    def get_piece_captures(self, r, c, white_turn, moves, board, pins, white_king_loc, black_king_loc,
+                           enpassant_square) -> None:
+
+        # Calculates pin direction and if the piece's current location is protecting the king
+        pin_direction, pinned = self.is_pinned(pins, r, c)
+
+        if white_turn:
+            forward, enemy_team, promotion_row = -1, 'b', 0
+        else:
+            forward, enemy_team, promotion_row = 1, 'w', 7
+
+        # Pawn advance onto the promotion row
+        if r + forward == promotion_row and (not pinned or pin_direction[1] == 0):
+            if board[r + forward][c].team == '-':
+                append_pawn_move(moves, r, c, r + forward, c, board)
+
+        # Left and right diagonal captures
+        for dc in (-1, 1):
+            if 0 <= c + dc <= 7 and (not pinned or pin_direction == (forward, dc)):
+                if board[r + forward][c + dc].team == enemy_team:
+                    append_pawn_move(moves, r, c, r + forward, c + dc, board)
+
+                if (r + forward, c + dc) == enpassant_square and \
+                        self.enpassant_threats(r, c, white_turn, board, white_king_loc, black_king_loc, dc == -1):
+                    append_pawn_move(moves, r, c, r + forward, c + dc, board, enpassant_move=True)
 
 
 """
@@ -211,92 +296,21 @@ class Rook(Pieces):
     """
     Calculates all orthogonal directions of a rook at a given square on the board.
     """
-
     def get_piece_move(self, r, c, moves, board, pins) -> None:
 
         # Calculates pin direction and if the piece's current location is protecting the king
         pin_direction, pinned = self.is_pinned(pins, r, c)
 
-        # UP and DOWN
-        if not pinned or (pin_direction == (-1, 0) or pin_direction == (1, 0)):
-            # UP
-            for i in range(8):
-                if r - i - 1 >= 0:
-                    # Empty space
-                    if board[r - i - 1][c].team == '-':
-                        moves.append(Move((r, c), (r - i - 1, c), board))
-
-                    # Same color piece is blocking the way
-                    if board[r - i - 1][c].team != '-' and board[r - i - 1][c].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r - i - 1][c].team != '-' and board[r - i - 1][c].team != board[r][c].team:
-                        moves.append(Move((r, c), (r - i - 1, c), board))
-                        break
-
-                else:
-                    break
-
-            # DOWN
-            for i in range(8):
-
-                if r + i + 1 <= 7:
-                    # Empty space
-                    if board[r + i + 1][c].team == '-':
-                        moves.append(Move((r, c), (r + i + 1, c), board))
-
-                    # Same color piece is blocking the way
-                    if board[r + i + 1][c].team != '-' and board[r + i + 1][c].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r + i + 1][c].team != '-' and board[r + i + 1][c].team != board[r][c].team:
-                        moves.append(Move((r, c), (r + i + 1, c), board))
-                        break
-
-                else:
-                    break
-
-        # LEFT and RIGHT
-        if not pinned or (pin_direction == (0, -1) or pin_direction == (0, 1)):
-            # LEFT
-            for i in range(8):
-                if c - i - 1 >= 0:
-                    # Empty space
-                    if board[r][c - i - 1].team == '-':
-                        moves.append(Move((r, c), (r, c - i - 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r][c - i - 1].team != '-' and board[r][c - i - 1].team == board[r][c].team:
-                        break
+        # UP, LEFT, DOWN, and RIGHT
+        self.get_sliding_moves(r, c, moves, board, ROOK_DIRECTIONS, pin_direction, pinned)
 
-                    # Piece capture
-                    if board[r][c - i - 1].team != '-' and board[r][c - i - 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r, c - i - 1), board))
-                        break
-
-                else:
-                    break
-
-            # RIGHT
-            for i in range(8):
-                if c + i + 1 <= 7:
-                    # Empty space
-                    if board[r][c + i + 1].team == '-':
-                        moves.append(Move((r, c), (r, c + i + 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r][c + i + 1].team != '-' and board[r][c + i + 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r][c + i + 1].team != '-' and board[r][c + i + 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r, c + i + 1), board))
-                        break
+    """
+    Calculates the captures a rook can make along orthogonal directions
+    """
 
-                else:
-                    break
+    def get_piece_captures(self, r, c, moves, board, pins) -> None:
+        pin_direction, pinned = self.is_pinned(pins, r, c)
+        self.get_sliding_captures(r, c, moves, board, ROOK_DIRECTIONS, pin_direction, pinned)
 
 
 """
@@ -328,7 +342,6 @@ class Knight(Pieces):
     """
     Calculates all 8 locations a knight is able to move. Check README for more information.
     """
-
     def get_piece_move(self, r, c, moves, board, pins) -> None:
 
         # Calculates if the knight is pinned and protecting the king from check
@@ -336,62 +349,22 @@ class Knight(Pieces):
 
         # If the knight isn't pinned, then it is able to move
         if not pinned:
-            # LEFT TOP
-            if r - 1 >= 0 and c - 2 >= 0:
-                # Empty space or Piece capture
-                if board[r - 1][c - 2].team == '-' or (
-                        board[r - 1][c - 2].team != '-' and board[r - 1][c - 2].team != board[r][c].team):
-                    moves.append(Move((r, c), (r - 1, c - 2), board))
-
-            # LEFT BOTTOM
-            if r + 1 <= 7 and c - 2 >= 0:
-                # Empty space or Piece capture
-                if board[r + 1][c - 2].team == '-' or (
-                        board[r + 1][c - 2].team != '-' and board[r + 1][c - 2].team != board[r][c].team):
-                    moves.append(Move((r, c), (r + 1, c - 2), board))
-
-            # RIGHT TOP
-            if r - 1 >= 0 and c + 2 <= 7:
-                # Empty space or Piece capture
-                if board[r - 1][c + 2].team == '-' or (
-                        board[r - 1][c + 2].team != '-' and board[r - 1][c + 2].team != board[r][c].team):
-                    moves.append(Move((r, c), (r - 1, c + 2), board))
-
-            # RIGHT BOTTOM
-            if r + 1 <= 7 and c + 2 <= 7:
-                # Empty space or Piece capture
-                if board[r + 1][c + 2].team == '-' or (
-                        board[r + 1][c + 2].team != '-' and board[r + 1][c + 2].team != board[r][c].team):
-                    moves.append(Move((r, c), (r + 1, c + 2), board))
-
-            # MIDDLE TOP LEFT
-            if r - 2 >= 0 and c - 1 >= 0:
-
-                # Empty space or Piece capture
-                if board[r - 2][c - 1].team == '-' or (
-                        board[r - 2][c - 1].team != '-' and board[r - 2][c - 1].team != board[r][c].team):
-                    moves.append(Move((r, c), (r - 2, c - 1), board))
-
-            # MIDDLE TOP RIGHT
-            if r - 2 >= 0 and c + 1 <= 7:
+            ally = board[r][c].team
+            for end_row, end_col in KNIGHT_SQUARES[r][c]:
                 # Empty space or Piece capture
-                if board[r - 2][c + 1].team == '-' or (
-                        board[r - 2][c + 1].team != '-' and board[r - 2][c + 1].team != board[r][c].team):
-                    moves.append(Move((r, c), (r - 2, c + 1), board))
+                if board[end_row][end_col].team != ally:
+                    moves.append(encode_move(r, c, end_row, end_col, board))
 
-            # MIDDLE BOTTOM LEFT
-            if r + 2 <= 7 and c - 1 >= 0:
-                # Empty space or Piece capture
-                if board[r + 2][c - 1].team == '-' or (
-                        board[r + 2][c - 1].team != '-' and board[r + 2][c - 1].team != board[r][c].team):
-                    moves.append(Move((r, c), (r + 2, c - 1), board))
+    """
+    Calculates the captures a knight can make from its current square
+    """
 
-            # MIDDLE BOTTOM RIGHT
-            if r + 2 <= 7 and c + 1 <= 7:
-                # Empty space or Piece capture
-                if board[r + 2][c + 1].team == '-' or (
-                        board[r + 2][c + 1].team != '-' and board[r + 2][c + 1].team != board[r][c].team):
-                    moves.append(Move((r, c), (r + 2, c + 1), board))
+    def get_piece_captures(self, r, c, moves, board, pins) -> None:
+        if not self.is_pinned(pins, r, c):
+            ally = board[r][c].team
+            for end_row, end_col in KNIGHT_SQUARES[r][c]:
+                if board[end_row][end_col].team not in ('-', ally):
+                    moves.append(encode_move(r, c, end_row, end_col, board))
 
 
 """
@@ -410,97 +383,31 @@ class Bishop(Pieces):
         super().__init__(r, c, team)
 
     """
-    Calculates all diagonal positions the bishop can move in
+    Color of the square at a given location: a8 (row 0, col 0) is a light square
     """
 
+    @staticmethod
+    def get_square_color(r, c) -> str:
+        return "Light" if (r + c) % 2 == 0 else "Dark"
+
+    """
+    Calculates all diagonal positions the bishop can move in
+    """
     def get_piece_move(self, r, c, moves, board, pins) -> None:
 
-        # Calculates if the knight is pinned and protecting the king from check
+        # Calculates if the bishop is pinned and protecting the king from check
         pin_direction, pinned = self.is_pinned(pins, r, c)
 
-        # TOP LEFT DIAGONAL and BOTTOM RIGHT DIAGONAL
-        if not pinned or (pin_direction == (-1, -1) or pin_direction == (1, 1)):
-            # TOP LEFT DIAGONAL
-            for i in range(8):
+        # TOP LEFT, TOP RIGHT, BOTTOM LEFT, and BOTTOM RIGHT DIAGONALS
+        self.get_sliding_moves(r, c, moves, board, BISHOP_DIRECTIONS, pin_direction, pinned)
 
-                if r - i - 1 >= 0 and c - i - 1 >= 0:
-                    # Empty space
-                    if board[r - i - 1][c - i - 1].team == '-':
-                        moves.append(Move((r, c), (r - i - 1, c - i - 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r - i - 1][c - i - 1].team != '-' and board[r - i - 1][c - i - 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r - i - 1][c - i - 1].team != '-' and board[r - i - 1][c - i - 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r - i - 1, c - i - 1), board))
-                        break
-
-                else:
-                    break
-
-            # BOTTOM RIGHT DIAGONAL
-            for i in range(8):
-
-                if r + i + 1 <= 7 and c + i + 1 <= 7:
-                    # Empty space
-                    if board[r + i + 1][c + i + 1].team == '-':
-                        moves.append(Move((r, c), (r + i + 1, c + i + 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r + i + 1][c + i + 1].team != '-' and board[r + i + 1][c + i + 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r + i + 1][c + i + 1].team != '-' and board[r + i + 1][c + i + 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r + i + 1, c + i + 1), board))
-                        break
-
-                else:
-                    break
-
-        # TOP RIGHT DIAGONAL and BOTTOM LEFT DIAGONAL
-        if not pinned or (pin_direction == (-1, 1) or pin_direction == (1, -1)):
-            # TOP RIGHT DIAGONAL
-            for i in range(8):
-
-                if r - i - 1 >= 0 and c + i + 1 <= 7:
-                    # Empty space
-                    if board[r - i - 1][c + i + 1].team == '-':
-                        moves.append(Move((r, c), (r - i - 1, c + i + 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r - i - 1][c + i + 1].team != '-' and board[r - i - 1][c + i + 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r - i - 1][c + i + 1].team != '-' and board[r - i - 1][c + i + 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r - i - 1, c + i + 1), board))
-                        break
-
-                else:
-                    break
-
-            # BOTTOM LEFT DIAGONAL
-            for i in range(8):
-
-                if r + i + 1 <= 7 and c - i - 1 >= 0:
-                    # Empty space
-                    if board[r + i + 1][c - i - 1].team == '-':
-                        moves.append(Move((r, c), (r + i + 1, c - i - 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r + i + 1][c - i - 1].team != '-' and board[r + i + 1][c - i - 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r + i + 1][c - i - 1].team != '-' and board[r + i + 1][c - i - 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r + i + 1, c - i - 1), board))
-                        break
+    """
+    Calculates the captures a bishop can make along diagonal directions
+    """
 
-                else:
-                    break
+    def get_piece_captures(self, r, c, moves, board, pins) -> None:
+        pin_direction, pinned = self.is_pinned(pins, r, c)
+        self.get_sliding_captures(r, c, moves, board, BISHOP_DIRECTIONS, pin_direction, pinned)
 
 
 """
@@ -512,42 +419,21 @@ class King(Pieces):
     # Specifies piece type as King
     piece_type = "K"
 
-    """
-    A utility function to calculates if a given set of coordinates (squares on the board) 
-    would place the king into check
-    """
-
-    @staticmethod
-    def get_piece_move_utility(r, c, r_end, c_end, moves, board, check_for_pins_checks, white_king_loc,
-                               black_king_loc) -> None:
-        # Check for white or black king/temp move king position to specific square
-        if board[r][c].team == 'w':
-            white_king_loc = (r_end, c_end)
-        elif board[r][c].team == 'b':
-            black_king_loc = (r_end, c_end)
-
-        # check for pins and checks
-        in_check, pins, checks = check_for_pins_checks(white_king_loc, black_king_loc)
-
-        # if not in check, append move
-        if not in_check:
-            moves.append(Move((r, c), (r_end, c_end), board))
-
     """
     Calculates to see if the king side castle is not under attack, blocked by other pieces, and that the rook is still
     in its starting position
     """
 
     @staticmethod
-    def get_king_side_castle(r, c, moves, board, square_under_attack) -> None:
+    def get_king_side_castle(r, c, moves, board, attack_map) -> None:
 
-        if 0 <= c + 1 < 8 and 0 <= c + 2 < 8:
+        if 0 <= c + 1 < 8 and 0 <= c + 3 < 8 and \
+                board[r][c + 3].piece_color_type == board[r][c].team + 'R':
             if board[r][c + 1].piece_type == '-' and board[r][c + 2].piece_type == '-':
 
                 # None of the squares are under attack
-                if not square_under_attack(r, c + 1, board, board[r][c].team) and \
-                        not square_under_attack(r, c + 2, board, board[r][c].team):
-                    moves.append(Move((r, c), (r, c + 2), board, castle_move=True))
+                if not attack_map & (SQUARE_BITS[r * 8 + c + 1] | SQUARE_BITS[r * 8 + c + 2]):
+                    moves.append(encode_move(r, c, r, c + 2, board, castle_move=True))
 
     """
     Calculates to see if the queen side castle is not under attack, blocked by other pieces, and that the rook is still
@@ -555,100 +441,63 @@ class King(Pieces):
     """
 
     @staticmethod
-    def get_queen_side_castle(r, c, moves, board, square_under_attack) -> None:
+    def get_queen_side_castle(r, c, moves, board, attack_map) -> None:
 
-        if 0 <= c - 1 < 8 and 0 <= c - 2 < 8 and 0 <= c - 3 < 8:
+        if 0 <= c - 1 < 8 and 0 <= c - 4 < 8 and \
+                board[r][c - 4].piece_color_type == board[r][c].team + 'R':
             if board[r][c - 1].piece_type == '-' and board[r][c - 2].piece_type == '-' \
                     and board[r][c - 3].piece_type == '-':
 
-                # None of the squares are under attack
-                if not square_under_attack(r, c - 1, board, board[r][c].team) and \
-                        not square_under_attack(r, c - 2, board, board[r][c].team) and \
-                        not square_under_attack(r, c - 3, board, board[r][c].team):
-                    moves.append(Move((r, c), (r, c - 2), board, castle_move=True))
+                # None of the squares the king crosses are under attack. The square next to the rook only needs to
+                # be empty
+                if not attack_map & (SQUARE_BITS[r * 8 + c - 1] | SQUARE_BITS[r * 8 + c - 2]):
+                    moves.append(encode_move(r, c, r, c - 2, board, castle_move=True))
 
     """
     Main function that calls get_king_side_castle and get_queen_side_castle to calculate if castling is possible 
     on either the king or queen side 
     """
 
-    def get_castle_moves(self, r, c, moves, board, check_for_pins_checks, white_king_loc,
-                         black_king_loc, castle_rights, square_under_attack) -> None:
-
-        # check for pins and checks
-        in_check, pins, checks = check_for_pins_checks(white_king_loc, black_king_loc)
+    def get_castle_moves(self, r, c, moves, board, attack_map, castle_rights) -> None:
 
-        # Checks to see if king is in check
-        if in_check:
+        # Castling starts from the king's home square, and not while the king is in check
+        if (r, c) != ((7, 4) if board[r][c].team == 'w' else (0, 4)) or attack_map & SQUARE_BITS[r * 8 + c]:
             return
 
         # Checks to see if King side squares are all empty
-        if (board[r][c].team == 'w' and castle_rights.wks) or (board[r][c].team == 'b' and castle_rights.bks):
-            self.get_king_side_castle(r, c, moves, board, square_under_attack)
+        if castle_rights & (WHITE_KING_SIDE if board[r][c].team == 'w' else BLACK_KING_SIDE):
+            self.get_king_side_castle(r, c, moves, board, attack_map)
 
         # checks to see if Queen side squares are all empty
-        if (board[r][c].team == 'w' and castle_rights.wqs) or (board[r][c].team == 'b' and castle_rights.bqs):
-            self.get_queen_side_castle(r, c, moves, board, square_under_attack)
-
-    """
-    Primary function to calculate the kings movement in all direction. Calculates the potential squares the 
-    king could move to and uses the utility function to verify if that move is valid or not.   
-    """
-
-    def get_piece_move(self, r, c, moves, board, check_for_pins_checks, white_king_loc, black_king_loc, castle_rights,
-                       square_under_attack) -> None:
-
-        # UP
-        if r - 1 >= 0 and (board[r - 1][c].team == '-' or (
-                board[r - 1][c].team != '-' and board[r - 1][c].team != board[r][c].team)):
-            self.get_piece_move_utility(r, c, r - 1, c, moves, board, check_for_pins_checks, white_king_loc,
-                                        black_king_loc)
-
-        # DOWN 
-        if r + 1 <= 7 and (board[r + 1][c].team == '-' or (
-                board[r + 1][c].team != '-' and board[r + 1][c].team != board[r][c].team)):
-            self.get_piece_move_utility(r, c, r + 1, c, moves, board, check_for_pins_checks, white_king_loc,
-                                        black_king_loc)
-
-        # LEFT    
-        if c - 1 >= 0 and (board[r][c - 1].team == '-' or (
-                board[r][c - 1].team != '-' and board[r][c - 1].team != board[r][c].team)):
-            self.get_piece_move_utility(r, c, r, c - 1, moves, board, check_for_pins_checks, white_king_loc,
-                                        black_king_loc)
-
-        # RIGHT
-        if c + 1 <= 7 and (board[r][c + 1].team == '-' or (
-                board[r][c + 1].team != '-' and board[r][c + 1].team != board[r][c].team)):
-            self.get_piece_move_utility(r, c, r, c + 1, moves, board, check_for_pins_checks, white_king_loc,
-                                        black_king_loc)
-
-        # TOP LEFT DIAGONAL    
-        if (r - 1 >= 0 and c - 1 >= 0) and (board[r - 1][c - 1].team == '-' or (
-                board[r - 1][c - 1].team != '-' and board[r - 1][c - 1].team != board[r][c].team)):
-            self.get_piece_move_utility(r, c, r - 1, c - 1, moves, board, check_for_pins_checks, white_king_loc,
-                                        black_king_loc)
-
-        # TOP RIGHT DIAGONAL    
-        if (r - 1 >= 0 and c + 1 <= 7) and (board[r - 1][c + 1].team == '-' or (
-                board[r - 1][c + 1].team != '-' and board[r - 1][c + 1].team != board[r][c].team)):
-            self.get_piece_move_utility(r, c, r - 1, c + 1, moves, board, check_for_pins_checks, white_king_loc,
-                                        black_king_loc)
-
-        # BOTTOM LEFT DIAGONAL
-        if (r + 1 <= 7 and c - 1 >= 0) and (board[r + 1][c - 1].team == '-' or (
-                board[r + 1][c - 1].team != '-' and board[r + 1][c - 1].team != board[r][c].team)):
-            self.get_piece_move_utility(r, c, r + 1, c - 1, moves, board, check_for_pins_checks, white_king_loc,
-                                        black_king_loc)
-
-        # BOTTOM RIGHT DIAGONAL
-        if (r + 1 <= 7 and c + 1 <= 7) and (board[r + 1][c + 1].team == '-' or (
-                board[r + 1][c + 1].team != '-' and board[r + 1][c + 1].team != board[r][c].team)):
-            self.get_piece_move_utility(r, c, r + 1, c + 1, moves, board, check_for_pins_checks, white_king_loc,
-                                        black_king_loc)
+        if castle_rights & (WHITE_QUEEN_SIDE if board[r][c].team == 'w' else BLACK_QUEEN_SIDE):
+            self.get_queen_side_castle(r, c, moves, board, attack_map)
+
+    """
+    Primary function to calculate the kings movement in all direction. The attack map holds every square the enemy
+    attacks (see GameState.get_attack_map), so the king may move to any square around it that is not in the map
+    """
+
+    def get_piece_move(self, r, c, moves, board, attack_map, castle_rights) -> None:
+
+        # All 8 squares around the king
+        ally = board[r][c].team
+        for end_row, end_col in KING_SQUARES[r][c]:
+            # Empty space or Piece capture onto a square the enemy does not attack
+            if board[end_row][end_col].team != ally and not attack_map & SQUARE_BITS[end_row * 8 + end_col]:
+                moves.append(encode_move(r, c, end_row, end_col, board))
 
         # CASTLING
-        self.get_castle_moves(r, c, moves, board, check_for_pins_checks, white_king_loc,
-                              black_king_loc, castle_rights, square_under_attack)
+        self.get_castle_moves(r, c, moves, board, attack_map, castle_rights)
+
+    """
+    Calculates the captures the king can make without moving into check
+    """
+
+    def get_piece_captures(self, r, c, moves, board, attack_map) -> None:
+        ally = board[r][c].team
+        for end_row, end_col in KING_SQUARES[r][c]:
+            if board[end_row][end_col].team not in ('-', ally) and not attack_map & SQUARE_BITS[end_row * 8 + end_col]:
+                moves.append(encode_move(r, c, end_row, end_col, board))
 
 
 """
@@ -663,173 +512,18 @@ class Queen(Pieces):
     """
     Calculates all diagonal and orthogonal directions a Queen can move in
     """
-
     def get_piece_move(self, r, c, moves, board, pins) -> None:
 
-        # Calculates if the knight is pinned and protecting the king from check
+        # Calculates if the queen is pinned and protecting the king from check
         pin_direction, pinned = self.is_pinned(pins, r, c)
 
-        # UP and DOWN
-        if not pinned or (pin_direction == (-1, 0) or pin_direction == (1, 0)):
-            # UP
-            for i in range(8):
-                if r - i - 1 >= 0:
-                    # Empty space
-                    if board[r - i - 1][c].team == '-':
-                        moves.append(Move((r, c), (r - i - 1, c), board))
-
-                    # Same color piece is blocking the way
-                    if board[r - i - 1][c].team != '-' and board[r - i - 1][c].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r - i - 1][c].team != '-' and board[r - i - 1][c].team != board[r][c].team:
-                        moves.append(Move((r, c), (r - i - 1, c), board))
-                        break
-
-                else:
-                    break
-
-            # DOWN
-            for i in range(8):
-
-                if r + i + 1 <= 7:
-                    # Empty space
-                    if board[r + i + 1][c].team == '-':
-                        moves.append(Move((r, c), (r + i + 1, c), board))
-
-                    # Same color piece is blocking the way
-                    if board[r + i + 1][c].team != '-' and board[r + i + 1][c].team == board[r][c].team:
-                        break
+        # All orthogonal and diagonal directions
+        self.get_sliding_moves(r, c, moves, board, QUEEN_DIRECTIONS, pin_direction, pinned)
 
-                    # Piece capture
-                    if board[r + i + 1][c].team != '-' and board[r + i + 1][c].team != board[r][c].team:
-                        moves.append(Move((r, c), (r + i + 1, c), board))
-                        break
-
-                else:
-                    break
-
-        # LEFT and RIGHT
-        if not pinned or (pin_direction == (0, -1) or pin_direction == (0, 1)):
-            # LEFT
-            for i in range(8):
-                if c - i - 1 >= 0:
-                    # Empty space
-                    if board[r][c - i - 1].team == '-':
-                        moves.append(Move((r, c), (r, c - i - 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r][c - i - 1].team != '-' and board[r][c - i - 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r][c - i - 1].team != '-' and board[r][c - i - 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r, c - i - 1), board))
-                        break
-
-                else:
-                    break
-
-            # RIGHT
-            for i in range(8):
-                if c + i + 1 <= 7:
-                    # Empty space
-                    if board[r][c + i + 1].team == '-':
-                        moves.append(Move((r, c), (r, c + i + 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r][c + i + 1].team != '-' and board[r][c + i + 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r][c + i + 1].team != '-' and board[r][c + i + 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r, c + i + 1), board))
-                        break
-
-                else:
-                    break
-
-        # TOP LEFT DIAGONAL and BOTTOM RIGHT DIAGONAL
-        if not pinned or (pin_direction == (-1, -1) or pin_direction == (1, 1)):
-            # TOP LEFT DIAGONAL
-            for i in range(8):
-
-                if r - i - 1 >= 0 and c - i - 1 >= 0:
-                    # Empty space
-                    if board[r - i - 1][c - i - 1].team == '-':
-                        moves.append(Move((r, c), (r - i - 1, c - i - 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r - i - 1][c - i - 1].team != '-' and board[r - i - 1][c - i - 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r - i - 1][c - i - 1].team != '-' and board[r - i - 1][c - i - 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r - i - 1, c - i - 1), board))
-                        break
-
-                else:
-                    break
-
-            # BOTTOM RIGHT DIAGONAL
-            for i in range(8):
-
-                if r + i + 1 <= 7 and c + i + 1 <= 7:
-                    # Empty space
-                    if board[r + i + 1][c + i + 1].team == '-':
-                        moves.append(Move((r, c), (r + i + 1, c + i + 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r + i + 1][c + i + 1].team != '-' and board[r + i + 1][c + i + 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r + i + 1][c + i + 1].team != '-' and board[r + i + 1][c + i + 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r + i + 1, c + i + 1), board))
-                        break
-
-                else:
-                    break
-
-        # TOP RIGHT DIAGONAL and BOTTOM LEFT DIAGONAL
-        if not pinned or (pin_direction == (-1, 1) or pin_direction == (1, -1)):
-            # TOP RIGHT DIAGONAL
-            for i in range(8):
-
-                if r - i - 1 >= 0 and c + i + 1 <= 7:
-                    # Empty space
-                    if board[r - i - 1][c + i + 1].team == '-':
-                        moves.append(Move((r, c), (r - i - 1, c + i + 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r - i - 1][c + i + 1].team != '-' and board[r - i - 1][c + i + 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r - i - 1][c + i + 1].team != '-' and board[r - i - 1][c + i + 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r - i - 1, c + i + 1), board))
-                        break
-
-                else:
-                    break
-
-            # BOTTOM LEFT DIAGONAL
-            for i in range(8):
-
-                if r + i + 1 <= 7 and c - i - 1 >= 0:
-                    # Empty space
-                    if board[r + i + 1][c - i - 1].team == '-':
-                        moves.append(Move((r, c), (r + i + 1, c - i - 1), board))
-
-                    # Same color piece is blocking the way
-                    if board[r + i + 1][c - i - 1].team != '-' and board[r + i + 1][c - i - 1].team == board[r][c].team:
-                        break
-
-                    # Piece capture
-                    if board[r + i + 1][c - i - 1].team != '-' and board[r + i + 1][c - i - 1].team != board[r][c].team:
-                        moves.append(Move((r, c), (r + i + 1, c - i - 1), board))
-                        break
+    """
+    Calculates the captures a queen can make along diagonal and orthogonal directions
+    """
 
-                else:
-                    break
+    def get_piece_captures(self, r, c, moves, board, pins) -> None:
+        pin_direction, pinned = self.is_pinned(pins, r, c)
+        self.get_sliding_captures(r, c, moves, board, QUEEN_DIRECTIONS, pin_direction, pinned)
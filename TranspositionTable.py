@@ -0,0 +1,282 @@
+"""
+Transposition table stores the results of positions already searched by the AI, keyed by the position's Zobrist
+hash. Positions reached through different move orders can then reuse a previous result instead of being searched
+again. The table has a fixed number of entries allocated up front, so its memory use never grows during a game.
+SharedTranspositionTable keeps its entries in shared memory, so that the processes of a parallel search can share
+their results.
+"""
+
+import struct
+from multiprocessing import shared_memory
+
+# Bound types describing how a stored score relates to the true score of the position
+EXACT = 0
+LOWER_BOUND = 1  # The search failed high: the true score is at least the stored score
+UPPER_BOUND = 2  # The search failed low: the true score is at most the stored score
+
+# Replacement policies used when a new result maps to an occupied entry
+REPLACE_ALWAYS = "always"  # The newest result always wins
+REPLACE_DEPTH = "depth"  # Deeper results are kept unless the stored entry is from an older search
+
+
+class TranspositionTable:
+    """
+    Allocates a table with a number of entries that is rounded up to a power of two, so that a hash can be mapped to
+    an entry with a bit mask
+    """
+
+    def __init__(self, size=2 ** 18, replacement=REPLACE_DEPTH) -> None:
+        if replacement not in (REPLACE_ALWAYS, REPLACE_DEPTH):
+            raise ValueError("Unknown replacement policy: " + str(replacement))
+
+        self.size = 1
+        while self.size < size:
+            self.size *= 2
+        self.mask = self.size - 1
+        self.replacement = replacement
+
+        # Each entry is stored across parallel lists: hash, depth, bound type, score, best move, search generation
+        self.keys = [None] * self.size
+        self.depths = [0] * self.size
+        self.bounds = [EXACT] * self.size
+        self.scores = [0] * self.size
+        self.best_moves = [None] * self.size
+        self.generations = [0] * self.size
+
+        # Incremented at the start of each search so that entries from earlier moves can be replaced first
+        self.generation = 0
+
+        # Statistics used to size the table
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    """
+    Marks the start of a new search. Entries stored by earlier searches are still used, but are replaced first
+    """
+
+    def new_search(self) -> None:
+        self.generation += 1
+
+    """
+    Removes every entry and resets the statistics
+    """
+
+    def clear(self) -> None:
+        self.keys = [None] * self.size
+        self.best_moves = [None] * self.size
+        self.generation = 0
+        self.probes = self.hits = self.stores = self.overwrites = 0
+
+    """
+    Looks up a position. Returns (depth, bound, score, best_move) if the position is stored, otherwise None
+    """
+
+    def probe(self, key):
+        self.probes += 1
+        index = key & self.mask
+
+        if self.keys[index] != key:
+            return None
+
+        self.hits += 1
+        return self.depths[index], self.bounds[index], self.scores[index], self.best_moves[index]
+
+    """
+    Stores the result of searching a position, following the table's replacement policy when the entry is taken by
+    a different position
+    """
+
+    def store(self, key, depth, bound, score, best_move) -> None:
+        index = key & self.mask
+        stored_key = self.keys[index]
+
+        if stored_key is not None and stored_key != key:
+            if self.replacement == REPLACE_DEPTH and self.generations[index] == self.generation and \
+                    self.depths[index] > depth:
+                return
+            self.overwrites += 1
+
+        # Keeps the previous best move of the same position if the new result does not have one
+        if best_move is None and stored_key == key:
+            best_move = self.best_moves[index]
+
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.bounds[index] = bound
+        self.scores[index] = score
+        self.best_moves[index] = best_move
+        self.generations[index] = self.generation
+        self.stores += 1
+
+    """
+    Fraction of probes that found their position in the table
+    """
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    """
+    Fraction of entries currently in use
+    """
+
+    def fill_rate(self) -> float:
+        return sum(1 for key in self.keys if key is not None) / self.size
+
+
+# Layout of the shared table: a header holding the search generation, followed by entries of three unsigned 64-bit
+# words. The first word is the hash xor the other two words, the second packs the best move, depth, bound type, and
+# search generation, and the third holds the bits of the score. Processes read and write entries without locks: an
+# entry torn by a write from another process no longer matches its hash, so it is treated as a miss
+SHARED_HEADER = struct.Struct("<Q")
+SHARED_HEADER_SIZE = 64
+SHARED_ENTRY = struct.Struct("<QQQ")
+
+# Converts scores to and from the bits stored in an entry
+SCORE_FLOAT = struct.Struct("<d")
+SCORE_BITS = struct.Struct("<Q")
+
+# Fields packed into the data word. A best move of 0 (which is never a legal move) means there is no best move
+MOVE_MASK = 0x7FFFF
+DEPTH_SHIFT = 19
+DEPTH_MASK = 0xFF
+BOUND_SHIFT = 27
+BOUND_MASK = 0x3
+GENERATION_SHIFT = 32
+GENERATION_MASK = 0xFFFF
+
+
+class SharedTranspositionTable:
+    """
+    Allocates a table of fixed width entries in a shared memory block that every process of a parallel search can
+    probe and store into, or attaches to the block of an existing table when its name is given. Pickling the table
+    (for example to pass it to pool workers) attaches the receiving process to the same block instead of copying it.
+    The table has the same interface as TranspositionTable. The search generation is kept in the shared block, so
+    new_search and clear should only be called by the process coordinating the search. The statistics count the
+    probes and stores of the current process only
+    """
+
+    def __init__(self, size=2 ** 18, replacement=REPLACE_DEPTH, name=None) -> None:
+        if replacement not in (REPLACE_ALWAYS, REPLACE_DEPTH):
+            raise ValueError("Unknown replacement policy: " + str(replacement))
+
+        self.size = 1
+        while self.size < size:
+            self.size *= 2
+        self.mask = self.size - 1
+        self.replacement = replacement
+
+        # The process that created the block removes it once the table is closed
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True,
+                                                     size=SHARED_HEADER_SIZE + self.size * SHARED_ENTRY.size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self.buffer = self.memory.buf
+
+        # Statistics used to size the table
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def __reduce__(self):
+        return SharedTranspositionTable, (self.size, self.replacement, self.name)
+
+    """
+    Search generation stored in the shared block
+    """
+
+    @property
+    def generation(self) -> int:
+        return SHARED_HEADER.unpack_from(self.buffer, 0)[0]
+
+    """
+    Marks the start of a new search. Entries stored by earlier searches are still used, but are replaced first
+    """
+
+    def new_search(self) -> None:
+        SHARED_HEADER.pack_into(self.buffer, 0, (self.generation + 1) & GENERATION_MASK)
+
+    """
+    Removes every entry and resets the statistics
+    """
+
+    def clear(self) -> None:
+        self.buffer[:SHARED_HEADER_SIZE + self.size * SHARED_ENTRY.size] = \
+            bytes(SHARED_HEADER_SIZE + self.size * SHARED_ENTRY.size)
+        self.probes = self.hits = self.stores = self.overwrites = 0
+
+    """
+    Looks up a position. Returns (depth, bound, score, best_move) if the position is stored, otherwise None
+    """
+
+    def probe(self, key):
+        self.probes += 1
+        check, data, score_bits = SHARED_ENTRY.unpack_from(self.buffer,
+                                                           SHARED_HEADER_SIZE + (key & self.mask) * SHARED_ENTRY.size)
+
+        if check ^ data ^ score_bits != key:
+            return None
+
+        self.hits += 1
+        best_move = data & MOVE_MASK
+        return (data >> DEPTH_SHIFT & DEPTH_MASK, data >> BOUND_SHIFT & BOUND_MASK,
+                SCORE_FLOAT.unpack(SCORE_BITS.pack(score_bits))[0], best_move if best_move else None)
+
+    """
+    Stores the result of searching a position, following the table's replacement policy when the entry is taken by
+    a different position
+    """
+
+    def store(self, key, depth, bound, score, best_move) -> None:
+        offset = SHARED_HEADER_SIZE + (key & self.mask) * SHARED_ENTRY.size
+        check, data, score_bits = SHARED_ENTRY.unpack_from(self.buffer, offset)
+        stored_key = check ^ data ^ score_bits
+        occupied = check != 0 or data != 0 or score_bits != 0
+        generation = self.generation
+
+        if occupied and stored_key != key:
+            if self.replacement == REPLACE_DEPTH and data >> GENERATION_SHIFT == generation and \
+                    data >> DEPTH_SHIFT & DEPTH_MASK > depth:
+                return
+            self.overwrites += 1
+
+        # Keeps the previous best move of the same position if the new result does not have one
+        if best_move is None and occupied and stored_key == key:
+            best_move = data & MOVE_MASK
+
+        data = (best_move or 0) | min(max(depth, 0), DEPTH_MASK) << DEPTH_SHIFT | bound << BOUND_SHIFT | \
+            generation << GENERATION_SHIFT
+        score_bits = SCORE_BITS.unpack(SCORE_FLOAT.pack(score))[0]
+        SHARED_ENTRY.pack_into(self.buffer, offset, key ^ data ^ score_bits, data, score_bits)
+        self.stores += 1
+
+    """
+    Fraction of probes that found their position in the table
+    """
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    """
+    Fraction of entries currently in use
+    """
+
+    def fill_rate(self) -> float:
+        with self.buffer[SHARED_HEADER_SIZE:SHARED_HEADER_SIZE + self.size * SHARED_ENTRY.size] as entries:
+            used = sum(1 for entry in SHARED_ENTRY.iter_unpack(entries) if entry != (0, 0, 0))
+        return used / self.size
+
+    """
+    Detaches the process from the shared block. The process that created the table also removes the block
+    """
+
+    def close(self) -> None:
+        self.buffer = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
@@ -0,0 +1,304 @@
+"""
+Tuner fits the piece values and positional weights of the AI to the results of real games with Texel's method: the
+score of each position is turned into an expected result with a sigmoid, and the weights are changed to reduce the
+mean squared difference between the expected results and the actual game results. Positions are read from disk in
+chunks and scored with NumPy one chunk at a time, so files of millions of positions are tuned with a bounded amount
+of memory. The weights are fitted with gradient descent (Adam), starting from those of the weight file when it already
+exists, and written back to it. The game and the UCI engine only score positions with the file once it is given to
+them, with WEIGHTS_FILE in main.py and the --weights option of UCI.py.
+
+Each line of the positions file holds a FEN string followed by the result of its game for white: 1-0, 0-1, 1/2-1/2,
+or a number from 0 to 1. The result may be quoted or bracketed, as in EPD files ('c9 "1-0";') and "[1.0]" lists.
+
+Usage: python Tuner.py <positions file> [weight file] [epochs]
+"""
+
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import Evaluation
+from BatchEvaluation import fen_piece_indices
+from Zobrist import PIECE_CODES
+
+# Number of positions read, scored, and used for one step of gradient descent at a time
+CHUNK_SIZE = 65536
+
+# Passes over the positions file, and the step size of Adam (in pawns)
+EPOCHS = 10
+LEARNING_RATE = 0.002
+
+# Decay rates of Adam's moving averages of the gradient and of its square
+ADAM_BETA1 = 0.9
+ADAM_BETA2 = 0.999
+ADAM_EPSILON = 1e-8
+
+# Range searched for the scaling constant of the sigmoid
+SCALING_CONSTANT_RANGE = (0.05, 5.0)
+
+# Game result of each notation
+RESULTS = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5}
+
+# Pieces whose values are tuned. The king is always on the board for both sides, so its value cancels out
+TUNED_PIECES = ('P', 'N', 'B', 'R', 'Q')
+
+# Positional tables that are tuned, named as in Evaluation.piece_position_scores
+TUNED_TABLES = ('N', 'B', 'R', 'Q', "wK", "bK", "wP", "bP")
+
+"""
+Reads the FEN string and the game result of a line of the positions file
+"""
+
+
+def parse_line(line) -> tuple:
+    fields = line.replace('"', ' ').replace(';', ' ').replace('[', ' ').replace(']', ' ').split()
+    if len(fields) < 2:
+        raise ValueError("Invalid position line: " + line.strip())
+
+    token = fields[-1]
+    if token in RESULTS:
+        result = RESULTS[token]
+    else:
+        try:
+            result = float(token)
+        except ValueError:
+            raise ValueError("Invalid game result: " + line.strip())
+        if not 0 <= result <= 1:
+            raise ValueError("Invalid game result: " + line.strip())
+
+    return fields[0], result
+
+
+"""
+Reads the positions file one chunk at a time. Yields the FEN strings of each chunk with an array of their results
+"""
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    fens = []
+    results = []
+
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            fen, result = parse_line(line)
+            fens.append(fen)
+            results.append(result)
+
+            if len(fens) == chunk_size:
+                yield fens, np.array(results)
+                fens = []
+                results = []
+
+    if len(fens) > 0:
+        yield fens, np.array(results)
+
+
+"""
+Builds the matrix that turns the tuned parameters (the tuned piece values followed by the tuned tables, in pawns)
+into the 12 x 64 piece-square values of the piece planes. Black pieces count negatively, and a piece on a square is
+worth its value plus the weight of the square in its table
+"""
+
+
+def parameter_matrix() -> np.ndarray:
+    matrix = np.zeros((len(PIECE_CODES) * 64, len(TUNED_PIECES) + len(TUNED_TABLES) * 64))
+
+    for plane, code in enumerate(PIECE_CODES):
+        team, piece_type = code
+        sign = 1 if team == 'w' else -1
+        table = code if piece_type == 'P' or piece_type == 'K' else piece_type
+        table_column = len(TUNED_PIECES) + TUNED_TABLES.index(table) * 64
+
+        for sq in range(64):
+            if piece_type in TUNED_PIECES:
+                matrix[plane * 64 + sq, TUNED_PIECES.index(piece_type)] = sign
+            matrix[plane * 64 + sq, table_column + sq] = sign
+
+    return matrix
+
+
+"""
+Reads the current weights of Evaluation as tuned parameters in pawns
+"""
+
+
+def initial_parameters() -> np.ndarray:
+    parameters = [Evaluation.piece_score[piece_type] for piece_type in TUNED_PIECES]
+    for table in TUNED_TABLES:
+        parameters.extend(value * Evaluation.POSITION_SCORE_MULTIPLIER
+                          for row in Evaluation.piece_position_scores[table] for value in row)
+
+    return np.array(parameters, dtype=np.float64)
+
+
+"""
+Expected result of each score (in pawns, from white's point of view) for white
+"""
+
+
+def expected_results(scores, scaling_constant) -> np.ndarray:
+    return 1 / (1 + 10 ** (-scaling_constant * scores / 4))
+
+
+"""
+Scores the positions of a chunk with the given piece-square values (in pawns). The pieces are given by the position
+and the plane and square index (plane * 64 + square) of every piece
+"""
+
+
+def score_chunk(positions, features, weights, chunk_length) -> np.ndarray:
+    return np.bincount(positions, weights=weights[features], minlength=chunk_length)
+
+
+"""
+Calculates the mean squared error of a chunk and its gradient with respect to the piece-square values
+"""
+
+
+def chunk_error_gradient(positions, features, results, weights, scaling_constant) -> tuple:
+    expected = expected_results(score_chunk(positions, features, weights, len(results)), scaling_constant)
+    difference = expected - results
+
+    # Derivative of the squared error of each position with respect to its score
+    score_gradient = 2 * difference * expected * (1 - expected) * math.log(10) * scaling_constant / 4 / len(results)
+
+    return np.mean(difference ** 2), np.bincount(features, weights=score_gradient[positions], minlength=len(weights))
+
+
+"""
+Calculates the mean squared error over the whole positions file
+"""
+
+
+def evaluate_error(path, weights, scaling_constant, chunk_size=CHUNK_SIZE) -> float:
+    total_error = 0.0
+    count = 0
+
+    for fens, results in read_chunks(path, chunk_size):
+        positions, planes, squares = fen_piece_indices(fens)
+        scores = score_chunk(positions, planes * 64 + squares, weights, len(results))
+        total_error += np.sum((expected_results(scores, scaling_constant) - results) ** 2)
+        count += len(results)
+
+    return total_error / count if count else 0.0
+
+
+"""
+Finds the scaling constant of the sigmoid that best fits the current weights to the first chunk of positions, with a
+golden section search. The weights are then tuned with the constant fixed
+"""
+
+
+def find_scaling_constant(path, weights, chunk_size=CHUNK_SIZE) -> float:
+    fens, results = next(read_chunks(path, chunk_size))
+    positions, planes, squares = fen_piece_indices(fens)
+    scores = score_chunk(positions, planes * 64 + squares, weights, len(results))
+
+    def error(k):
+        return np.mean((expected_results(scores, k) - results) ** 2)
+
+    low, high = SCALING_CONSTANT_RANGE
+    ratio = (math.sqrt(5) - 1) / 2
+    for _ in range(50):
+        k1 = high - ratio * (high - low)
+        k2 = low + ratio * (high - low)
+        if error(k1) < error(k2):
+            high = k2
+        else:
+            low = k1
+
+    return (low + high) / 2
+
+
+"""
+Tunes the weights of Evaluation over the positions file. Returns the tuned parameters and the scaling constant used
+"""
+
+
+def tune(path, epochs=EPOCHS, learning_rate=LEARNING_RATE, chunk_size=CHUNK_SIZE, scaling_constant=None) -> tuple:
+    matrix = parameter_matrix()
+    parameters = initial_parameters()
+
+    if scaling_constant is None:
+        scaling_constant = find_scaling_constant(path, matrix @ parameters, chunk_size)
+    print("Scaling constant %.4f, error %.6f" %
+          (scaling_constant, evaluate_error(path, matrix @ parameters, scaling_constant, chunk_size)))
+
+    # Moving averages of Adam
+    mean = np.zeros_like(parameters)
+    variance = np.zeros_like(parameters)
+    step = 0
+
+    for epoch in range(1, epochs + 1):
+        start_time = time.perf_counter()
+        total_error = 0.0
+        count = 0
+
+        for fens, results in read_chunks(path, chunk_size):
+            positions, planes, squares = fen_piece_indices(fens)
+            error, weight_gradient = chunk_error_gradient(positions, planes * 64 + squares, results,
+                                                          matrix @ parameters, scaling_constant)
+            gradient = matrix.T @ weight_gradient
+
+            step += 1
+            mean = ADAM_BETA1 * mean + (1 - ADAM_BETA1) * gradient
+            variance = ADAM_BETA2 * variance + (1 - ADAM_BETA2) * gradient ** 2
+            parameters -= learning_rate * (mean / (1 - ADAM_BETA1 ** step)) / \
+                (np.sqrt(variance / (1 - ADAM_BETA2 ** step)) + ADAM_EPSILON)
+
+            total_error += error * len(results)
+            count += len(results)
+
+        print("Epoch %d: error %.6f, %d positions in %.1f seconds" %
+              (epoch, total_error / count if count else 0.0, count, time.perf_counter() - start_time))
+
+    return parameters, scaling_constant
+
+
+"""
+Writes tuned parameters to a weight file. The positional multiplier of Evaluation is kept, and the tables are written in
+its units
+"""
+
+
+def write_weights(path, parameters) -> None:
+    piece_values = dict(Evaluation.piece_score)
+    for i, piece_type in enumerate(TUNED_PIECES):
+        piece_values[piece_type] = round(float(parameters[i]), 3)
+
+    multiplier = Evaluation.POSITION_SCORE_MULTIPLIER
+    position_scores = {}
+    for i, table in enumerate(TUNED_TABLES):
+        values = parameters[len(TUNED_PIECES) + i * 64:len(TUNED_PIECES) + (i + 1) * 64] / multiplier
+        position_scores[table] = [[round(float(values[r * 8 + c]), 2) for c in range(8)] for r in range(8)]
+
+    Evaluation.save_weights(path, piece_values, position_scores, multiplier)
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+
+    path = sys.argv[1]
+    weights_path = sys.argv[2] if len(sys.argv) > 2 else Evaluation.WEIGHTS_FILE
+    epochs = int(sys.argv[3]) if len(sys.argv) > 3 else EPOCHS
+
+    # Continues from the weights of an earlier run
+    if os.path.exists(weights_path):
+        Evaluation.load_weights(weights_path)
+
+    parameters, scaling_constant = tune(path, epochs)
+    print("Final error %.6f" % evaluate_error(path, parameter_matrix() @ parameters, scaling_constant))
+
+    write_weights(weights_path, parameters)
+    print("Weights written to " + weights_path)
+
+
+if __name__ == "__main__":
+    main()
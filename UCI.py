@@ -0,0 +1,266 @@
+"""
+UCI (Universal Chess Interface) front end that runs the engine without a display, so that it can be driven by chess
+GUIs, tournament managers, and scripts through standard input and output. The search runs in a background thread so
+that "stop" and "isready" are answered while the engine is thinking.
+
+Usage: python UCI.py [--bitboard] [--processes n] [--weights file]
+"""
+
+import sys
+import threading
+
+import ChessAI
+from ChessEngine import create_game_state, START_FEN
+from Evaluation import load_weights
+from Move import uci_notation
+from ParallelSearch import ParallelSearcher
+
+ENGINE_NAME = "ChessEngine"
+ENGINE_AUTHOR = "jgarache"
+
+# Deepest iteration searched when the go command does not limit the depth
+MAX_SEARCH_DEPTH = 64
+
+# Share of the remaining clock time spent on one move, and the time kept in reserve for communication (in seconds)
+MOVES_TO_GO = 30
+MOVE_OVERHEAD = 0.05
+
+# Seconds between the stop requests sent to a search thread that has not finished yet
+STOP_CHECK_INTERVAL = 0.05
+
+
+class UCIEngine:
+    """
+    Creates the engine with the starting position. Output lines are written through the output function, which
+    defaults to printing to standard output. With more than one process, the root moves are searched in parallel by
+    a pool of worker processes
+    """
+
+    def __init__(self, use_bitboards=False, output=None, processes=1, weights_file=None) -> None:
+        self.use_bitboards = use_bitboards
+        self.output = output if output is not None else self.print_line
+
+        # The weights are loaded before the game state is created, since it keeps its score up to date with them
+        if weights_file is not None:
+            load_weights(weights_file)
+        self.gs = create_game_state(use_bitboards)
+
+        # The engine's own search, so that several engines can run in one process
+        if processes > 1:
+            self.searcher = ParallelSearcher(processes, use_bitboards, weights_file=weights_file)
+        else:
+            self.searcher = ChessAI.Searcher()
+
+        # Background search thread, and whether the search must wait for "stop" before reporting its move
+        self.search_thread = None
+        self.infinite = False
+        self.stop_event = threading.Event()
+
+    @staticmethod
+    def print_line(line) -> None:
+        # One write per line, so that lines from the search thread are never interleaved with other output
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+    """
+    Handles one command. Returns False once the engine should quit
+    """
+
+    def handle_command(self, line) -> bool:
+        tokens = line.split()
+        if len(tokens) == 0:
+            return True
+
+        command = tokens[0]
+        if command == "uci":
+            self.output("id name " + ENGINE_NAME)
+            self.output("id author " + ENGINE_AUTHOR)
+            self.output("uciok")
+        elif command == "isready":
+            self.output("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            self.searcher.new_game()
+            self.gs = create_game_state(self.use_bitboards)
+        elif command == "position":
+            self.stop()
+            self.set_position(tokens[1:])
+        elif command == "go":
+            self.stop()
+            self.go(tokens[1:])
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+
+        return True
+
+    """
+    Sets up the position of "position startpos [moves ...]" or "position fen <fen> [moves ...]"
+    """
+
+    def set_position(self, tokens) -> None:
+        if "moves" in tokens:
+            moves = tokens[tokens.index("moves") + 1:]
+            tokens = tokens[:tokens.index("moves")]
+        else:
+            moves = []
+
+        if len(tokens) > 0 and tokens[0] == "fen":
+            fen = " ".join(tokens[1:])
+        else:
+            fen = START_FEN
+
+        try:
+            gs = create_game_state(self.use_bitboards, fen)
+        except ValueError as error:
+            self.output("info string " + str(error))
+            return
+
+        for notation in moves:
+            move = self.find_move(gs, notation)
+            if move is None:
+                self.output("info string Illegal move: " + notation)
+                break
+            gs.make_move(move, False)
+
+        self.gs = gs
+
+    """
+    Finds the legal move written in UCI notation, or None if the move is not legal
+    """
+
+    @staticmethod
+    def find_move(gs, notation):
+        for move in gs.get_valid_moves():
+            if uci_notation(move) == notation:
+                return move
+        return None
+
+    """
+    Starts searching the current position with the limits of "go [depth n] [movetime ms] [wtime ms] [btime ms]
+    [winc ms] [binc ms] [movestogo n] [nodes n] [infinite]"
+    """
+
+    def go(self, tokens) -> None:
+        limits = {}
+        self.infinite = False
+        i = 0
+        while i < len(tokens):
+            if tokens[i] == "infinite":
+                self.infinite = True
+            elif tokens[i] in ("depth", "movetime", "wtime", "btime", "winc", "binc", "movestogo", "nodes"):
+                # A missing or non-numeric value is reported and ignored, and the token after the name is read as a
+                # command of its own
+                try:
+                    limits[tokens[i]] = int(tokens[i + 1])
+                    i += 1
+                except (IndexError, ValueError):
+                    self.output("info string Invalid value for " + tokens[i])
+            i += 1
+
+        max_depth = limits.get("depth", MAX_SEARCH_DEPTH)
+        node_limit = limits.get("nodes")
+        time_limit = None
+        if not self.infinite:
+            if "movetime" in limits:
+                time_limit = limits["movetime"] / 1000
+            elif ("wtime" if self.gs.white_turn else "btime") in limits:
+                time_limit = self.allocate_time(limits)
+
+        # Commands that change the position stop the search first, so the search can use the game state directly
+        self.stop_event.clear()
+        self.search_thread = threading.Thread(target=self.search, args=(self.gs, max_depth, time_limit, node_limit),
+                                              daemon=True)
+        self.search_thread.start()
+
+    """
+    Calculates the time to spend on the move from the remaining clock time and increment
+    """
+
+    def allocate_time(self, limits) -> float:
+        side = "w" if self.gs.white_turn else "b"
+        remaining = limits[side + "time"] / 1000
+        increment = limits.get(side + "inc", 0) / 1000
+        moves_to_go = limits.get("movestogo", MOVES_TO_GO)
+
+        return max(0.01, min(remaining / moves_to_go + increment / 2, remaining - MOVE_OVERHEAD))
+
+    """
+    Runs the search in the background thread and reports the best move once it is done, or once "stop" is received
+    when searching infinitely
+    """
+
+    def search(self, gs, max_depth, time_limit, node_limit) -> None:
+        valid_moves = gs.get_valid_moves()
+        if len(valid_moves) == 0:
+            self.output("bestmove 0000")
+            return
+
+        move = self.searcher.find_best_move(gs, valid_moves, None, max_depth, time_limit, node_limit, self.send_info)
+        if move is None:
+            move = valid_moves[0]
+
+        if self.infinite:
+            self.stop_event.wait()
+
+        self.output("bestmove " + uci_notation(move))
+
+    """
+    Writes an info line after each completed iteration of the search
+    """
+
+    def send_info(self, depth, score, nodes, elapsed, pv) -> None:
+        if abs(score) >= ChessAI.CHECKMATE:
+            moves_to_mate = (len(pv) + 1) // 2
+            score_text = "mate " + str(moves_to_mate if score > 0 else -moves_to_mate)
+        else:
+            score_text = "cp " + str(round(score * 100))
+
+        self.output("info depth %d score %s nodes %d nps %d time %d pv %s" %
+                    (depth, score_text, nodes, nodes / elapsed if elapsed > 0 else 0, elapsed * 1000,
+                     " ".join(uci_notation(move) for move in pv)))
+
+    """
+    Stops the search in progress and waits for it to report its move. The searcher clears its stop request when the
+    search starts, so the request is repeated until the search thread has finished in case the thread had not yet
+    reached the search
+    """
+
+    def stop(self) -> None:
+        if self.search_thread is None:
+            return
+
+        self.stop_event.set()
+        while self.search_thread.is_alive():
+            self.searcher.stop()
+            self.search_thread.join(STOP_CHECK_INTERVAL)
+        self.search_thread = None
+
+    """
+    Stops the search in progress and shuts down the worker processes and shared memory of a parallel searcher
+    """
+
+    def close(self) -> None:
+        self.stop()
+        if isinstance(self.searcher, ParallelSearcher):
+            self.searcher.close()
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    processes = int(args[args.index("--processes") + 1]) if "--processes" in args[:-1] else 1
+    weights_file = args[args.index("--weights") + 1] if "--weights" in args[:-1] else None
+    engine = UCIEngine("--bitboard" in args, processes=processes, weights_file=weights_file)
+
+    try:
+        for line in sys.stdin:
+            if not engine.handle_command(line):
+                break
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Zobrist hashing assigns a random 64-bit key to every piece on every square, to the side to move, to each combination
+of castling rights, and to each enpassant file. A position's hash is the XOR of the keys describing it, which allows
+GameState to update the hash incrementally as moves are made instead of rehashing the board.
+"""
+
+import random
+
+# Fixed seed so that hashes are identical between runs and between processes
+_random = random.Random(20230417)
+
+PIECE_CODES = ("wP", "wN", "wB", "wR", "wQ", "wK", "bP", "bN", "bB", "bR", "bQ", "bK")
+
+# Keys for each piece on each square, indexed [piece_color_type][row * 8 + col]
+PIECE_KEYS = {code: tuple(_random.getrandbits(64) for _ in range(64)) for code in PIECE_CODES}
+
+# Key toggled whenever it is black's turn
+BLACK_TO_MOVE_KEY = _random.getrandbits(64)
+
+# Keys for the 16 combinations of castling rights, indexed by the castling rights bitmask
+CASTLE_KEYS = tuple(_random.getrandbits(64) for _ in range(16))
+
+# Keys for the file of the enpassant square
+ENPASSANT_KEYS = tuple(_random.getrandbits(64) for _ in range(8))
+
+"""
+Calculates the hash of a position from scratch by scanning the whole board. Used to initialize the incrementally
+updated hash and to verify it.
+"""
+
+
+def hash_position(gs) -> int:
+    key = 0
+
+    for r in range(8):
+        for c in range(8):
+            if gs.board[r][c].team != '-':
+                key ^= PIECE_KEYS[gs.board[r][c].piece_color_type][r * 8 + c]
+
+    if not gs.white_turn:
+        key ^= BLACK_TO_MOVE_KEY
+
+    key ^= CASTLE_KEYS[gs.castle_rights]
+
+    if gs.enpassant_square != ():
+        key ^= ENPASSANT_KEYS[gs.enpassant_square[1]]
+
+    return key
@@ -1,12 +1,28 @@
 import pygame
+import time
 
-from ChessEngine import GameState
+from ChessEngine import create_game_state
 import ChessAI
-from Move import Move
-# from multiprocessing import Process, Queue
-from multiprocessing import Queue
+from Evaluation import load_weights
+from Move import SQUARES_MASK, END_SHIFT
+from multiprocessing import Process, Queue, Event
+from queue import Empty
 import DrawAnimation
 
+# Selects the bitboard engine instead of the 8x8 board engine for the game and the AI
+USE_BITBOARDS = False
+
+# Limits of each AI move: the AI searches deeper and deeper until either limit is reached
+AI_MAX_DEPTH = 6
+AI_TIME_LIMIT = 2.0
+
+# Weight file written by Tuner.py that the AI scores positions with, or None for the built-in weights
+WEIGHTS_FILE = None
+
+# Searches on the human's time in human vs AI games: after each AI move, the human's reply is predicted from the AI's
+# principal variation and the position after it is searched while the human thinks. If the human plays the predicted
+# reply, the search continues as the AI's search and answers once AI_TIME_LIMIT has passed since it started
+PONDER = True
 
 """
 Determines if the game is over either by checkmate, stalemate, or draw
@@ -57,17 +73,20 @@ def player(gs, sq_selected, player_clicks, move_made, valid_moves, human_turn):
     # If there are two tuples in the player_clicks list, the start and ending positions have been
     # selected, so make the move
     if len(player_clicks) == 2 and human_turn:
-        move = Move(player_clicks[0], player_clicks[1], gs.board)
+        (start_row, start_col), (end_row, end_col) = player_clicks
+        move = start_row * 8 + start_col | (end_row * 8 + end_col) << END_SHIFT
 
-        # Validates a players move
+        # Validates a players move by comparing the starting and ending squares. Pawn promotions have one move per
+        # promotion piece, the player chooses the piece once the first of them is made
         for i in range(len(valid_moves)):
-            if move == valid_moves[i]:
+            if move == valid_moves[i] & SQUARES_MASK:
                 gs.make_move(valid_moves[i], human_turn)
                 move_made = True
 
                 # Resets the tuple and list in preparation of the next move
                 sq_selected = ()
                 player_clicks.clear()
+                break
 
         # If a player changes their mind to select a different piece to move after select
         # the initial piece, instead of clicking the new piece twice and then make a move,
@@ -79,33 +98,83 @@ def player(gs, sq_selected, player_clicks, move_made, valid_moves, human_turn):
 
 
 """
-Controls the AI's movement and uses multi threading so the player is able to click the board while 
-the AI is calculating the best move 
+Controls the AI's movement and uses a separate process so the player is able to click the board, undo, and reset while
+the AI is calculating the best move. The game loop keeps running while the process searches: each call starts the
+search if it isn't running yet, collects the progress the search has reported, and makes the AI's move once the search
+has placed it into the return queue
 """
 
 
-def artificial_intel(gs, AI_processing, move_finder_process, return_queue, valid_moves, human_turn,
-                     move_made):
+def artificial_intel(gs, AI_processing, move_finder_process, return_queue, progress_queue, AI_progress, valid_moves,
+                     human_turn, move_made):
+
+    # Starts the move calculation in another process if the AI isn't already calculating
+    if not AI_processing:
+        AI_processing = True
+        AI_progress = None
+        move_finder_process = Process(target=ChessAI.search_worker,
+                                      args=(gs, valid_moves, return_queue, progress_queue, AI_MAX_DEPTH,
+                                            AI_TIME_LIMIT, None, WEIGHTS_FILE),
+                                      daemon=True)
+        move_finder_process.start()
+
+    # Keeps the latest depth, score, and principal variation reported by the search
+    while True:
+        try:
+            AI_progress = progress_queue.get_nowait()
+        except Empty:
+            break
+
+    # Once the move calculation is complete, the process places the move and its principal variation into the return
+    # queue. If the move is None, then a random move will be selected instead
+    try:
+        AI_move, AI_pv = return_queue.get_nowait()
+    except Empty:
+        return move_made, AI_processing, move_finder_process, AI_progress, []
+
+    move_finder_process.join()
+    if AI_move is None:
+        AI_move = ChessAI.find_random_move(valid_moves)
+        AI_pv = []
+    gs.make_move(AI_move, human_turn)
+    move_made = True
+    AI_processing = False
+    AI_progress = None
+
+    return move_made, AI_processing, move_finder_process, AI_progress, AI_pv
+
+
+"""
+Starts searching on the human's time. The human's expected reply is the second move of the principal variation of the
+AI's last move. Returns the ponder search as (process, stop event, expected reply, start time), or None if the
+principal variation does not predict a reply
+"""
+
+
+def start_pondering(gs, AI_pv, return_queue, progress_queue):
+    if len(AI_pv) < 2 or AI_pv[1] not in gs.get_valid_moves():
+        return None
+
+    stop_event = Event()
+    ponder_process = Process(target=ChessAI.ponder_worker,
+                             args=(gs, AI_pv[1], return_queue, progress_queue, AI_MAX_DEPTH, stop_event, WEIGHTS_FILE),
+                             daemon=True)
+    ponder_process.start()
+
+    return ponder_process, stop_event, AI_pv[1], time.perf_counter()
+
+
+"""
+Terminates the AI's search process. The queues it was using are replaced, since a terminated process may leave them
+unusable or holding a stale move
+"""
 
-    # Starts the move calculation in another thread if the AI isn't already calculating
-    # if not AI_processing:
-    #    AI_processing = True
-    #    move_finder_process = Process(target=ChessAI.find_best_move, args=(gs, valid_moves, return_queue))
-    #    move_finder_process.start()
 
-    # Once the move calculation is complete, the thread will have terminated and placed the move into a move queue
-    # The AI retrieves the move from the return_queue, if the move is None, then a random move will be selected instead
-    # if not move_finder_process.is_alive():
-    if not human_turn:
-        # AI_move = return_queue.get()
-        AI_move = ChessAI.find_best_move(gs, valid_moves, return_queue)
-        if AI_move is None:
-            AI_move = ChessAI.find_random_move(valid_moves)
-        gs.make_move(AI_move, human_turn)
-        move_made = True
-        AI_processing = False
+def cancel_ai_search(move_finder_process):
+    move_finder_process.terminate()
+    move_finder_process.join()
 
-    return move_made, AI_processing, move_finder_process
+    return Queue(), Queue()
 
 
 """
@@ -115,11 +184,16 @@ draw_game_state, moves, and event loop that captures all inputs from mouse and k
 
 
 def main() -> None:
-    # Initializes pygame
+    # Initializes pygame and opens the game window
     pygame.init()
+    DrawAnimation.create_window()
+
+    # Loads the AI's weights before the game state is created, since it keeps its score up to date with them
+    if WEIGHTS_FILE is not None:
+        load_weights(WEIGHTS_FILE)
 
     # Creates GameState object
-    gs = GameState()
+    gs = create_game_state(USE_BITBOARDS)
 
     # Generates list of valid moves both the AI and player are able to make at a given GameState
     valid_moves = gs.get_valid_moves()
@@ -159,9 +233,17 @@ def main() -> None:
 
     # AI variables
     # AI_processing determines if the AI is calculating the best move
-    # move_finder_process is the thread that performs the move calculations
+    # move_finder_process is the process that performs the move calculations
+    # AI_progress is the latest (depth, score, principal variation) reported by the search
     AI_processing = False
     move_finder_process = False
+    AI_progress = None
+
+    # Pondering variables
+    # ponder is the search running on the human's time as (process, stop event, expected reply, start time)
+    # AI_stop is the (stop event, time) at which the AI's search is stopped after a ponder hit
+    ponder = None
+    AI_stop = None
 
     # If a move was undone, then skips over the AI's turn to allow the human player to take their turn again
     move_undone = False
@@ -169,11 +251,12 @@ def main() -> None:
     # Move log font
     move_log_font = pygame.font.SysFont("Helvetica", 14, False, False)
 
-    # Pass data between threads
+    # Pass the AI's move and its progress from the search process
     return_queue = Queue()
+    progress_queue = Queue()
 
     # Controls the FPS of the game
-    FPS = 10
+    FPS = 60
 
     # Game loop
     while run:
@@ -195,6 +278,19 @@ def main() -> None:
                 if not game_over:
                     sq_selected, player_clicks, move_made = player(gs, sq_selected, player_clicks,
                                                                    move_made, valid_moves, human_turn)
+
+                    # On a ponder hit the ponder search becomes the AI's search, which is stopped once it has
+                    # searched for AI_TIME_LIMIT in total. On a miss the ponder search is cancelled
+                    if move_made and ponder is not None:
+                        ponder_process, stop_event, expected_move, start_time = ponder
+                        if gs.move_log[-1] == expected_move:
+                            AI_processing = True
+                            move_finder_process = ponder_process
+                            AI_progress = None
+                            AI_stop = (stop_event, start_time + AI_TIME_LIMIT)
+                        else:
+                            return_queue, progress_queue = cancel_ai_search(ponder_process)
+                        ponder = None
                     # Animates player move
                     if enable_animation:
                         animate = True
@@ -204,7 +300,24 @@ def main() -> None:
 
                 # Undoes moves
                 if event.key == pygame.K_z:
-                    if human_turn:
+                    # Cancels the search on the human's time
+                    if ponder is not None:
+                        return_queue, progress_queue = cancel_ai_search(ponder[0])
+                        ponder = None
+
+                    # Cancels the AI's search and takes back the human move it was answering
+                    if AI_processing and (player_one or player_two):
+                        return_queue, progress_queue = cancel_ai_search(move_finder_process)
+                        AI_processing = False
+                        AI_progress = None
+                        AI_stop = None
+                        gs.undo_move()
+                        move_made = True
+                        animate = False
+                        game_over = False
+                        move_undone = True
+
+                    elif human_turn:
                         gs.undo_move()
 
                         # Undoes AI move
@@ -213,18 +326,13 @@ def main() -> None:
                         move_made = True
                         animate = False
                         game_over = False
-
-                        # Terminates any threads that are in progress
-                        if AI_processing:
-                            move_finder_process.terminate()
-                            AI_processing = False
                         move_undone = True
 
                 # Resets game
                 if event.key == pygame.K_r:
 
                     # Re-initialize the GameState
-                    gs = GameState()
+                    gs = create_game_state(USE_BITBOARDS)
 
                     # Re-calculates all valid_moves at the beginning of the game
                     valid_moves = gs.get_valid_moves()
@@ -242,10 +350,15 @@ def main() -> None:
                     game_over = False
                     game_start = False
 
-                    # Terminates any threads that are in progress
+                    # Terminates the AI's search if it is in progress
                     if AI_processing:
-                        move_finder_process.terminate()
+                        return_queue, progress_queue = cancel_ai_search(move_finder_process)
                         AI_processing = False
+                        AI_progress = None
+                        AI_stop = None
+                    if ponder is not None:
+                        return_queue, progress_queue = cancel_ai_search(ponder[0])
+                        ponder = None
 
                     # If AI is playing, reset move undone to allow AI to make moves again
                     move_undone = False
@@ -280,19 +393,30 @@ def main() -> None:
                         player_two = True
                         gs.game_mode = "HVH"
 
+        # Stops the AI's search once it has searched for AI_TIME_LIMIT after a ponder hit
+        if AI_stop is not None and time.perf_counter() >= AI_stop[1]:
+            AI_stop[0].set()
+            AI_stop = None
+
         # Make's AI moves
         if not game_over and not human_turn and not move_undone:
-            move_made, AI_processing, move_finder_process = artificial_intel(gs, AI_processing, move_finder_process,
-                                                                             return_queue, valid_moves, human_turn,
-                                                                             move_made)
+            move_made, AI_processing, move_finder_process, AI_progress, AI_pv = artificial_intel(
+                gs, AI_processing, move_finder_process, return_queue, progress_queue, AI_progress, valid_moves,
+                human_turn, move_made)
             # Animates AI moves
-            if enable_animation:
+            if enable_animation and move_made:
                 animate = True
 
+            # Searches the human's expected reply while the human thinks
+            if move_made:
+                AI_stop = None
+                if PONDER and gs.game_mode == "HVA":
+                    ponder = start_pondering(gs, AI_pv, return_queue, progress_queue)
+
         # Regenerates the next set of valid moves after a move was made
         if move_made:
             if animate:
-                DrawAnimation.animate_move(gs.move_log[-1], gs.board, clock)
+                DrawAnimation.animate_move(gs.get_logged_move(-1), gs.board, clock)
             valid_moves = gs.get_valid_moves()
             move_made = False
             animate = False
@@ -300,7 +424,7 @@ def main() -> None:
             move_undone = False
 
         # Redraws and updates all events that have occurred on the screen at a set FPS
-        DrawAnimation.draw_game_state(gs, valid_moves, sq_selected, move_log_font)
+        DrawAnimation.draw_game_state(gs, valid_moves, sq_selected, move_log_font, AI_progress)
 
         # End game conditions
         game_over = is_game_over(gs, game_over)
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from ChessEngine import create_game_state, START_FEN
+from Perft import REFERENCE_POSITIONS
+
+FENS = [fen for _, fen, _ in REFERENCE_POSITIONS] + [
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+    "4k3/8/8/8/2pP4/8/8/4K3 b - d3 0 40",
+    "r3k2r/8/8/8/8/8/8/R3K2R b Kq - 7 23",
+]
+
+
+@pytest.mark.parametrize("use_bitboards", [False, True], ids=["mailbox", "bitboard"])
+@pytest.mark.parametrize("fen", FENS)
+def test_fen_round_trip(use_bitboards, fen):
+    assert create_game_state(use_bitboards, fen).get_fen() == fen
+
+
+@pytest.mark.parametrize("use_bitboards", [False, True], ids=["mailbox", "bitboard"])
+def test_fen_of_played_positions_loads_the_same_position(use_bitboards):
+    rng = random.Random(1)
+    gs = create_game_state(use_bitboards, START_FEN)
+
+    for _ in range(80):
+        moves = gs.get_valid_moves()
+        if len(moves) == 0:
+            break
+        gs.make_move(rng.choice(moves), False)
+
+        loaded = create_game_state(use_bitboards, gs.get_fen())
+        assert loaded.get_fen() == gs.get_fen()
+        assert loaded.zobrist_key == gs.zobrist_key
+        assert sorted(loaded.get_valid_moves()) == sorted(gs.get_valid_moves())
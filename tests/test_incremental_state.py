@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from ChessEngine import create_game_state
+from Evaluation import count_material
+from Material import material_signature
+from Perft import REFERENCE_POSITIONS
+from Zobrist import hash_position
+
+FENS = [fen for _, fen, _ in REFERENCE_POSITIONS]
+
+
+def assert_matches_recalculation(gs):
+    assert gs.zobrist_key == hash_position(gs)
+    assert gs.material_score == count_material(gs)
+    assert gs.material_key == material_signature(gs)
+
+
+@pytest.mark.parametrize("use_bitboards", [False, True], ids=["mailbox", "bitboard"])
+@pytest.mark.parametrize("fen", FENS)
+def test_random_make_undo_matches_recalculation(use_bitboards, fen):
+    rng = random.Random(fen)
+    gs = create_game_state(use_bitboards, fen)
+
+    for _ in range(300):
+        moves = gs.get_valid_moves()
+        # Undoes a move now and then, and whenever the game is over
+        if len(gs.move_log) > 0 and (len(moves) == 0 or rng.random() < 0.3):
+            gs.undo_move()
+        else:
+            gs.make_move(rng.choice(moves), False)
+        assert_matches_recalculation(gs)
+
+    while len(gs.move_log) > 0:
+        gs.undo_move()
+    assert_matches_recalculation(gs)
+    assert gs.get_fen() == fen
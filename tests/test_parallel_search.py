@@ -0,0 +1,22 @@
+import pytest
+
+from ChessEngine import create_game_state
+from ParallelSearch import ParallelSearcher
+
+KIWIPETE_FEN = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+@pytest.fixture(scope="module")
+def searcher():
+    with ParallelSearcher(2) as parallel_searcher:
+        yield parallel_searcher
+
+
+@pytest.mark.parametrize("limits", [{"time_limit": 0}, {"time_limit": 0.001}, {"node_limit": 10},
+                                    {"time_limit": 0, "node_limit": 10}])
+def test_tight_limits_still_return_a_legal_move(searcher, limits):
+    gs = create_game_state(False, KIWIPETE_FEN)
+    valid_moves = gs.get_valid_moves()
+
+    assert searcher.find_best_move(gs, valid_moves, **limits) in valid_moves
+
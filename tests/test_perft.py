@@ -0,0 +1,17 @@
+import pytest
+
+from ChessEngine import create_game_state
+from Perft import REFERENCE_POSITIONS, perft
+
+# Largest published count checked, so that the suite runs in a few seconds
+MAX_NODES = 10000
+
+CASES = [(name, fen, depth, expected)
+         for name, fen, expected_counts in REFERENCE_POSITIONS
+         for depth, expected in enumerate(expected_counts, 1) if expected <= MAX_NODES]
+
+
+@pytest.mark.parametrize("use_bitboards", [False, True], ids=["mailbox", "bitboard"])
+@pytest.mark.parametrize("name, fen, depth, expected", CASES, ids=["%s-%d" % (case[0], case[2]) for case in CASES])
+def test_perft_matches_reference_counts(use_bitboards, name, fen, depth, expected):
+    assert perft(create_game_state(use_bitboards, fen), depth) == expected
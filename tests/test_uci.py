@@ -0,0 +1,65 @@
+import pytest
+
+from UCI import UCIEngine
+
+
+@pytest.fixture
+def engine():
+    output = []
+    uci_engine = UCIEngine(output=output.append)
+    uci_engine.output_lines = output
+    yield uci_engine
+    uci_engine.close()
+
+
+def run_search(engine, command):
+    engine.handle_command(command)
+    engine.search_thread.join()
+    return engine.output_lines
+
+
+def test_position_startpos_with_moves(engine):
+    engine.handle_command("position startpos moves e2e4 e7e5 g1f3")
+
+    assert engine.gs.get_fen() == "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2"
+    assert engine.output_lines == []
+
+
+def test_position_fen_with_moves(engine):
+    engine.handle_command("position fen 4k3/1P6/8/8/8/8/8/4K3 w - - 0 1 moves b7b8n")
+
+    assert engine.gs.get_fen() == "1N2k3/8/8/8/8/8/8/4K3 b - - 0 1"
+
+
+def test_position_stops_at_an_illegal_move(engine):
+    engine.handle_command("position startpos moves e2e4 e2e4")
+
+    assert engine.output_lines == ["info string Illegal move: e2e4"]
+    assert engine.gs.get_fen() == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+
+
+def test_go_depth_searches_to_the_depth(engine):
+    lines = run_search(engine, "go depth 2")
+
+    assert [line.split()[2] for line in lines if line.startswith("info depth")] == ["1", "2"]
+    assert lines[-1].startswith("bestmove ")
+
+
+def test_go_reports_invalid_values(engine):
+    lines = run_search(engine, "go depth x movetime 50 nodes")
+
+    assert "info string Invalid value for depth" in lines
+    assert "info string Invalid value for nodes" in lines
+    assert lines[-1].startswith("bestmove ")
+
+
+def test_go_without_moves_reports_null_move(engine):
+    engine.handle_command("position fen 7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+
+    assert run_search(engine, "go depth 3")[-1] == "bestmove 0000"
+
+
+def test_allocate_time_uses_the_side_to_move_clock(engine):
+    engine.handle_command("position startpos moves e2e4")
+
+    assert engine.allocate_time({"wtime": 1000, "btime": 30000, "binc": 1000}) == pytest.approx(30 / 30 + 0.5)